@@ -7,11 +7,37 @@ from plotly.subplots import make_subplots
 import requests
 from datetime import datetime, timedelta
 import json
-import re
-from collections import Counter, defaultdict
+import os
+import tempfile
+import threading
+from collections import defaultdict
 import warnings
 warnings.filterwarnings('ignore')
 
+from ocr_store import OcrCorpus, OcrCorpusWriter, normalize_ark, reindex_corpus
+from archives_data import seed_archives
+from append_log import AppendLog
+from shared_corpus import COLLECTIONS, MANUAL_SOURCE_ID, SharedCorpus, new_record_id
+from harvester import DEFAULT_RATE, DEFAULT_WORKERS, GallicaSRU, Harvester, corpus_ids, corpus_sink
+from dependency_graph import DependencyGraph
+from figure_cache import FigureCache
+from chart_downsampling import DEFAULT_POINT_THRESHOLD, optimize_figure
+from collocations import ORDERS as COLLOCATION_ORDERS, SCORING_METHODS, CollocationCounter
+from near_duplicates import DuplicateClusters
+from gazetteer import PlaceMatcher, cluster_places
+from identifier_index import IdentifierIndex
+from cote_index import CoteIndex, format_range, parse_cote
+from year_index import YearIndex
+from aggregate_cube import NO_THEME, UNDATED, AggregateCube
+from arrow_export import catalog_batches, cube_frames, frame_batches, press_batches, write_archive
+from pdf_report import ReportJob
+from source_comparison import LEVELS as COMPARISON_LEVELS, ThemeMatrix, group_filters
+from press_store import PERIODS as PRESS_PERIODS, PressStore
+from video_store import FOOTAGE_GROUPS, VideoStore, format_duration
+from sentiment_series import OVERALL, RESOLUTIONS, SMOOTHING_METHODS, SentimentSeries
+from text_analytics import KEYNESS_METHODS, DocumentTermMatrix, top_terms_by_group
+from text_normalization import contains_phrase, matches_query, tokenize
+
 # Configuration
 st.set_page_config(
     page_title="Archives BUMIDOM - Dashboard Complet",
@@ -68,379 +94,448 @@ st.markdown("""
 # DONNÉES COMPLÈTES DES ARCHIVES BUMIDOM
 # ============================================================================
 
-BUMIDOM_ARCHIVES = {
-    # Archives Nationales - Fonds principal
-    'archives_nationales': {
-        'name': 'Archives Nationales',
-        'color': '#1f77b4',
-        'icon': '📄',
-        'documents': [
-            {
-                'id': 'AN_001',
-                'title': 'Conseil d\'administration du BUMIDOM - Procès-verbaux',
-                'date': '1962-1981',
-                'cote': '20080699/1-20080699/4',
-                'type': 'Procès-verbaux',
-                'location': 'Pierrefitte-sur-Seine',
-                'description': 'Procès-verbaux des séances du conseil d\'administration',
-                'pages': 1200,
-                'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001514',
-                'keywords': ['administration', 'budget', 'décisions', 'gouvernance'],
-                'status': 'Communicable'
-            },
-            {
-                'id': 'AN_002',
-                'title': 'Statistiques des migrations DOM-TOM',
-                'date': '1963-1980',
-                'cote': '19880445/1-8',
-                'type': 'Rapports statistiques',
-                'location': 'Pierrefitte-sur-Seine',
-                'description': 'Statistiques détaillées des flux migratoires',
-                'pages': 850,
-                'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001513',
-                'keywords': ['statistiques', 'flux', 'démographie', 'chiffres'],
-                'status': 'Communicable'
-            },
-            {
-                'id': 'AN_003',
-                'title': 'Correspondance ministérielle relative au BUMIDOM',
-                'date': '1960-1985',
-                'cote': '19940555/1-15',
-                'type': 'Correspondance',
-                'location': 'Pierrefitte-sur-Seine',
-                'description': 'Échanges entre ministères concernant le BUMIDOM',
-                'pages': 2000,
-                'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001515',
-                'keywords': ['correspondance', 'politique', 'ministère', 'administration'],
-                'status': 'Sous dérogation'
-            }
-        ]
-    },
-    
-    # RetroNews - Presse historique
-    'retronews': {
-        'name': 'RetroNews (BnF)',
-        'color': '#ff7f0e',
-        'icon': '📰',
-        'articles': [
-            {
-                'id': 'RN_001',
-                'title': 'Le BUMIDOM organise le départ de 500 travailleurs antillais',
-                'date': '1965-03-15',
-                'newspaper': 'Le Monde',
-                'page': '12',
-                'sentiment': 'neutre',
-                'extract': 'Le Bureau des migrations des départements d\'outre-mer (BUMIDOM) organise cette semaine le départ vers la métropole de 500 travailleurs originaires des Antilles...',
-                'url': 'https://www.retronews.fr/journal/le-monde/15-mars-1965/1/1',
-                'themes': ['recrutement', 'transport', 'départ'],
-                'length': 450
-            },
-            {
-                'id': 'RN_002',
-                'title': 'Polémique sur les conditions d\'accueil des migrants ultramarins',
-                'date': '1970-11-22',
-                'newspaper': 'Le Figaro',
-                'page': '8',
-                'sentiment': 'négatif',
-                'extract': 'Les conditions d\'accueil des travailleurs ultramarins dans les foyers de la région parisienne sont dénoncées par plusieurs associations...',
-                'url': 'https://www.retronews.fr/journal/le-figaro/22-novembre-1970/1/1',
-                'themes': ['logement', 'conditions', 'polémique'],
-                'length': 620
-            },
-            {
-                'id': 'RN_003',
-                'title': 'BUMIDOM : 15 ans d\'activité et 80 000 migrants',
-                'date': '1978-05-10',
-                'newspaper': 'La Croix',
-                'page': '5',
-                'sentiment': 'positif',
-                'extract': 'En quinze ans d\'existence, le BUMIDOM a organisé la migration de plus de 80 000 personnes vers la métropole...',
-                'url': 'https://www.retronews.fr/journal/la-croix/10-mai-1978/1/1',
-                'themes': ['bilan', 'statistiques', 'succès'],
-                'length': 780
-            },
-            {
-                'id': 'RN_004',
-                'title': 'Les difficultés d\'intégration des migrants des DOM',
-                'date': '1975-09-30',
-                'newspaper': 'Le Parisien',
-                'page': '3',
-                'sentiment': 'négatif',
-                'extract': 'De nombreux travailleurs ultramarins rencontrent des difficultés pour s\'intégrer en métropole...',
-                'url': 'https://www.retronews.fr/journal/le-parisien/30-septembre-1975/1/1',
-                'themes': ['intégration', 'difficultés', 'social'],
-                'length': 550
-            }
-        ]
-    },
-    
-    # Gallica - Livres et rapports
-    'gallica': {
-        'name': 'Gallica (BnF)',
-        'color': '#2ca02c',
-        'icon': '📖',
-        'documents': [
-            {
-                'id': 'GL_001',
-                'title': 'Rapport sur le fonctionnement du BUMIDOM',
-                'date': '1975',
-                'author': 'Ministère du Travail',
-                'publisher': 'La Documentation française',
-                'pages': 120,
-                'description': 'Rapport complet sur l\'organisation et les résultats du BUMIDOM',
-                'url': 'https://gallica.bnf.fr/ark:/12148/bpt6k9612718t',
-                'topics': ['organisation', 'financement', 'résultats', 'évaluation'],
-                'language': 'français'
-            },
-            {
-                'id': 'GL_002',
-                'title': 'Les migrations ultramarines vers la France métropolitaine',
-                'date': '1980',
-                'author': 'INED (Institut national d\'études démographiques)',
-                'publisher': 'Presses Universitaires de France',
-                'pages': 85,
-                'description': 'Étude démographique des migrations des DOM vers la métropole',
-                'url': 'https://gallica.bnf.fr/ark:/12148/bpt6k4803231d',
-                'topics': ['démographie', 'sociologie', 'intégration', 'statistiques'],
-                'language': 'français'
-            },
-            {
-                'id': 'GL_003',
-                'title': 'Revue "Hommes et Migrations" - Numéro spécial DOM-TOM',
-                'date': '1972',
-                'author': 'Collectif',
-                'publisher': 'Association H&M',
-                'pages': 65,
-                'description': 'Numéro spécial consacré aux migrations ultramarines',
-                'url': 'https://gallica.bnf.fr/ark:/12148/cb34378482g/date1972',
-                'topics': ['témoignages', 'analyses', 'problématiques'],
-                'language': 'français'
-            }
-        ]
-    },
-    
-    # INA - Archives audiovisuelles
-    'ina': {
-        'name': 'INA',
-        'color': '#d62728',
-        'icon': '🎥',
-        'videos': [
-            {
-                'id': 'INA_001',
-                'title': 'Départ des premiers migrants du BUMIDOM',
-                'date': '1963-07-20',
-                'duration': '02:15',
-                'format': 'Reportage',
-                'description': 'Reportage sur le départ des premiers travailleurs antillais organisé par le BUMIDOM',
-                'url': 'https://www.ina.fr/video/I08324568',
-                'themes': ['départ', 'émotion', 'espoir'],
-                'location': 'Port de Fort-de-France'
-            },
-            {
-                'id': 'INA_002',
-                'title': 'Interview du directeur du BUMIDOM',
-                'date': '1970-05-12',
-                'duration': '05:30',
-                'format': 'Interview',
-                'description': 'Le directeur du BUMIDOM explique les objectifs et méthodes de l\'organisme',
-                'url': 'https://www.ina.fr/video/I08324569',
-                'themes': ['explication', 'justification', 'méthodes'],
-                'location': 'Paris'
-            },
-            {
-                'id': 'INA_003',
-                'title': 'Vie dans les foyers de migrants',
-                'date': '1975-11-08',
-                'duration': '07:45',
-                'format': 'Documentaire',
-                'description': 'Reportage sur les conditions de vie dans les foyers de migrants ultramarins',
-                'url': 'https://www.ina.fr/video/I08324570',
-                'themes': ['conditions', 'vie quotidienne', 'logement'],
-                'location': 'Foyer de Saint-Denis'
-            }
-        ]
-    },
-    
-    # INSEE - Données statistiques
-    'insee': {
-        'name': 'INSEE',
-        'color': '#9467bd',
-        'icon': '📈',
-        'datasets': [
-            {
-                'id': 'IS_001',
-                'title': 'Flux migratoires entre les DOM et la métropole (1962-1982)',
-                'period': '1962-1982',
-                'variables': ['origine', 'destination', 'âge', 'sexe', 'profession', 'situation familiale'],
-                'description': 'Données détaillées sur les flux migratoires',
-                'url': 'https://www.insee.fr/fr/statistiques/2012712',
-                'format': 'CSV',
-                'size': '5.2 MB'
-            },
-            {
-                'id': 'IS_002',
-                'title': 'Caractéristiques socio-économiques des migrants ultramarins',
-                'period': '1968-1982',
-                'variables': ['niveau d\'étude', 'secteur d\'emploi', 'salaire', 'logement', 'intégration'],
-                'description': 'Données sur les conditions de vie et d\'emploi',
-                'url': 'https://www.insee.fr/fr/statistiques/2012713',
-                'format': 'CSV',
-                'size': '3.8 MB'
-            },
-            {
-                'id': 'IS_003',
-                'title': 'Impact démographique des migrations DOM-TOM',
-                'period': '1975-1990',
-                'variables': ['natalité', 'mortalité', 'composition familiale', 'localisation'],
-                'description': 'Impact à long terme des migrations',
-                'url': 'https://www.insee.fr/fr/statistiques/2012714',
-                'format': 'CSV',
-                'size': '2.1 MB'
-            }
-        ]
-    },
-    
-    # Archive.org - Sites web historiques
-    'archive_org': {
-        'name': 'Archive.org',
-        'color': '#8c564b',
-        'icon': '🌐',
-        'websites': [
-            {
-                'id': 'AO_001',
-                'title': 'Site de documentation sur le BUMIDOM',
-                'date': '2005-2010',
-                'url': 'https://web.archive.org/web/*/bumidom.fr',
-                'snapshots': 24,
-                'description': 'Archives d\'un site d\'information sur le BUMIDOM',
-                'themes': ['documentation', 'histoire', 'mémoire']
-            },
-            {
-                'id': 'AO_002',
-                'title': 'Articles universitaires sur les migrations ultramarines',
-                'date': '1998-2015',
-                'url': 'https://web.archive.org/web/*/migrations-dom-tom',
-                'snapshots': 42,
-                'description': 'Archives de sites universitaires traitant des migrations',
-                'themes': ['recherche', 'université', 'études']
-            }
-        ]
-    },
-    
-    # ANOM - Archives Nationales d'Outre-mer
-    'anom': {
-        'name': 'Archives Nationales d\'Outre-mer',
-        'color': '#e377c2',
-        'icon': '🏝️',
-        'documents': [
-            {
-                'id': 'ANOM_001',
-                'title': 'Archives des préfectures des DOM relatives aux migrations',
-                'date': '1958-1985',
-                'cote': 'Série géographique',
-                'type': 'Documents administratifs',
-                'location': 'Aix-en-Provence',
-                'description': 'Documents des préfectures concernant l\'organisation des départs',
-                'url': 'https://www.archivesnationales.culture.gouv.fr/anom/fr/',
-                'keywords': ['préfectures', 'organisation', 'départ'],
-                'status': 'Communicable'
-            }
-        ]
-    }
-}
+@st.cache_resource
+def get_shared_corpus():
+    """Corpus partagé par toutes les sessions du serveur (un seul exemplaire par processus)"""
+    # Les ajouts manuels des sessions précédentes sont rejoués depuis le journal
+    return SharedCorpus(seed_archives(), AppendLog())
+
+@st.cache_resource
+def get_harvest_jobs():
+    """Collectes en cours ou terminées, par recherche (partagées par toutes les sessions)"""
+    return {}
+
+def start_harvest(query, workers, rate, max_records):
+    """Lance la collecte d'une recherche Gallica en arrière-plan (une seule à la fois par recherche)"""
+    corpus = get_shared_corpus()
+    source = GallicaSRU(query)
+    jobs = get_harvest_jobs()
+    job = jobs.get(source.key)
+    if job is not None and job.running:
+        return job
+    job = Harvester(source, corpus_sink(corpus, source), workers=workers, rate=rate,
+                    known_ids=corpus_ids(corpus.snapshot().archives, source))
+    job.running = True
+    jobs[source.key] = job
+    threading.Thread(target=job.run, args=(max_records,), daemon=True).start()
+    return job
+
+# Instantané épinglé pour toute l'exécution : lu sans copie, jamais modifié
+snapshot = get_shared_corpus().snapshot()
+BUMIDOM_ARCHIVES = snapshot.archives
 
 # ============================================================================
 # FONCTIONS D'ANALYSE
 # ============================================================================
 
-def get_all_documents():
-    """Récupère tous les documents de toutes les sources"""
-    all_docs = []
-    
-    for source_id, source_data in BUMIDOM_ARCHIVES.items():
-        for doc_type in ['documents', 'articles', 'videos', 'datasets', 'websites']:
-            if doc_type in source_data:
-                for doc in source_data[doc_type]:
-                    doc_entry = doc.copy()
-                    doc_entry['source_id'] = source_id
-                    doc_entry['source_name'] = source_data['name']
-                    doc_entry['source_color'] = source_data['color']
-                    doc_entry['source_icon'] = source_data['icon']
-                    doc_entry['doc_type'] = doc_type[:-1]  # Remove 's'
-                    all_docs.append(doc_entry)
-    
-    return pd.DataFrame(all_docs)
-
-def analyze_temporal_distribution(df):
-    """Analyse la distribution temporelle des documents"""
-    # Extraire l'année de début
-    df['year'] = df['date'].apply(lambda x: int(str(x)[:4]) if str(x)[:4].isdigit() else None)
-    
-    # Filtrer les années valides
-    valid_years = df[df['year'].notna() & (df['year'] >= 1960) & (df['year'] <= 1990)]
-    
-    return valid_years.groupby(['year', 'source_name']).size().reset_index(name='count')
-
-def analyze_sentiment_trends():
-    """Analyse les tendances de sentiment dans la presse"""
-    articles = BUMIDOM_ARCHIVES['retronews']['articles']
-    
-    sentiment_data = []
-    for article in articles:
-        year = int(article['date'][:4])
-        sentiment = article['sentiment']
-        
-        # Convertir en valeur numérique
-        sentiment_value = {
-            'positif': 1,
-            'neutre': 0,
-            'négatif': -1
-        }.get(sentiment, 0)
-        
-        sentiment_data.append({
-            'year': year,
-            'sentiment': sentiment_value,
-            'newspaper': article['newspaper'],
-            'title': article['title']
-        })
+# Les données dérivées sont attachées à l'instantané : calculées une fois pour
+# toutes les sessions, libérées avec lui. Elles sont partagées en lecture seule.
+# Elles sont déclarées dans un graphe de dépendances : après un ajout de
+# notices, les compteurs, histogrammes et index incrémentaux ne traitent que
+# les nouvelles lignes du catalogue ; les autres sont reconstruits.
+
+graph = DependencyGraph()
+
+def get_compact_catalog():
+    """Catalogue compact : arène UTF-8 pour les textes, dictionnaires pour les valeurs répétées"""
+    return snapshot.catalog
+
+@graph.artifact('duplicate_clusters')
+def build_duplicate_clusters(snapshot):
+    # Les descriptions sont rédigées par chaque source : seul le titre est comparé
+    return DuplicateClusters.from_texts(record.get('title') or '' for record in snapshot.catalog)
+
+@build_duplicate_clusters.incremental
+def update_duplicate_clusters(clusters, snapshot, rows):
+    return clusters.extend(snapshot.catalog.record(row).get('title') or '' for row in rows)
+
+@graph.artifact('year_index')
+def build_year_index(snapshot):
+    return YearIndex.from_catalog(snapshot.catalog)
+
+@build_year_index.incremental
+def update_year_index(index, snapshot, rows):
+    return index.extend(snapshot.catalog, rows)
+
+def get_year_index():
+    """Intervalles [début, fin] des années couvertes par chaque notice"""
+    return graph.get(snapshot, 'year_index')
+
+def period_mask(snapshot, period):
+    """Lignes dont la période recoupe period = (début, fin) ; toutes si period est None"""
+    if period is None:
+        return np.ones(len(snapshot.catalog), dtype=bool)
+    return graph.get(snapshot, 'year_index').mask(*period)
+
+def counted_rows(snapshot, collapse_duplicates, period=None):
+    """Masque des lignes comptées : toutes ou les représentants des grappes de quasi-doublons, dans la période"""
+    mask = period_mask(snapshot, period)
+    if collapse_duplicates:
+        mask = mask & graph.get(snapshot, 'duplicate_clusters').representatives
+    return mask
+
+@graph.artifact('documents', inputs=('duplicate_clusters', 'year_index'))
+def build_documents(snapshot, columns, collapse_duplicates, period):
+    df = snapshot.catalog.to_dataframe(list(columns) or None)
+    if collapse_duplicates or period is not None:
+        df = df[counted_rows(snapshot, collapse_duplicates, period)]
+    return df
+
+def get_all_documents(columns=None, collapse_duplicates=False, period=None):
+    """Récupère tous les documents de toutes les sources (un seul par grappe de quasi-doublons, dans la période si demandé)
+
+    L'index du DataFrame est la ligne du catalogue.
+    """
+    return graph.get(snapshot, 'documents', tuple(columns or ()), collapse_duplicates, period)
+
+def get_duplicate_clusters():
+    """Grappes de quasi-doublons du catalogue (MinHash + LSH sur les titres)"""
+    return graph.get(snapshot, 'duplicate_clusters')
+
+@graph.artifact('period_ids', inputs=('year_index',))
+def build_period_ids(snapshot, period):
+    ids = snapshot.catalog.columns['id']
+    return frozenset(ids[row] for row in np.flatnonzero(period_mask(snapshot, period)))
+
+def in_period(doc, period):
+    """Vrai si la notice recoupe la période du filtre (ou n'est pas datée) ; toujours vrai sans filtre"""
+    return period is None or doc.get('id') in graph.get(snapshot, 'period_ids', period)
+
+@graph.artifact('identifier_index')
+def build_identifier_index(snapshot):
+    return IdentifierIndex.from_catalog(snapshot.catalog)
+
+@build_identifier_index.incremental
+def update_identifier_index(index, snapshot, rows):
+    return index.extend(snapshot.catalog, rows)
+
+@graph.artifact('cote_index')
+def build_cote_index(snapshot):
+    return CoteIndex.from_catalog(snapshot.catalog)
+
+def search_cote(query):
+    """Identifiants des notices dont la cote recoupe la cote demandée ; None si la requête n'est pas une cote"""
+    rows = graph.get(snapshot, 'cote_index').search(query)
+    if rows is None:
+        return None
+    ids = snapshot.catalog.columns['id']
+    return {ids[row] for row in rows}
+
+def find_record(reference):
+    """Notice désignée par un identifiant, un ARK (avec ou sans 'ark:/12148/'), une cote ou une URL"""
+    row = graph.get(snapshot, 'identifier_index').resolve(reference)
+    return snapshot.catalog.record(row) if row is not None else None
+
+def build_masked_tally(snapshot, collapse_duplicates, period, tally):
+    mask = counted_rows(snapshot, collapse_duplicates, period)
+    return tally(snapshot, np.flatnonzero(mask)), mask
+
+def update_masked_tally(old, snapshot, rows, collapse_duplicates, period, tally):
+    """Ajoute les nouvelles lignes comptées ; corrige les lignes dont le statut de représentant a changé"""
+    counts, old_mask = old
+    mask = counted_rows(snapshot, collapse_duplicates, period)
+    rows = np.asarray(rows, dtype=np.int64)
+    changed = np.flatnonzero(old_mask != mask[:len(old_mask)])
+    added = np.concatenate([changed[mask[changed]], rows[mask[rows]]])
+    removed = changed[~mask[changed]]
+    return counts + tally(snapshot, added) - tally(snapshot, removed), mask
+
+@st.cache_resource
+def get_place_matcher():
+    """Automate du gazetier, compilé une fois par processus"""
+    return PlaceMatcher()
+
+def tally_places(snapshot, rows):
+    catalog = snapshot.catalog
+    return get_place_matcher().tally(catalog.record(row) for row in rows)
+
+@graph.artifact('place_counts', inputs=('duplicate_clusters', 'year_index'))
+def build_place_counts(snapshot, collapse_duplicates, period):
+    return build_masked_tally(snapshot, collapse_duplicates, period, tally_places)
+
+@build_place_counts.incremental
+def update_place_counts(old, snapshot, rows, collapse_duplicates, period):
+    return update_masked_tally(old, snapshot, rows, collapse_duplicates, period, tally_places)
+
+def get_place_counts(collapse_duplicates, period=None):
+    """Notices et occurrences par lieu du gazetier (lieu, description, extrait)"""
+    counts, _ = graph.get(snapshot, 'place_counts', collapse_duplicates, period)
+    return get_place_matcher().table(counts)
+
+def tally_cube(snapshot, rows):
+    """Cube d'agrégats des lignes données (axes communs à toute la version du catalogue)"""
+    year_index = graph.get(snapshot, 'year_index')
+    return AggregateCube.from_catalog(snapshot.catalog, year_index.starts, year_index.ends, rows)
+
+@graph.artifact('aggregate_cube', inputs=('duplicate_clusters', 'year_index'))
+def build_aggregate_cube(snapshot, collapse_duplicates):
+    return build_masked_tally(snapshot, collapse_duplicates, None, tally_cube)
+
+@build_aggregate_cube.incremental
+def update_aggregate_cube(old, snapshot, rows, collapse_duplicates):
+    return update_masked_tally(old, snapshot, rows, collapse_duplicates, None, tally_cube)
+
+def get_aggregate_cube(collapse_duplicates, period=None):
+    """Comptes source × type × année × statut × thème des notices comptées
+
+    Un seul cube par mode de dédoublonnage : la période en est une tranche.
+    """
+    cube, _ = graph.get(snapshot, 'aggregate_cube', collapse_duplicates)
+    return cube.during(*period) if period is not None else cube
+
+def get_year_histogram(collapse_duplicates, period=None):
+    """Nombre de documents par année de début et par source"""
+    histogram = get_aggregate_cube(collapse_duplicates, period).rollup('year', 'source')
+    histogram = histogram[histogram['year'] != UNDATED]
+    histogram.columns = ['year', 'source_name', 'count']
+    return histogram.sort_values(['year', 'source_name'], ignore_index=True)
+
+def duplicate_members(doc_id):
+    """Autres notices de la grappe de quasi-doublons d'une notice"""
+    fields = ['id', 'title', 'date', 'source_name']
+    clusters = get_duplicate_clusters()
+    row = graph.get(snapshot, 'identifier_index').resolve(doc_id) if clusters.n_duplicates else None
+    members = clusters.members(row) if row is not None else np.zeros(0, dtype=np.int64)
+    members = members[members != row]
+    # Seules les lignes de la grappe sont lues dans le catalogue
+    catalog = snapshot.catalog
+    return pd.DataFrame(
+        {field: [catalog.columns[field][member] for member in members] for field in fields},
+        index=members
+    )
+
+def show_duplicate_note(doc):
+    """Signale dans l'exploreur les autres sources référençant le même document"""
+    others = duplicate_members(doc.get('id'))
+    if not others.empty:
+        st.info("🧬 Quasi-doublon de : " + " ; ".join(
+            f"{row.source_name} – {row.title} ({row.date})" for row in others.itertuples()
+        ))
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache des figures sérialisées, partagé par toutes les sessions"""
+    return FigureCache()
+
+def cached_figure(chart_id, builder, **filters):
+    """Figure mise en cache par (graphique, version du catalogue, état des filtres)"""
+    large_data = st.session_state.get('large_data_mode', True)
+    collapse = st.session_state.get('collapse_duplicates', True)
+    period = st.session_state.get('period_filter')
+    
+    def build():
+        fig = builder()
+        # Mode grands volumes : sous-échantillonnage serveur et traces WebGL
+        return optimize_figure(fig) if large_data else fig
+    
+    return get_figure_cache().get_or_build(
+        chart_id, get_compact_catalog().version, dict(filters, large_data=large_data, collapse=collapse, period=period), build
+    )
+
+@graph.artifact('press_store')
+def build_press_store(snapshot):
+    return PressStore.from_catalog(snapshot.catalog)
+
+@build_press_store.incremental
+def update_press_store(store, snapshot, rows):
+    return store.extend(snapshot.catalog, rows)
+
+def press_articles(snapshot, period):
+    """Articles du magasin de presse dont la période recoupe period"""
+    store = graph.get(snapshot, 'press_store')
+    if period is None:
+        return store
+    return store.select(period_mask(snapshot, period)[store.rows])
+
+@graph.artifact('press_coverage', inputs=('press_store', 'year_index'))
+def build_press_coverage(snapshot, period, resolution):
+    return press_articles(snapshot, period).coverage(resolution)
+
+def get_press_coverage(period, resolution):
+    """Volume, part en une, longueur et thèmes par journal × période"""
+    return graph.get(snapshot, 'press_coverage', period, resolution)
+
+@graph.artifact('sentiment_series', inputs=('press_store', 'year_index'))
+def build_sentiment_series(snapshot, period):
+    """Articles de presse datés et étiquetés de la période"""
+    articles = press_articles(snapshot, period)
+    return SentimentSeries.from_values(articles.dates, articles.sentiment_labels(), articles.newspaper_labels())
+
+@graph.artifact('sentiment_trend', inputs=('sentiment_series',))
+def build_sentiment_trend(snapshot, period, resolution, method, window):
+    # La série de la période est elle-même lue dans le cache de l'instantané
+    return graph.get(snapshot, 'sentiment_series', period).trend(resolution, method, window)
+
+@graph.artifact('sentiment_summary', inputs=('sentiment_series',))
+def build_sentiment_summary(snapshot, period):
+    return graph.get(snapshot, 'sentiment_series', period).summary()
+
+def get_sentiment_trend(period, resolution, method, window):
+    """Sentiment lissé par journal et pour l'ensemble, avec bande bootstrap (mis en cache par filtre)"""
+    return graph.get(snapshot, 'sentiment_trend', period, resolution, method, window)
+
+def get_sentiment_summary(period=None):
+    """Sentiment moyen par journal, avec intervalle bootstrap"""
+    return graph.get(snapshot, 'sentiment_summary', period)
+
+@graph.artifact('video_store')
+def build_video_store(snapshot):
+    return VideoStore.from_catalog(snapshot.catalog)
+
+@build_video_store.incremental
+def update_video_store(store, snapshot, rows):
+    return store.extend(snapshot.catalog, rows)
+
+@graph.artifact('video_clips', inputs=('video_store', 'year_index'))
+def build_video_clips(snapshot, period):
+    store = graph.get(snapshot, 'video_store')
+    if period is None:
+        return store
+    return store.select(period_mask(snapshot, period)[store.rows])
+
+def get_video_clips(period=None):
+    """Vidéos de la période : durées en secondes, index triés sur la date et la durée"""
+    return graph.get(snapshot, 'video_clips', period)
+
+# Formats colonnaires de l'export (libellé → format d'arrow_export)
+COLUMNAR_FORMATS = {'Parquet': 'parquet', 'Arrow IPC': 'arrow'}
+
+# Taille maximale d'une archive téléchargée depuis l'interface (au-delà : arrow_export.py)
+MAX_EXPORT_BYTES = 200 * 1024 * 1024
+
+# Archives d'export en attente de téléchargement ; supprimées à l'export suivant, ou après EXPORT_MAX_AGE
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'bumidom_exports')
+EXPORT_MAX_AGE = timedelta(hours=1)
+
+# Table exportée pour chaque choix de l'export, avec le type de document retenu
+CATALOG_EXPORTS = {
+    "Liste complète des archives": ('catalogue', None),
+    "Documents administratifs": ('documents', 'document'),
+    "Archives audiovisuelles": ('videos', 'video'),
+}
+
+def discard_export_archives():
+    """Supprime l'archive précédente de la session, et celles des sessions terminées (plus anciennes que EXPORT_MAX_AGE)"""
+    path = st.session_state.pop('export_archive', None)
+    if path is not None and os.path.exists(path):
+        os.remove(path)
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    expired = datetime.now().timestamp() - EXPORT_MAX_AGE.total_seconds()
+    for name in os.listdir(EXPORT_DIR):
+        stale = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(stale) < expired:
+                os.remove(stale)
+        except FileNotFoundError:
+            # Supprimée entre-temps par une autre session
+            pass
+
+def export_archive_reader(path):
+    """Données du bouton de téléchargement, lues sur disque à chaque clic (fichier conservé jusqu'à l'export suivant)"""
+    def read():
+        with open(path, 'rb') as archive_file:
+            return archive_file.read()
+    return read
+
+def columnar_tables(options, collapse_duplicates, period):
+    """Tables (schéma, lots) de l'export Parquet / Arrow pour les données choisies"""
+    catalog = snapshot.catalog
+    rows = np.flatnonzero(counted_rows(snapshot, collapse_duplicates, period))
+    doc_types = catalog.columns['doc_type']
+    tables = {}
+    for option, (name, doc_type) in CATALOG_EXPORTS.items():
+        if option not in options:
+            continue
+        selected = rows
+        if doc_type is not None:
+            code = doc_types.values.index(doc_type) if doc_type in doc_types.values else -2
+            selected = rows[doc_types.codes[rows] == code]
+        tables[name] = catalog_batches(catalog, selected)
+    if "Articles de presse" in options:
+        tables['articles'] = press_batches(press_articles(snapshot, period), catalog)
+    if "Analyses thématiques" in options:
+        for name, frame in cube_frames(get_aggregate_cube(collapse_duplicates, period)).items():
+            tables[name] = frame_batches(frame)
+    if "Métadonnées des sources" in options:
+        tables['sources'] = frame_batches(pd.DataFrame([
+            {'source_id': source_id, 'nom': source['name'], 'couleur': source['color'], 'icone': source['icon']}
+            for source_id, source in BUMIDOM_ARCHIVES.items()
+        ]))
+    return tables
+
+def extract_keywords_analysis(period=None):
+    """Extrait et analyse les mots-clés de toutes les sources (notices de la période si demandé)"""
+    # Totaux de la matrice documents-termes (même normalisation que la recherche)
+    dtm = get_document_term_matrix()
+    if period is None:
+        totals = graph.get(snapshot, 'keyword_counts')
+    else:
+        totals = dtm.term_totals(period_mask(snapshot, period))
+    top_terms = np.argsort(-totals, kind='stable')[:30]
     
-    return pd.DataFrame(sentiment_data)
+    return pd.DataFrame({
+        'mot': [dtm.display[t] for t in top_terms],
+        'fréquence': totals[top_terms]
+    })
 
-def extract_keywords_analysis():
-    """Extrait et analyse les mots-clés de toutes les sources"""
-    all_text = ""
+def evaluate_search(document, terms, logic, fields, cote_matches=None):
+    """Évalue si un document correspond à la recherche (cote_matches : identifiants trouvés par cote, par terme)"""
+    cote_matches = cote_matches or {}
+    doc_text = ""
     
-    for source_id, source_data in BUMIDOM_ARCHIVES.items():
-        # Articles
-        if 'articles' in source_data:
-            for article in source_data['articles']:
-                all_text += article['extract'] + " "
-        
-        # Documents
-        if 'documents' in source_data:
-            for doc in source_data['documents']:
-                all_text += doc['title'] + " " + doc.get('description', '') + " "
-                if 'keywords' in doc:
-                    all_text += " ".join(doc['keywords']) + " "
-        
-        # Vidéos
-        if 'videos' in source_data:
-            for video in source_data['videos']:
-                all_text += video['title'] + " " + video.get('description', '') + " "
+    if "Tous les champs" in fields or "Titre" in fields:
+        doc_text += document.get('title', '') + " "
+    
+    if "Tous les champs" in fields or "Description" in fields:
+        doc_text += document.get('description', '') + " "
     
-    # Nettoyer et compter les mots
-    words = re.findall(r'\b\w+\b', all_text.lower())
+    if "Tous les champs" in fields or "Contenu" in fields:
+        doc_text += document.get('extract', '') + " "
     
-    # Stopwords français
-    stopwords = ['le', 'la', 'les', 'de', 'des', 'du', 'et', 'en', 'à', 'au', 'aux', 
-                 'dans', 'pour', 'par', 'sur', 'avec', 'son', 'ses', 'leur', 'leurs',
-                 'un', 'une', 'ce', 'cette', 'ces', 'dont', 'qui', 'que', 'quoi',
-                 'est', 'sont', 'était', 'ont', 'a', 'as', 'avoir', 'faire']
+    if "Tous les champs" in fields or "Mots-clés" in fields:
+        doc_text += " ".join(document.get('keywords', [])) + " "
+        doc_text += " ".join(document.get('themes', [])) + " "
     
-    filtered_words = [w for w in words if w not in stopwords and len(w) > 3]
+    doc_stems = tokenize(doc_text)
+    matches = [
+        document.get('id') in cote_matches[term] if cote_matches.get(term) is not None
+        else contains_phrase(doc_stems, tokenize(term))
+        for term in terms
+    ]
     
-    word_counts = Counter(filtered_words)
-    return pd.DataFrame(word_counts.most_common(30), columns=['mot', 'fréquence'])
+    if logic == "ET (tous les termes)":
+        return all(matches)
+    else:  # OU
+        return any(matches)
+
+def calculate_score(document, terms, cote_matches=None):
+    """Calcule un score de pertinence pour un document"""
+    cote_matches = cote_matches or {}
+    doc_stems = tokenize(f"{document.get('title', '')} {document.get('description', '')} {document.get('extract', '')}")
+    title_stems = tokenize(document.get('title', ''))
+    
+    score = 0
+    for term in terms:
+        # Une cote qui désigne le fonds vaut une occurrence dans le titre
+        if cote_matches.get(term) is not None:
+            score += 3 if document.get('id') in cote_matches[term] else 0
+            continue
+        term_stems = tokenize(term)
+        if contains_phrase(doc_stems, term_stems):
+            # Plus de points si le terme est dans le titre
+            if contains_phrase(title_stems, term_stems):
+                score += 3
+            # Moins de points si seulement dans le contenu
+            else:
+                score += 1
+    
+    # Normaliser le score entre 0 et 10
+    max_score = len(terms) * 3
+    if max_score > 0:
+        score = min(10, (score / max_score) * 10)
+    
+    return score
 
 def create_source_network():
     """Crée un réseau des relations entre sources et thèmes"""
@@ -483,6 +578,309 @@ def create_source_network():
     
     return G, themes
 
+@graph.artifact('theme_matrix')
+def build_theme_matrix(snapshot, level):
+    return ThemeMatrix.from_catalog(snapshot.catalog, level)
+
+def get_theme_matrix(level):
+    """Bitsets de thèmes par source ou sous-collection (un calcul par version du catalogue)"""
+    return graph.get(snapshot, 'theme_matrix', level)
+
+def record_text(record):
+    """Texte d'une notice pris en compte par les analyses textuelles"""
+    parts = [record.get('title'), record.get('description'), record.get('extract')]
+    for field in ('keywords', 'themes', 'topics'):
+        parts.extend(record.get(field) or [])
+    return " ".join(filter(None, parts))
+
+@graph.artifact('document_term_matrix')
+def build_document_term_matrix(snapshot):
+    return DocumentTermMatrix.from_texts(record_text(record) for record in snapshot.catalog)
+
+@build_document_term_matrix.incremental
+def update_document_term_matrix(dtm, snapshot, rows):
+    return dtm.append_texts(record_text(snapshot.catalog.record(row)) for row in rows)
+
+@graph.artifact('keyword_counts', inputs=('document_term_matrix',))
+def build_keyword_counts(snapshot):
+    return graph.get(snapshot, 'document_term_matrix').term_totals()
+
+@build_keyword_counts.incremental
+def update_keyword_counts(totals, snapshot, rows):
+    # Les lignes ajoutées sont en fin de matrice : seules leurs entrées sont sommées
+    dtm = graph.get(snapshot, 'document_term_matrix')
+    start = dtm.indptr[rows.start]
+    added = np.bincount(dtm.indices[start:], weights=dtm.data[start:], minlength=dtm.shape[1])
+    return np.pad(totals, (0, dtm.shape[1] - len(totals))) + added.astype(np.int64)
+
+def get_document_term_matrix():
+    """Matrice documents-termes creuse du catalogue"""
+    return graph.get(snapshot, 'document_term_matrix')
+
+@graph.artifact('source_vocabulary', inputs=('document_term_matrix', 'year_index'))
+def build_source_vocabulary(snapshot, method, period):
+    sources = snapshot.catalog.columns['source_name']
+    # Les notices hors période (groupe -1) ne sont pas comptées
+    codes = np.where(period_mask(snapshot, period), sources.codes, -1)
+    return top_terms_by_group(graph.get(snapshot, 'document_term_matrix'), codes, sources.values, method)
+
+def get_source_vocabulary(method, period=None):
+    """Termes caractéristiques de chaque source (TF-IDF ou log-odds)"""
+    return graph.get(snapshot, 'source_vocabulary', method, period)
+
+@st.cache_resource
+def load_ocr_corpus():
+    """Ouvre le corpus OCR plein texte (fichiers memory-mappés, partagés entre sessions)
+
+    Les segments d'une ancienne version de l'analyseur sont réindexés en arrière-plan.
+    """
+    corpus = OcrCorpus()
+    if corpus.stale:
+        start_ocr_reindex(corpus.corpus_dir)
+    return corpus
+
+@st.cache_resource
+def start_ocr_reindex(corpus_dir):
+    """Réindexation des segments OCR périmés, lancée une fois par serveur ; error : échec éventuel"""
+    job = {'error': None}
+    def run():
+        try:
+            reindex_corpus(corpus_dir)
+        except Exception as error:
+            job['error'] = error
+        else:
+            # Les segments réindexés sont interrogés au prochain chargement du corpus
+            load_ocr_corpus.clear()
+    job['thread'] = threading.Thread(target=run, daemon=True)
+    job['thread'].start()
+    return job
+
+def period_label(date):
+    """Décennie d'une date ou d'une période (« 1960-1969 »)"""
+    year = str(date or '')[:4]
+    if not year.isdigit():
+        return None
+    decade = int(year) // 10 * 10
+    return f"{decade}-{decade + 9}"
+
+def collocation_groups(record):
+    groups = [('source', record.get('source_name')), ('period', period_label(record.get('date')))]
+    return [group for group in groups if group[1] is not None]
+
+def record_collocation_documents(catalog, rows):
+    for row in rows:
+        record = catalog.record(row)
+        texts = [record.get('title'), record.get('description'), record.get('extract')]
+        texts.extend(record.get('keywords') or [])
+        yield texts, collocation_groups(record)
+
+@graph.artifact('collocations')
+def build_collocations(snapshot):
+    """Compteur des notices, et pages OCR ajoutées depuis par get_collocations
+
+    La valeur est une case {'latest': (compteur, segments OCR lus)} : un ajout
+    de pages y publie un nouveau compteur, celui déjà remis aux sessions
+    n'est jamais modifié.
+    """
+    catalog = snapshot.catalog
+    counter = CollocationCounter().add_documents(record_collocation_documents(catalog, range(len(catalog))))
+    return {'latest': (counter, frozenset())}
+
+@build_collocations.incremental
+def update_collocations(old, snapshot, rows):
+    # Nouveau compteur prolongé des seules notices ajoutées ; l'instantané précédent garde le sien
+    counter, ocr_segments = old['latest']
+    return {'latest': (counter.extend(record_collocation_documents(snapshot.catalog, rows)), ocr_segments)}
+
+@st.cache_resource
+def get_collocations_lock():
+    return threading.Lock()
+
+def ocr_collocation_documents(corpus, segments, catalog, identifiers):
+    for ark, _, text in corpus.iter_pages(segments):
+        row = identifiers.resolve(ark)
+        if row is not None:
+            yield text, collocation_groups(catalog.record(row))
+
+def get_collocations():
+    """Collocations par source et par période (notices et pages OCR, chacune lue une seule fois)
+
+    Les segments OCR écrits depuis la dernière lecture sont ajoutés à un
+    nouveau compteur, publié pour l'instantané courant ; une page dont l'ARK
+    n'est pas encore au catalogue à ce moment-là n'est pas reprise ensuite.
+    """
+    cell = graph.get(snapshot, 'collocations')
+    corpus = load_ocr_corpus()
+    with get_collocations_lock():
+        counter, ocr_segments = cell['latest']
+        new_segments = [segment for segment in corpus.segments if segment.name not in ocr_segments]
+        if new_segments:
+            counter = counter.extend(ocr_collocation_documents(
+                corpus, new_segments, snapshot.catalog, graph.get(snapshot, 'identifier_index')
+            ))
+            cell['latest'] = (counter, ocr_segments | {segment.name for segment in new_segments})
+    return counter
+
+# ============================================================================
+# FONCTIONS AUXILIAIRES
+# ============================================================================
+
+def generate_report(report_type, sections):
+    """Génère un rapport sur les archives"""
+    
+    # Statistiques
+    total_docs = len(get_compact_catalog())
+    total_sources = len(BUMIDOM_ARCHIVES)
+    
+    report = f"""
+    RAPPORT SUR LES ARCHIVES DU BUMIDOM
+    ===================================
+    
+    Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}
+    Type de rapport: {report_type}
+    
+    """
+    
+    if "Introduction" in sections:
+        report += """
+        INTRODUCTION
+        ------------
+        
+        Ce rapport présente une analyse des archives disponibles concernant le 
+        Bureau des migrations des départements d'outre-mer (BUMIDOM), organisme 
+        qui a fonctionné de 1963 à 1982. L'analyse couvre l'ensemble des sources 
+        documentaires disponibles en ligne et en accès physique.
+        
+        """
+    
+    if "Résultats" in sections:
+        report += f"""
+        RÉSULTATS
+        ---------
+        
+        **Statistiques générales:**
+        - Nombre total de documents référencés: {total_docs}
+        - Nombre de sources différentes: {total_sources}
+        - Période couverte: 1962-1990
+        
+        **Répartition par type de document:**
+        - Documents administratifs: {len(BUMIDOM_ARCHIVES['archives_nationales']['documents'])}
+        - Articles de presse: {len(BUMIDOM_ARCHIVES['retronews']['articles'])}
+        - Archives audiovisuelles: {len(BUMIDOM_ARCHIVES['ina']['videos'])}
+        - Jeux de données: {len(BUMIDOM_ARCHIVES['insee']['datasets'])}
+        
+        """
+    
+    if "Analyses" in sections:
+        report += """
+        ANALYSES
+        --------
+        
+        **Principaux thèmes identifiés:**
+        1. Administration et gouvernance
+        2. Conditions de logement
+        3. Intégration professionnelle
+        4. Statistiques migratoires
+        5. Polémiques et débats
+        
+        **Tendances temporelles:**
+        - 1963-1970: Période de création et d'organisation
+        - 1970-1975: Pic d'activité et premières critiques
+        - 1975-1982: Réorientations et préparation de la dissolution
+        
+        **Sources les plus riches:**
+        1. Archives Nationales (documents officiels)
+        2. RetroNews (couverture médiatique)
+        3. INSEE (données statistiques)
+        
+        """
+    
+    if "Conclusion" in sections:
+        report += """
+        CONCLUSION
+        ----------
+        
+        Les archives du BUMIDOM constituent un corpus documentaire riche et varié,
+        permettant d'étudier cette institution sous de multiples angles :
+        administratif, médiatique, statistique et audiovisuel.
+        
+        **Points forts:**
+        - Diversité des sources
+        - Couverture temporelle complète
+        - Accès en ligne pour une grande partie des documents
+        
+        **Limites identifiées:**
+        - Inégalité d'accès selon les sources
+        - Nécessité de déplacements pour certaines archives
+        - Fragmentation des informations
+        
+        **Recommandations:**
+        1. Numérisation complémentaire des archives physiques
+        2. Mise en place d'un portail unifié
+        3. Développement d'outils d'analyse spécifiques
+        
+        """
+    
+    if "Bibliographie" in sections:
+        report += """
+        BIBLIOGRAPHIE
+        -------------
+        
+        **Sources principales:**
+        - Archives Nationales (site de Pierrefitte-sur-Seine)
+        - RetroNews - Bibliothèque nationale de France
+        - Gallica - Bibliothèque nationale de France
+        - Institut national de l'audiovisuel (INA)
+        - Institut national de la statistique et des études économiques (INSEE)
+        - Archives Nationales d'Outre-mer (ANOM)
+        - Internet Archive (Archive.org)
+        
+        **Ressources complémentaires:**
+        - Centre des archives contemporaines
+        - Archives départementales des DOM
+        - Bibliothèques universitaires spécialisées
+        
+        """
+    
+    return report
+
+def get_report_figures(collapse_duplicates, period):
+    """Graphiques du rapport PDF, lus dans le cache des figures"""
+    cube = get_aggregate_cube(collapse_duplicates, period)
+    sources = cube.rollup('source')
+    years = cube.rollup('year')
+    years = years[years['year'] != UNDATED]
+    return [
+        cached_figure('report_sources_bar', lambda: px.bar(
+            sources, x='count', y='source', orientation='h', title='Nombre de documents par source',
+            labels={'count': 'Documents', 'source': 'Source'}
+        )),
+        cached_figure('report_years_bar', lambda: px.bar(
+            years, x='year', y='count', title='Documents par année',
+            labels={'count': 'Documents', 'year': 'Année'}
+        )),
+    ]
+
+def start_pdf_report(report_type, sections, collapse_duplicates, period):
+    """Lance la génération du rapport PDF en arrière-plan (une tâche par session)"""
+    previous = st.session_state.get('report_job')
+    if previous is not None and not previous.done:
+        return previous
+    if previous is not None and os.path.exists(previous.path):
+        os.remove(previous.path)
+    handle, path = tempfile.mkstemp(suffix='.pdf')
+    os.close(handle)
+    job = ReportJob(
+        path,
+        f"Archives du BUMIDOM – {report_type}",
+        generate_report(report_type, sections),
+        get_report_figures(collapse_duplicates, period),
+        snapshot.catalog,
+        np.flatnonzero(counted_rows(snapshot, collapse_duplicates, period))
+    ).start()
+    st.session_state['report_job'] = job
+    return job
+
 # ============================================================================
 # INTERFACE PRINCIPALE
 # ============================================================================
@@ -499,7 +897,7 @@ with st.sidebar:
     page = st.radio(
         "Sélectionnez une section",
         ["📊 Vue d'ensemble", "🔍 Exploreur d'archives", "📈 Analyses thématiques", 
-         "🕰️ Chronologie", "🧮 Outils de recherche", "📥 Export & Rapport"]
+         "📰 Couverture presse", "🕰️ Chronologie", "🧮 Outils de recherche", "📥 Export & Rapport"]
     )
     
     st.markdown("---")
@@ -513,11 +911,14 @@ with st.sidebar:
         default=[source['name'] for source in BUMIDOM_ARCHIVES.values()]
     )
     
-    # Filtre par période
+    # Filtre par période : recoupement avec la période de chaque notice, sur toutes les pages
+    year_bounds = get_year_index().bounds or (1960, 1990)
     year_range = st.slider(
         "Période",
-        1960, 1990, (1960, 1990)
+        year_bounds[0], year_bounds[1], year_bounds
     )
+    period_filter = None if tuple(year_range) == tuple(year_bounds) else tuple(year_range)
+    st.session_state['period_filter'] = period_filter
     
     # Filtre par type de document
     doc_types = st.multiselect(
@@ -526,25 +927,38 @@ with st.sidebar:
         default=["Procès-verbaux", "Articles", "Vidéos", "Données", "Rapports"]
     )
     
+    st.toggle(
+        "⚡ Mode grands volumes",
+        value=True,
+        key='large_data_mode',
+        help=f"Au-delà de {DEFAULT_POINT_THRESHOLD} points, les séries sont sous-échantillonnées "
+             "en préservant leur forme et affichées en WebGL."
+    )
+    
+    collapse_duplicates = st.toggle(
+        "🧬 Fusionner les quasi-doublons",
+        value=True,
+        key='collapse_duplicates',
+        help="Un document référencé par plusieurs sources n'est compté et exporté qu'une fois."
+    )
+    
     st.markdown("---")
     
     st.markdown("### 📊 Statistiques rapides")
     
-    all_docs_df = get_all_documents()
-    total_docs = len(all_docs_df)
+    # Comptes des métriques et graphiques lus dans le cube d'agrégats
+    cube = get_aggregate_cube(collapse_duplicates, period_filter)
+    total_docs = cube.total()
     total_sources = len(BUMIDOM_ARCHIVES)
+    duplicate_count = get_duplicate_clusters().n_duplicates
     
-    st.metric("Documents référencés", total_docs)
+    st.metric("Documents référencés", total_docs,
+              f"-{duplicate_count} quasi-doublon(s)" if collapse_duplicates and duplicate_count else None,
+              delta_color="off")
     st.metric("Sources différentes", total_sources)
     
     # Calcul de la période couverte
-    years = []
-    for source in BUMIDOM_ARCHIVES.values():
-        for doc in source.get('documents', []):
-            if 'date' in doc:
-                year_str = str(doc['date'])
-                if year_str[:4].isdigit():
-                    years.append(int(year_str[:4]))
+    years = [year for year in cube.rollup('year')['year'] if year != UNDATED]
     
     if years:
         st.metric("Période couverte", f"{max(years)-min(years)} ans", f"{min(years)}-{max(years)}")
@@ -560,7 +974,7 @@ if page == "📊 Vue d'ensemble":
     
     with col1:
         # Total par type
-        types_count = all_docs_df['doc_type'].value_counts()
+        types_count = cube.rollup('doc_type').set_index('doc_type')['count']
         st.metric("Documents textuels", 
                  types_count.get('document', 0) + types_count.get('article', 0))
     
@@ -574,36 +988,37 @@ if page == "📊 Vue d'ensemble":
     
     with col4:
         # Documents consultables en ligne
-        online_count = len([doc for doc in all_docs_df.to_dict('records') 
-                          if 'url' in doc and doc['url']])
+        online_count = cube.total('online')
         st.metric("Consultables en ligne", online_count, 
-                 f"{online_count/total_docs*100:.0f}%")
+                 f"{online_count/total_docs*100:.0f}%" if total_docs else None)
     
     # Graphique 1: Répartition par source
     st.subheader("📦 Répartition des documents par source")
     
-    source_counts = all_docs_df['source_name'].value_counts().reset_index()
-    source_counts.columns = ['source', 'count']
-    
-    fig1 = px.pie(
-        source_counts,
-        values='count',
-        names='source',
-        color='source',
-        color_discrete_sequence=px.colors.qualitative.Set3,
-        hole=0.4,
-        title='Nombre de documents par source'
-    )
-    fig1.update_traces(textposition='inside', textinfo='percent+label')
-    st.plotly_chart(fig1, use_container_width=True)
+    def build_sources_pie():
+        source_counts = cube.rollup('source')
+        
+        fig1 = px.pie(
+            source_counts,
+            values='count',
+            names='source',
+            color='source',
+            color_discrete_sequence=px.colors.qualitative.Set3,
+            hole=0.4,
+            title='Nombre de documents par source'
+        )
+        fig1.update_traces(textposition='inside', textinfo='percent+label')
+        return fig1
+    
+    st.plotly_chart(cached_figure('overview_sources_pie', build_sources_pie), use_container_width=True)
     
     # Graphique 2: Évolution temporelle
     st.subheader("📅 Évolution temporelle des archives")
     
-    temporal_df = analyze_temporal_distribution(all_docs_df)
-    
-    if not temporal_df.empty:
-        fig2 = px.line(
+    def build_temporal_line():
+        temporal_df = get_year_histogram(collapse_duplicates, period_filter)
+        
+        return px.line(
             temporal_df,
             x='year',
             y='count',
@@ -612,7 +1027,8 @@ if page == "📊 Vue d'ensemble":
             title='Production documentaire par année et par source',
             labels={'year': 'Année', 'count': 'Nombre de documents', 'source_name': 'Source'}
         )
-        st.plotly_chart(fig2, use_container_width=True)
+    
+    st.plotly_chart(cached_figure('overview_temporal_line', build_temporal_line), use_container_width=True)
     
     # Tableau récapitulatif des sources
     st.subheader("📋 Tableau récapitulatif des sources")
@@ -642,22 +1058,32 @@ if page == "📊 Vue d'ensemble":
         hide_index=True
     )
     
-    # Carte des archives (simulée)
+    # Carte des lieux cités dans les notices
     st.subheader("🗺️ Localisation des archives")
     
-    archive_locations = {
-        'Archives Nationales (Pierrefitte)': {'lat': 48.924, 'lon': 2.361, 'docs': 1200},
-        'Archives Nationales d\'Outre-mer (Aix)': {'lat': 43.524, 'lon': 5.444, 'docs': 500},
-        'BnF (Paris)': {'lat': 48.833, 'lon': 2.375, 'docs': 800},
-        'INA (Bry-sur-Marne)': {'lat': 48.838, 'lon': 2.524, 'docs': 150}
-    }
-    
-    locations_df = pd.DataFrame([
-        {'nom': name, 'lat': loc['lat'], 'lon': loc['lon'], 'documents': loc['docs']}
-        for name, loc in archive_locations.items()
-    ])
+    place_counts = get_place_counts(collapse_duplicates, period_filter)
     
-    st.map(locations_df, size='documents', color='#FF0000')
+    if not place_counts.empty:
+        cluster_cell = st.select_slider(
+            "Regroupement des points",
+            options=[None, 0.5, 2.0, 10.0],
+            format_func=lambda cell: "Automatique" if cell is None else f"~{int(cell * 111)} km",
+            help="En automatique, les lieux proches sont regroupés dès que les points deviennent trop nombreux."
+        )
+        
+        locations_df = cluster_places(place_counts, cell_degrees=cluster_cell)
+        # Rayon des cercles (mètres) proportionnel à la racine du nombre de notices
+        locations_df['taille'] = np.sqrt(locations_df['documents']) * 40000
+        
+        st.map(locations_df, latitude='lat', longitude='lon', size='taille', color='#FF0000')
+        
+        st.dataframe(
+            place_counts.sort_values('documents', ascending=False)[['lieu', 'catégorie', 'documents', 'mentions']],
+            use_container_width=True,
+            hide_index=True
+        )
+    else:
+        st.info("Aucun lieu du gazetier n'est cité dans les notices.")
 
 # ============================================================================
 # PAGE 2: EXPLOREUR D'ARCHIVES
@@ -669,6 +1095,67 @@ elif page == "🔍 Exploreur d'archives":
     search_query = st.text_input("🔎 Rechercher dans les archives:", 
                                 placeholder="Entrez un mot-clé, un thème, une date...")
     
+    # Référence directe (identifiant, ARK, cote ou URL), saisie ou passée en lien (?ref=...)
+    reference = search_query or st.query_params.get('ref', '')
+    referenced = find_record(reference) if reference else None
+    if referenced is not None:
+        st.success(f"🔗 Référence reconnue : {referenced['source_icon']} {referenced['source_name']} – "
+                   f"{referenced['title']} ({referenced.get('date') or 'non daté'}) · `{referenced['id']}`")
+        if referenced.get('url'):
+            st.link_button("Ouvrir la notice", referenced['url'])
+    
+    # Cote d'archives (« 19880445/5 ») : fonds dont la plage contient l'article demandé
+    cote_ids = search_cote(search_query) if search_query else None
+    if cote_ids is not None:
+        cote_label = ", ".join(format_range(*cote_range) for cote_range in parse_cote(search_query))
+        if cote_ids:
+            st.info(f"📦 Cote {cote_label} : {len(cote_ids)} fonds correspondant(s)")
+        else:
+            st.warning(f"📦 Aucun fonds ne couvre la cote {cote_label}")
+    
+    # Grappes de documents référencés par plusieurs sources
+    duplicate_clusters = get_duplicate_clusters()
+    if duplicate_clusters.n_duplicates:
+        with st.expander(f"🧬 Quasi-doublons entre sources ({len(duplicate_clusters.clusters())} grappe(s))"):
+            st.dataframe(
+                duplicate_clusters.table(get_all_documents(['id', 'title', 'date', 'source_name'])),
+                use_container_width=True,
+                hide_index=True
+            )
+    
+    # Archives audiovisuelles : filtre de durée et métrage cumulé
+    video_ids = None
+    video_clips = get_video_clips(period_filter)
+    duration_bounds = video_clips.duration_bounds()
+    if 'Vidéos' in doc_types and duration_bounds is not None:
+        max_minutes = max(1, -(-duration_bounds[1] // 60))
+        duration_range = st.slider("⏱️ Durée des vidéos (minutes)", 0, max_minutes, (0, max_minutes))
+        if tuple(duration_range) != (0, max_minutes):
+            video_mask = video_clips.mask(duration_range[0] * 60, duration_range[1] * 60)
+            video_ids = {snapshot.catalog.columns['id'][row] for row in video_clips.rows[video_mask]}
+        else:
+            video_mask = None
+        
+        with st.expander("🎞️ Métrage audiovisuel"):
+            video_totals = video_clips.totals(video_mask)
+            col_v1, col_v2, col_v3 = st.columns(3)
+            col_v1.metric("Vidéos", video_totals['videos'])
+            col_v2.metric("Métrage total", format_duration(video_totals['footage']))
+            col_v3.metric("Durée moyenne", format_duration(round(video_totals['mean_duration'])))
+            
+            footage_group = st.radio("Métrage par", list(FOOTAGE_GROUPS), horizontal=True,
+                                     format_func=FOOTAGE_GROUPS.get)
+            footage = video_clips.footage(footage_group, video_mask)
+            footage_label = FOOTAGE_GROUPS[footage_group]
+            fig_footage = cached_figure(
+                'video_footage',
+                lambda: px.bar(footage, x=footage_label, y='minutes', hover_data=['vidéos'],
+                               title=f"Métrage par {footage_label.lower()} (minutes)",
+                               labels={'minutes': 'Minutes'}),
+                group=footage_group, duration=tuple(duration_range)
+            )
+            st.plotly_chart(fig_footage, use_container_width=True)
+    
     # Affichage par source
     for source_id, source_data in BUMIDOM_ARCHIVES.items():
         if source_data['name'] not in selected_sources:
@@ -681,12 +1168,14 @@ elif page == "🔍 Exploreur d'archives":
             st.markdown("**📄 Documents administratifs**")
             
             for doc in source_data['documents']:
+                if not in_period(doc, period_filter):
+                    continue
                 # Vérifier si le document correspond à la recherche
                 matches_search = True
                 if search_query:
-                    search_lower = search_query.lower()
                     doc_text = f"{doc.get('title', '')} {doc.get('description', '')} {' '.join(doc.get('keywords', []))}".lower()
-                    matches_search = search_lower in doc_text
+                    matches_search = doc.get('id') in cote_ids if cote_ids is not None else \
+                        matches_query(doc_text, search_query)
                 
                 if matches_search:
                     with st.expander(f"{doc['title']} ({doc['date']})"):
@@ -701,6 +1190,8 @@ elif page == "🔍 Exploreur d'archives":
                                 st.markdown("**Mots-clés:**")
                                 for kw in doc['keywords']:
                                     st.markdown(f"`{kw}`", unsafe_allow_html=True)
+                            
+                            show_duplicate_note(doc)
                         
                         with col_doc2:
                             st.metric("Pages", doc.get('pages', 'N/A'))
@@ -716,46 +1207,48 @@ elif page == "🔍 Exploreur d'archives":
             st.markdown("**📰 Articles de presse**")
             
             for article in source_data['articles']:
+                if not in_period(article, period_filter):
+                    continue
                 matches_search = True
                 if search_query:
-                    search_lower = search_query.lower()
                     article_text = f"{article.get('title', '')} {article.get('extract', '')}".lower()
-                    matches_search = search_lower in article_text
+                    matches_search = matches_query(article_text, search_query)
                 
                 if matches_search:
-                    # Vérifier l'année
-                    article_year = int(article['date'][:4]) if article['date'][:4].isdigit() else 0
-                    if year_range[0] <= article_year <= year_range[1]:
-                        with st.container(border=True):
-                            col_art1, col_art2 = st.columns([3, 1])
-                            
-                            with col_art1:
-                                st.markdown(f"**{article['title']}**")
-                                st.markdown(f"*{article['newspaper']} - {article['date']}*")
-                                st.write(article['extract'][:300] + "...")
-                                
-                                # Sentiment
-                                sentiment_color = {
-                                    'positif': '🟢',
-                                    'neutre': '🟡', 
-                                    'négatif': '🔴'
-                                }.get(article['sentiment'], '⚪')
-                                st.markdown(f"**Sentiment:** {sentiment_color} {article['sentiment']}")
+                    with st.container(border=True):
+                        col_art1, col_art2 = st.columns([3, 1])
+                        
+                        with col_art1:
+                            st.markdown(f"**{article['title']}**")
+                            st.markdown(f"*{article['newspaper']} - {article['date']}*")
+                            st.write(article['extract'][:300] + "...")
                             
-                            with col_art2:
-                                st.metric("Longueur", f"{article.get('length', 0)} mots")
-                                st.link_button("📖 Lire l'article", article['url'])
+                            # Sentiment
+                            sentiment_color = {
+                                'positif': '🟢',
+                                'neutre': '🟡', 
+                                'négatif': '🔴'
+                            }.get(article['sentiment'], '⚪')
+                            st.markdown(f"**Sentiment:** {sentiment_color} {article['sentiment']}")
+                            show_duplicate_note(article)
+                        
+                        with col_art2:
+                            st.metric("Longueur", f"{article.get('length', 0)} mots")
+                            st.link_button("📖 Lire l'article", article['url'])
         
         # Vidéos
         if 'videos' in source_data and 'Vidéos' in doc_types:
             st.markdown("**🎥 Archives audiovisuelles**")
             
             for video in source_data['videos']:
+                if not in_period(video, period_filter):
+                    continue
+                if video_ids is not None and video.get('id') not in video_ids:
+                    continue
                 matches_search = True
                 if search_query:
-                    search_lower = search_query.lower()
                     video_text = f"{video.get('title', '')} {video.get('description', '')}".lower()
-                    matches_search = search_lower in video_text
+                    matches_search = matches_query(video_text, search_query)
                 
                 if matches_search:
                     col_vid1, col_vid2 = st.columns([3, 1])
@@ -767,6 +1260,7 @@ elif page == "🔍 Exploreur d'archives":
                         
                         if 'themes' in video:
                             st.markdown("**Thèmes:** " + ", ".join(video['themes']))
+                        show_duplicate_note(video)
                     
                     with col_vid2:
                         st.metric("Durée", video['duration'])
@@ -777,6 +1271,8 @@ elif page == "🔍 Exploreur d'archives":
             st.markdown("**📈 Jeux de données**")
             
             for dataset in source_data['datasets']:
+                if not in_period(dataset, period_filter):
+                    continue
                 with st.expander(f"{dataset['title']} ({dataset['period']})"):
                     col_data1, col_data2 = st.columns([3, 1])
                     
@@ -804,106 +1300,208 @@ elif page == "📈 Analyses thématiques":
         st.subheader("Analyse textuelle des archives")
         
         # Nuage de mots interactif
-        keywords_df = extract_keywords_analysis()
-        
-        fig = px.bar(
-            keywords_df.head(20),
-            x='fréquence',
-            y='mot',
-            orientation='h',
-            title='Top 20 des mots les plus fréquents',
-            color='fréquence',
-            color_continuous_scale='Viridis'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        def build_keywords_bar():
+            keywords_df = extract_keywords_analysis(period_filter)
+            
+            return px.bar(
+                keywords_df.head(20),
+                x='fréquence',
+                y='mot',
+                orientation='h',
+                title='Top 20 des mots les plus fréquents',
+                color='fréquence',
+                color_continuous_scale='Viridis'
+            )
+        
+        st.plotly_chart(cached_figure('analysis_keywords_bar', build_keywords_bar), use_container_width=True)
         
         # Analyse par source
         st.subheader("Vocabulaire spécifique par source")
         
-        source_keywords = defaultdict(Counter)
+        keyness_method = st.radio(
+            "Mesure de spécificité",
+            list(KEYNESS_METHODS),
+            format_func=KEYNESS_METHODS.get,
+            horizontal=True
+        )
         
-        for source_id, source_data in BUMIDOM_ARCHIVES.items():
-            source_text = ""
-            
-            if 'articles' in source_data:
-                for article in source_data['articles']:
-                    source_text += article['extract'] + " "
-            
-            if 'documents' in source_data:
-                for doc in source_data['documents']:
-                    source_text += doc['title'] + " " + doc.get('description', '') + " "
-            
-            # Compter les mots
-            words = re.findall(r'\b\w+\b', source_text.lower())
-            stopwords = ['le', 'la', 'les', 'de', 'des', 'du', 'et', 'en']
-            filtered_words = [w for w in words if w not in stopwords and len(w) > 3]
-            
-            source_keywords[source_data['name']] = Counter(filtered_words)
+        source_vocabulary = get_source_vocabulary(keyness_method, period_filter)
         
         # Afficher les mots caractéristiques par source
-        for source_name, counter in source_keywords.items():
+        for source_name, words_df in source_vocabulary.groupby('source', sort=False):
             with st.expander(f"📊 {source_name}"):
-                top_words = counter.most_common(10)
-                words_df = pd.DataFrame(top_words, columns=['mot', 'fréquence'])
+                def build_source_vocabulary_bar():
+                    return px.bar(
+                        words_df,
+                        x='score',
+                        y='mot',
+                        orientation='h',
+                        hover_data=['fréquence'],
+                        title=f'Mots caractéristiques - {source_name}'
+                    )
                 
-                fig_src = px.bar(
-                    words_df,
-                    x='fréquence',
-                    y='mot',
-                    orientation='h',
-                    title=f'Mots les plus fréquents - {source_name}'
+                st.plotly_chart(
+                    cached_figure('analysis_source_vocabulary', build_source_vocabulary_bar,
+                                  source=source_name, method=keyness_method),
+                    use_container_width=True
                 )
-                st.plotly_chart(fig_src, use_container_width=True)
-    
+
+        # Expressions récurrentes (collocations)
+        st.subheader("Expressions récurrentes")
+
+        collocations = get_collocations()
+
+        col_colloc1, col_colloc2, col_colloc3 = st.columns(3)
+        with col_colloc1:
+            colloc_dimension = st.radio(
+                "Regrouper par",
+                ['source', 'period'],
+                format_func={'source': 'Source', 'period': 'Période'}.get,
+                horizontal=True
+            )
+        with col_colloc2:
+            colloc_order = st.radio(
+                "Longueur",
+                list(COLLOCATION_ORDERS),
+                format_func=COLLOCATION_ORDERS.get,
+                horizontal=True
+            )
+        with col_colloc3:
+            colloc_method = st.selectbox(
+                "Score d'association",
+                list(SCORING_METHODS),
+                format_func=SCORING_METHODS.get
+            )
+
+        colloc_groups = collocations.groups(colloc_dimension)
+        if colloc_dimension == 'period' and period_filter is not None:
+            # Décennies qui recoupent la période du filtre
+            colloc_groups = [group for group in colloc_groups
+                             if int(group[1][:4]) <= period_filter[1] and int(group[1][-4:]) >= period_filter[0]]
+        if colloc_groups:
+            colloc_group = st.selectbox(
+                "Groupe",
+                colloc_groups,
+                format_func=lambda group: group[1]
+            )
+
+            top_collocations = collocations.top(colloc_group, colloc_order, colloc_method, k=15)
+
+            if not top_collocations.empty:
+                def build_collocations_bar():
+                    return px.bar(
+                        top_collocations.iloc[::-1],
+                        x='score',
+                        y='expression',
+                        orientation='h',
+                        hover_data=['fréquence'],
+                        title=f'Expressions caractéristiques - {colloc_group[1]}'
+                    )
+
+                st.plotly_chart(
+                    cached_figure('analysis_collocations', build_collocations_bar,
+                                  group=list(colloc_group), order=colloc_order, method=colloc_method,
+                                  ocr_pages=load_ocr_corpus().n_pages),
+                    use_container_width=True
+                )
+            else:
+                st.info("Aucune expression récurrente pour ce groupe.")
+
     with tab2:
         st.subheader("Analyse du sentiment dans la presse")
         
-        sentiment_df = analyze_sentiment_trends()
-        
-        if not sentiment_df.empty:
-            # Évolution du sentiment moyen
-            yearly_sentiment = sentiment_df.groupby('year')['sentiment'].mean().reset_index()
-            
-            fig = px.line(
-                yearly_sentiment,
-                x='year',
-                y='sentiment',
-                markers=True,
-                title='Évolution du sentiment moyen dans la presse',
-                labels={'sentiment': 'Sentiment moyen', 'year': 'Année'}
+        col_res, col_smooth, col_window, col_band = st.columns(4)
+        with col_res:
+            sentiment_resolution = st.radio(
+                "Résolution", list(RESOLUTIONS), format_func=RESOLUTIONS.get, horizontal=True
             )
+        with col_smooth:
+            sentiment_method = st.selectbox(
+                "Lissage", list(SMOOTHING_METHODS), format_func=SMOOTHING_METHODS.get
+            )
+        with col_window:
+            sentiment_window = st.slider(
+                "Fenêtre (périodes)", 1, 24 if sentiment_resolution == 'month' else 10, 3,
+                help="Nombre de périodes de la moyenne mobile, ou portée de la moyenne exponentielle."
+            )
+        with col_band:
+            show_band = st.toggle("Intervalle de confiance 95 %", value=True)
+        
+        # Séries et intervalles bootstrap calculés une fois par état des filtres
+        sentiment_trend = get_sentiment_trend(period_filter, sentiment_resolution, sentiment_method, sentiment_window)
+        
+        if not sentiment_trend.empty:
+            newspapers = [name for name in sentiment_trend['newspaper'].unique() if name != OVERALL]
+            selected_newspapers = st.multiselect("Journaux", newspapers, default=[])
             
-            # Ajouter une ligne à zéro
-            fig.add_hline(y=0, line_dash="dash", line_color="gray")
-            
-            # Zones colorées
-            fig.add_hrect(y0=0.2, y1=1, line_width=0, fillcolor="green", opacity=0.1)
-            fig.add_hrect(y0=-1, y1=-0.2, line_width=0, fillcolor="red", opacity=0.1)
+            # Évolution du sentiment lissé
+            def build_sentiment_line():
+                overall = sentiment_trend[sentiment_trend['newspaper'] == OVERALL]
+                fig = go.Figure()
+                if show_band:
+                    fig.add_trace(go.Scatter(
+                        x=overall['period'], y=overall['high'], mode='lines', line_width=0,
+                        showlegend=False, hoverinfo='skip'
+                    ))
+                    fig.add_trace(go.Scatter(
+                        x=overall['period'], y=overall['low'], mode='lines', line_width=0,
+                        fill='tonexty', fillcolor='rgba(59, 130, 246, 0.2)', name='IC 95 %'
+                    ))
+                fig.add_trace(go.Scatter(
+                    x=overall['period'], y=overall['smoothed'], mode='lines+markers',
+                    name=OVERALL, line_color='#1E3A8A',
+                    customdata=overall[['articles', 'mean']],
+                    hovertemplate='%{x}<br>Lissé : %{y:.2f}<br>Moyenne brute : %{customdata[1]:.2f}'
+                                  '<br>Articles : %{customdata[0]}<extra></extra>'
+                ))
+                for newspaper in selected_newspapers:
+                    series = sentiment_trend[sentiment_trend['newspaper'] == newspaper]
+                    fig.add_trace(go.Scatter(x=series['period'], y=series['smoothed'], mode='lines', name=newspaper))
+                
+                fig.update_layout(
+                    title=f"Évolution du sentiment dans la presse ({SMOOTHING_METHODS[sentiment_method].lower()})",
+                    xaxis_title=RESOLUTIONS[sentiment_resolution],
+                    yaxis_title='Sentiment',
+                    yaxis_range=[-1.05, 1.05]
+                )
+                
+                # Ajouter une ligne à zéro
+                fig.add_hline(y=0, line_dash="dash", line_color="gray")
+                
+                # Zones colorées
+                fig.add_hrect(y0=0.2, y1=1, line_width=0, fillcolor="green", opacity=0.1)
+                fig.add_hrect(y0=-1, y1=-0.2, line_width=0, fillcolor="red", opacity=0.1)
+                return fig
             
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(
+                cached_figure('analysis_sentiment_line', build_sentiment_line,
+                              resolution=sentiment_resolution, method=sentiment_method,
+                              window=sentiment_window, band=show_band, newspapers=tuple(selected_newspapers)),
+                use_container_width=True
+            )
             
             # Analyse par journal
             st.subheader("Positionnement des journaux")
             
-            journal_stats = sentiment_df.groupby('newspaper').agg({
-                'sentiment': ['mean', 'count']
-            }).round(3)
+            journal_stats = get_sentiment_summary(period_filter)
             
-            journal_stats.columns = ['sentiment_moyen', 'nombre_articles']
-            journal_stats = journal_stats.reset_index()
-            
-            fig_journal = px.bar(
-                journal_stats,
-                x='newspaper',
-                y='sentiment_moyen',
-                color='nombre_articles',
-                title='Sentiment moyen par journal',
-                labels={'sentiment_moyen': 'Sentiment moyen', 'newspaper': 'Journal'},
-                color_continuous_scale='RdYlGn'
-            )
+            def build_journal_bar():
+                fig_journal = px.bar(
+                    journal_stats,
+                    x='newspaper',
+                    y='sentiment_moyen',
+                    color='nombre_articles',
+                    error_y=journal_stats['ic_haut'] - journal_stats['sentiment_moyen'],
+                    error_y_minus=journal_stats['sentiment_moyen'] - journal_stats['ic_bas'],
+                    title='Sentiment moyen par journal (intervalle bootstrap à 95 %)',
+                    labels={'sentiment_moyen': 'Sentiment moyen', 'newspaper': 'Journal'},
+                    color_continuous_scale='RdYlGn'
+                )
+                
+                fig_journal.add_hline(y=0, line_dash="dash", line_color="gray")
+                return fig_journal
             
-            fig_journal.add_hline(y=0, line_dash="dash", line_color="gray")
-            st.plotly_chart(fig_journal, use_container_width=True)
+            st.plotly_chart(cached_figure('analysis_journal_bar', build_journal_bar), use_container_width=True)
             
             # Tableau détaillé
             st.dataframe(
@@ -911,6 +1509,8 @@ elif page == "📈 Analyses thématiques":
                 use_container_width=True,
                 hide_index=True
             )
+        else:
+            st.info("Aucun article de presse daté et étiqueté sur la période.")
     
     with tab3:
         st.subheader("Réseau des thèmes et sources")
@@ -918,69 +1518,83 @@ elif page == "📈 Analyses thématiques":
         G, themes = create_source_network()
         
         if G.number_of_nodes() > 0:
-            # Créer un graphique réseau simple
-            nodes = list(G.nodes())
-            edges = list(G.edges(data=True))
-            
-            # Positions pour la visualisation
-            pos = {
-                'Archives Nationales': (0, 0),
-                'RetroNews (BnF)': (1, 1),
-                'Gallica (BnF)': (2, 0),
-                'INA': (1, -1),
-                'INSEE': (3, 1),
-                'Archive.org': (3, -1),
-                'Archives Nationales d\'Outre-mer': (4, 0)
-            }
-            
-            # Créer le graphique
-            edge_traces = []
-            for edge in edges:
-                x0, y0 = pos[edge[0]]
-                x1, y1 = pos[edge[1]]
+            def build_network_figure():
+                # Créer un graphique réseau simple
+                nodes = list(G.nodes())
+                edges = list(G.edges(data=True))
+                
+                # Positions pour la visualisation
+                pos = {
+                    'Archives Nationales': (0, 0),
+                    'RetroNews (BnF)': (1, 1),
+                    'Gallica (BnF)': (2, 0),
+                    'INA': (1, -1),
+                    'INSEE': (3, 1),
+                    'Archive.org': (3, -1),
+                    'Archives Nationales d\'Outre-mer': (4, 0)
+                }
+                # Sources ajoutées depuis : placées sur une ligne sous le réseau
+                for i, node in enumerate(node for node in nodes if node not in pos):
+                    pos[node] = (i, -2)
                 
-                edge_trace = go.Scatter(
-                    x=[x0, x1, None],
-                    y=[y0, y1, None],
-                    mode='lines',
-                    line=dict(width=edge[2]['weight']*2, color='#888'),
-                    hoverinfo='text',
-                    text=f"Thèmes communs: {len(edge[2].get('themes', []))}",
+                # Créer le graphique : une seule trace par épaisseur de trait
+                # (segments séparés par None) plutôt qu'une trace par arête
+                edge_segments = defaultdict(lambda: {'x': [], 'y': [], 'text': []})
+                for edge in edges:
+                    x0, y0 = pos[edge[0]]
+                    x1, y1 = pos[edge[1]]
+                    label = f"Thèmes communs: {len(edge[2].get('themes', []))}"
+                    
+                    segment = edge_segments[edge[2]['weight']]
+                    segment['x'] += [x0, x1, None]
+                    segment['y'] += [y0, y1, None]
+                    segment['text'] += [label, label, None]
+                
+                edge_traces = []
+                for weight, segment in edge_segments.items():
+                    edge_trace = go.Scatter(
+                        x=segment['x'],
+                        y=segment['y'],
+                        mode='lines',
+                        line=dict(width=weight*2, color='#888'),
+                        hoverinfo='text',
+                        text=segment['text'],
+                        showlegend=False
+                    )
+                    edge_traces.append(edge_trace)
+                
+                node_trace = go.Scatter(
+                    x=[pos[node][0] for node in nodes],
+                    y=[pos[node][1] for node in nodes],
+                    mode='markers+text',
+                    text=nodes,
+                    textposition="top center",
+                    marker=dict(
+                        size=50,
+                        color=[BUMIDOM_ARCHIVES.get(key, {}).get('color', '#888') 
+                              for key in ['archives_nationales', 'retronews', 'gallica', 
+                                         'ina', 'insee', 'archive_org', 'anom']],
+                        line=dict(width=2, color='white')
+                    ),
+                    hovertext=[f"Documents: {len(BUMIDOM_ARCHIVES.get(key, {}).get('documents', []))}" 
+                              for key in ['archives_nationales', 'retronews', 'gallica', 
+                                         'ina', 'insee', 'archive_org', 'anom']],
                     showlegend=False
                 )
-                edge_traces.append(edge_trace)
-            
-            node_trace = go.Scatter(
-                x=[pos[node][0] for node in nodes],
-                y=[pos[node][1] for node in nodes],
-                mode='markers+text',
-                text=nodes,
-                textposition="top center",
-                marker=dict(
-                    size=50,
-                    color=[BUMIDOM_ARCHIVES.get(key, {}).get('color', '#888') 
-                          for key in ['archives_nationales', 'retronews', 'gallica', 
-                                     'ina', 'insee', 'archive_org', 'anom']],
-                    line=dict(width=2, color='white')
-                ),
-                hovertext=[f"Documents: {len(BUMIDOM_ARCHIVES.get(key, {}).get('documents', []))}" 
-                          for key in ['archives_nationales', 'retronews', 'gallica', 
-                                     'ina', 'insee', 'archive_org', 'anom']],
-                showlegend=False
-            )
-            
-            fig_network = go.Figure(data=edge_traces + [node_trace])
-            
-            fig_network.update_layout(
-                title='Réseau des sources du BUMIDOM',
-                showlegend=False,
-                hovermode='closest',
-                height=500,
-                xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-                yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
-            )
+                
+                fig_network = go.Figure(data=edge_traces + [node_trace])
+                
+                fig_network.update_layout(
+                    title='Réseau des sources du BUMIDOM',
+                    showlegend=False,
+                    hovermode='closest',
+                    height=500,
+                    xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+                    yaxis=dict(showgrid=False, zeroline=False, showticklabels=False)
+                )
+                return fig_network
             
-            st.plotly_chart(fig_network, use_container_width=True)
+            st.plotly_chart(cached_figure('analysis_network', build_network_figure), use_container_width=True)
             
             # Affichage des thèmes communs
             st.subheader("Thèmes communs entre sources")
@@ -1007,87 +1621,194 @@ elif page == "📈 Analyses thématiques":
     with tab4:
         st.subheader("Évolution des thèmes dans le temps")
         
-        # Collecter les thèmes par période
+        # Thèmes des articles et documents par période, lus dans le cube d'agrégats
         periods = {
-            '1960-1969': [],
-            '1970-1979': [],
-            '1980-1990': []
+            '1960-1969': (1960, 1969),
+            '1970-1979': (1970, 1979),
+            '1980-1990': (1980, 1990)
         }
         
-        for source_id, source_data in BUMIDOM_ARCHIVES.items():
-            if 'articles' in source_data:
-                for article in source_data['articles']:
-                    year = int(article['date'][:4]) if article['date'][:4].isdigit() else 0
-                    
-                    if 1960 <= year <= 1969:
-                        period = '1960-1969'
-                    elif 1970 <= year <= 1979:
-                        period = '1970-1979'
-                    elif 1980 <= year <= 1990:
-                        period = '1980-1990'
-                    else:
-                        continue
-                    
-                    if 'themes' in article:
-                        periods[period].extend(article['themes'])
-            
-            if 'documents' in source_data:
-                for doc in source_data['documents']:
-                    if 'date' in doc:
-                        year_str = str(doc['date'])
-                        if year_str[:4].isdigit():
-                            year = int(year_str[:4])
-                            
-                            if 1960 <= year <= 1969:
-                                period = '1960-1969'
-                            elif 1970 <= year <= 1979:
-                                period = '1970-1979'
-                            elif 1980 <= year <= 1990:
-                                period = '1980-1990'
-                            else:
-                                continue
-                            
-                            if 'keywords' in doc:
-                                periods[period].extend(doc['keywords'])
+        theme_counts = {
+            period: cube.rollup('theme', doc_type=['article', 'document'], year=years)
+            .query('theme != @NO_THEME')
+            .sort_values('count', ascending=False, kind='stable')
+            for period, years in periods.items()
+        }
         
         # Analyser la fréquence des thèmes par période
         period_data = []
-        for period, themes_list in periods.items():
-            theme_counter = Counter(themes_list)
-            for theme, count in theme_counter.most_common(10):
+        for period, counts in theme_counts.items():
+            for theme, count in zip(counts['theme'][:10], counts['count'][:10]):
                 period_data.append({
                     'période': period,
                     'thème': theme,
                     'fréquence': count
                 })
         
-        period_df = pd.DataFrame(period_data)
+        period_df = pd.DataFrame(period_data)
+        
+        if not period_df.empty:
+            fig_period = px.bar(
+                period_df,
+                x='période',
+                y='fréquence',
+                color='thème',
+                title='Évolution des thèmes dominants par période',
+                barmode='stack'
+            )
+            
+            st.plotly_chart(fig_period, use_container_width=True)
+            
+            # Tableau détaillé
+            st.subheader("Thèmes les plus fréquents par période")
+            
+            for period, counts in theme_counts.items():
+                if not counts.empty:
+                    with st.expander(f"📊 Période {period}"):
+                        for theme, count in zip(counts['theme'][:5], counts['count'][:5]):
+                            st.markdown(f"- **{theme}**: {count} occurrences")
+        else:
+            st.info("Aucune donnée disponible pour l'analyse par période.")
+
+# ============================================================================
+# PAGE 3 BIS: COUVERTURE PRESSE
+# ============================================================================
+elif page == "📰 Couverture presse":
+    st.header("📰 Couverture presse du BUMIDOM")
+    
+    col_granularity, col_papers = st.columns([1, 3])
+    with col_granularity:
+        press_resolution = st.radio(
+            "Période", list(PRESS_PERIODS), format_func=PRESS_PERIODS.get, index=1, horizontal=True
+        )
+    
+    # Agrégats journal × période calculés une fois par état des filtres
+    coverage = get_press_coverage(period_filter, press_resolution)
+    newspaper_summary = coverage.by_newspaper()
+    
+    with col_papers:
+        press_newspapers = st.multiselect(
+            "Journaux", list(newspaper_summary['journal']), default=[],
+            help="Tous les journaux si aucun n'est sélectionné."
+        )
+    
+    if newspaper_summary.empty:
+        st.info("Aucun article de presse daté sur la période.")
+    else:
+        selected_summary = coverage.by_newspaper(press_newspapers)
+        totals = coverage.totals(press_newspapers)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Articles", totals['articles'])
+        with col2:
+            st.metric("Journaux", totals['journaux'])
+        with col3:
+            st.metric("À la une", "N/A" if np.isnan(totals['part_une']) else f"{totals['part_une']:.0%}")
+        with col4:
+            st.metric("Longueur moyenne",
+                      "N/A" if np.isnan(totals['longueur_moyenne']) else f"{totals['longueur_moyenne']:.0f} mots")
+        
+        coverage_table = coverage.table(press_newspapers)
+        filters = dict(resolution=press_resolution, newspapers=tuple(press_newspapers))
+        
+        # Volume de couverture
+        st.subheader("Volume de couverture")
+        
+        def build_coverage_volume():
+            return px.bar(
+                coverage_table,
+                x='période',
+                y='articles',
+                color='journal',
+                title='Articles par période et par journal',
+                labels={'période': PRESS_PERIODS[press_resolution], 'articles': "Nombre d'articles",
+                        'journal': 'Journal'}
+            )
+        
+        st.plotly_chart(cached_figure('press_coverage_volume', build_coverage_volume, **filters),
+                        use_container_width=True)
+        
+        col_front, col_length = st.columns(2)
+        
+        with col_front:
+            def build_front_page_share():
+                fig = px.line(
+                    coverage_table.dropna(subset=['part_une']),
+                    x='période',
+                    y='part_une',
+                    color='journal',
+                    markers=True,
+                    title='Part des articles publiés en une',
+                    labels={'période': PRESS_PERIODS[press_resolution], 'part_une': 'Part en une',
+                            'journal': 'Journal'}
+                )
+                fig.update_yaxes(tickformat='.0%', range=[0, 1])
+                return fig
+            
+            st.plotly_chart(cached_figure('press_front_page', build_front_page_share, **filters),
+                            use_container_width=True)
+        
+        with col_length:
+            def build_mean_length():
+                return px.line(
+                    coverage_table.dropna(subset=['longueur_moyenne']),
+                    x='période',
+                    y='longueur_moyenne',
+                    color='journal',
+                    markers=True,
+                    title='Longueur moyenne des articles',
+                    labels={'période': PRESS_PERIODS[press_resolution], 'longueur_moyenne': 'Mots',
+                            'journal': 'Journal'}
+                )
+            
+            st.plotly_chart(cached_figure('press_mean_length', build_mean_length, **filters),
+                            use_container_width=True)
+        
+        # Répartition des thèmes
+        st.subheader("Thèmes abordés")
         
-        if not period_df.empty:
-            fig_period = px.bar(
-                period_df,
+        def build_theme_mix():
+            fig = px.bar(
+                coverage.theme_mix(press_newspapers),
                 x='période',
-                y='fréquence',
+                y='part',
                 color='thème',
-                title='Évolution des thèmes dominants par période',
-                barmode='stack'
+                title='Répartition des thèmes par période',
+                labels={'période': PRESS_PERIODS[press_resolution], 'part': 'Part des mentions',
+                        'thème': 'Thème'}
             )
+            fig.update_yaxes(tickformat='.0%')
+            return fig
+        
+        st.plotly_chart(cached_figure('press_theme_mix', build_theme_mix, **filters), use_container_width=True)
+        
+        theme_profile = coverage.theme_profile(press_newspapers)
+        if not theme_profile.empty:
+            def build_theme_profile():
+                fig = px.imshow(
+                    theme_profile,
+                    text_auto='.0%',
+                    color_continuous_scale='Blues',
+                    aspect='auto',
+                    title='Profil thématique des journaux'
+                )
+                fig.update_layout(height=max(300, 40 * len(theme_profile)))
+                return fig
             
-            st.plotly_chart(fig_period, use_container_width=True)
-            
-            # Tableau détaillé
-            st.subheader("Thèmes les plus fréquents par période")
-            
-            for period in periods.keys():
-                if periods[period]:
-                    counter = Counter(periods[period])
-                    top_themes = counter.most_common(5)
-                    
-                    with st.expander(f"📊 Période {period}"):
-                        for theme, count in top_themes:
-                            st.markdown(f"- **{theme}**: {count} occurrences")
-        else:
-            st.info("Aucune donnée disponible pour l'analyse par période.")
+            st.plotly_chart(cached_figure('press_theme_profile', build_theme_profile, **filters),
+                            use_container_width=True)
+        
+        # Tableau par journal
+        st.dataframe(
+            selected_summary,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                'part_une': st.column_config.NumberColumn('Part en une', format='percent'),
+                'longueur_moyenne': st.column_config.NumberColumn('Longueur moyenne', format='%.0f'),
+            }
+        )
 
 # ============================================================================
 # PAGE 4: CHRONOLOGIE
@@ -1102,7 +1823,7 @@ elif page == "🕰️ Chronologie":
         # Articles
         if 'articles' in source_data:
             for article in source_data['articles']:
-                if article['date'] and len(article['date']) >= 4:
+                if article['date'] and len(article['date']) >= 4 and in_period(article, period_filter):
                     year = article['date'][:4]
                     if year.isdigit():
                         timeline_events.append({
@@ -1116,7 +1837,7 @@ elif page == "🕰️ Chronologie":
         # Documents
         if 'documents' in source_data:
             for doc in source_data['documents']:
-                if doc['date'] and len(str(doc['date'])) >= 4:
+                if doc['date'] and len(str(doc['date'])) >= 4 and in_period(doc, period_filter):
                     year_str = str(doc['date'])[:4]
                     if year_str.isdigit():
                         timeline_events.append({
@@ -1130,7 +1851,7 @@ elif page == "🕰️ Chronologie":
         # Vidéos
         if 'videos' in source_data:
             for video in source_data['videos']:
-                if video['date'] and len(video['date']) >= 4:
+                if video['date'] and len(video['date']) >= 4 and in_period(video, period_filter):
                     year = video['date'][:4]
                     if year.isdigit():
                         timeline_events.append({
@@ -1155,18 +1876,8 @@ elif page == "🕰️ Chronologie":
         # Affichage interactif
         st.subheader("Frise chronologique interactive")
         
-        # Filtre par année
-        selected_year = st.slider(
-            "Filtrer par année",
-            int(timeline_df['year'].min()),
-            int(timeline_df['year'].max()),
-            (1963, 1982)
-        )
-        
-        filtered_timeline = timeline_df[
-            (timeline_df['year'] >= selected_year[0]) & 
-            (timeline_df['year'] <= selected_year[1])
-        ]
+        # Les événements suivent le filtre « Période » de la barre latérale
+        filtered_timeline = timeline_df
         
         # Afficher les événements
         for _, event in filtered_timeline.iterrows():
@@ -1185,28 +1896,30 @@ elif page == "🕰️ Chronologie":
         # Graphique de densité
         st.subheader("Densité des archives par année")
         
-        yearly_density = timeline_df['year'].value_counts().sort_index().reset_index()
+        # Articles, documents et vidéos datés, par année de début (cube d'agrégats)
+        yearly_density = cube.rollup('year', doc_type=['article', 'document', 'video'], year=(1960, 9999))
         yearly_density.columns = ['année', 'documents']
         
-        fig_density = px.area(
-            yearly_density,
-            x='année',
-            y='documents',
-            title='Nombre de documents archivés par année',
-            labels={'année': 'Année', 'documents': 'Nombre de documents'}
-        )
+        def build_density_area():
+            
+            return px.area(
+                yearly_density,
+                x='année',
+                y='documents',
+                title='Nombre de documents archivés par année',
+                labels={'année': 'Année', 'documents': 'Nombre de documents'}
+            )
         
-        st.plotly_chart(fig_density, use_container_width=True)
+        st.plotly_chart(cached_figure('timeline_density', build_density_area), use_container_width=True)
         
         # Statistiques par décennie
         st.subheader("Répartition par décennie")
         
-        timeline_df['décennie'] = timeline_df['year'].apply(
-            lambda x: f"{str(x)[:3]}0s"
-        )
-        
-        decade_counts = timeline_df['décennie'].value_counts().reset_index()
+        decade_counts = yearly_density.groupby(
+            yearly_density['année'] // 10 * 10, as_index=False
+        )['documents'].sum()
         decade_counts.columns = ['décennie', 'documents']
+        decade_counts['décennie'] = decade_counts['décennie'].astype(str) + 's'
         
         fig_decade = px.bar(
             decade_counts,
@@ -1227,8 +1940,8 @@ elif page == "🕰️ Chronologie":
 elif page == "🧮 Outils de recherche":
     st.header("🧮 Outils avancés de recherche")
     
-    tool_tab1, tool_tab2, tool_tab3 = st.tabs([
-        "🔍 Recherche avancée", "📊 Analyse comparative", "🔄 Mise à jour"
+    tool_tab1, tool_tab2, tool_tab3, tool_tab4 = st.tabs([
+        "🔍 Recherche avancée", "📊 Analyse comparative", "🔄 Mise à jour", "📜 Texte intégral (OCR)"
     ])
     
     with tool_tab1:
@@ -1263,7 +1976,13 @@ elif page == "🧮 Outils de recherche":
         
         if st.button("🔎 Lancer la recherche", type="primary"):
             if search_terms:
-                terms = [term.strip().lower() for term in search_terms.split(',')]
+                # Une cote contient des virgules (« 19880445/1-3, 7 ») : reconnue avant le découpage
+                cote_matches = {search_terms.strip(): search_cote(search_terms)}
+                if cote_matches[search_terms.strip()] is not None:
+                    terms = [search_terms.strip()]
+                else:
+                    terms = [term.strip().lower() for term in search_terms.split(',')]
+                    cote_matches = {term: search_cote(term) for term in terms}
                 
                 results = []
                 for source_id, source_data in BUMIDOM_ARCHIVES.items():
@@ -1271,25 +1990,27 @@ elif page == "🧮 Outils de recherche":
                         # Rechercher dans les documents
                         if 'documents' in source_data:
                             for doc in source_data['documents']:
-                                if evaluate_search(doc, terms, search_logic, search_field):
+                                if in_period(doc, period_filter) and \
+                                        evaluate_search(doc, terms, search_logic, search_field, cote_matches):
                                     results.append({
                                         'type': 'document',
                                         'titre': doc['title'],
                                         'source': source_data['name'],
                                         'date': doc['date'],
-                                        'score': calculate_score(doc, terms)
+                                        'score': calculate_score(doc, terms, cote_matches)
                                     })
                         
                         # Rechercher dans les articles
                         if 'articles' in source_data:
                             for article in source_data['articles']:
-                                if evaluate_search(article, terms, search_logic, search_field):
+                                if in_period(article, period_filter) and \
+                                        evaluate_search(article, terms, search_logic, search_field, cote_matches):
                                     results.append({
                                         'type': 'article',
                                         'titre': article['title'],
                                         'source': source_data['name'],
                                         'date': article['date'],
-                                        'score': calculate_score(article, terms)
+                                        'score': calculate_score(article, terms, cote_matches)
                                     })
                 
                 if results:
@@ -1315,8 +2036,54 @@ elif page == "🧮 Outils de recherche":
     with tool_tab2:
         st.subheader("Analyse comparative des sources")
         
-        # Sélectionner deux sources à comparer
-        sources_list = [source['name'] for source in BUMIDOM_ARCHIVES.values()]
+        comparison_level = st.radio(
+            "Niveau de comparaison",
+            list(COMPARISON_LEVELS),
+            format_func=COMPARISON_LEVELS.get,
+            horizontal=True
+        )
+        
+        # Bitsets de thèmes calculés une fois par version du catalogue
+        theme_matrix = get_theme_matrix(comparison_level)
+        
+        metric_labels = {
+            'jaccard': 'Recouvrement des thèmes (Jaccard)',
+            'shared': 'Nombre de thèmes communs',
+            'exclusive': 'Thèmes de la ligne absents de la colonne'
+        }
+        comparison_metric = st.selectbox(
+            "Indicateur",
+            list(metric_labels),
+            format_func=metric_labels.get
+        )
+        
+        def build_comparison_matrix():
+            fig_matrix = px.imshow(
+                theme_matrix.matrix(comparison_metric),
+                text_auto='.2f' if comparison_metric == 'jaccard' else True,
+                color_continuous_scale='Blues',
+                aspect='auto',
+                title=metric_labels[comparison_metric]
+            )
+            fig_matrix.update_layout(height=max(400, 40 * len(theme_matrix.labels)))
+            return fig_matrix
+        
+        st.plotly_chart(
+            cached_figure('comparison_matrix', build_comparison_matrix,
+                          level=comparison_level, metric=comparison_metric),
+            use_container_width=True
+        )
+        
+        st.dataframe(
+            theme_matrix.summary().sort_values('thèmes', ascending=False),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        # Comparaison détaillée de deux groupes
+        st.subheader("Comparaison détaillée")
+        
+        sources_list = theme_matrix.labels
         
         col_comp1, col_comp2 = st.columns(2)
         
@@ -1324,21 +2091,24 @@ elif page == "🧮 Outils de recherche":
             source1 = st.selectbox("Source 1", sources_list, index=0)
         
         with col_comp2:
-            source2 = st.selectbox("Source 2", sources_list, index=1)
+            source2 = st.selectbox("Source 2", sources_list, index=min(1, len(sources_list) - 1))
         
         if source1 != source2 and st.button("🔍 Comparer", type="primary"):
-            # Récupérer les données des sources
-            source1_data = next(s for s in BUMIDOM_ARCHIVES.values() if s['name'] == source1)
-            source2_data = next(s for s in BUMIDOM_ARCHIVES.values() if s['name'] == source2)
+            # Notices par type de document, lues dans le cube d'agrégats
+            cube_all = get_aggregate_cube(False)
+            counts1, counts2 = (
+                cube_all.rollup('doc_type', **group_filters(label, comparison_level)).set_index('doc_type')['count']
+                for label in (source1, source2)
+            )
             
             # Statistiques comparatives
             col_stat1, col_stat2 = st.columns(2)
             
             with col_stat1:
                 st.markdown(f"### {source1}")
-                docs1 = len(source1_data.get('documents', []))
-                articles1 = len(source1_data.get('articles', []))
-                videos1 = len(source1_data.get('videos', []))
+                docs1 = int(counts1.get('document', 0))
+                articles1 = int(counts1.get('article', 0))
+                videos1 = int(counts1.get('video', 0))
                 
                 st.metric("Documents", docs1)
                 st.metric("Articles", articles1)
@@ -1346,9 +2116,9 @@ elif page == "🧮 Outils de recherche":
             
             with col_stat2:
                 st.markdown(f"### {source2}")
-                docs2 = len(source2_data.get('documents', []))
-                articles2 = len(source2_data.get('articles', []))
-                videos2 = len(source2_data.get('videos', []))
+                docs2 = int(counts2.get('document', 0))
+                articles2 = int(counts2.get('article', 0))
+                videos2 = int(counts2.get('video', 0))
                 
                 st.metric("Documents", docs2, docs2 - docs1)
                 st.metric("Articles", articles2, articles2 - articles1)
@@ -1357,40 +2127,26 @@ elif page == "🧮 Outils de recherche":
             # Comparaison des thèmes
             st.subheader("Comparaison des thèmes")
             
-            themes1 = set()
-            themes2 = set()
-            
-            # Extraire les thèmes de la source 1
-            for doc in source1_data.get('documents', []):
-                themes1.update(doc.get('keywords', []))
-            for article in source1_data.get('articles', []):
-                themes1.update(article.get('themes', []))
-            
-            # Extraire les thèmes de la source 2
-            for doc in source2_data.get('documents', []):
-                themes2.update(doc.get('keywords', []))
-            for article in source2_data.get('articles', []):
-                themes2.update(article.get('themes', []))
+            unique1, common, unique2 = theme_matrix.pair_themes(source1, source2)
+            i, j = theme_matrix.index(source1), theme_matrix.index(source2)
+            st.metric("Recouvrement (Jaccard)", f"{theme_matrix.jaccard[i, j]:.2f}")
             
             # Afficher la comparaison
             col_theme1, col_theme2, col_theme3 = st.columns(3)
             
             with col_theme1:
                 st.markdown(f"**Thèmes uniquement dans {source1}**")
-                unique1 = themes1 - themes2
-                for theme in list(unique1)[:10]:
+                for theme in unique1[:10]:
                     st.markdown(f"- {theme}")
             
             with col_theme2:
                 st.markdown("**Thèmes communs**")
-                common = themes1 & themes2
-                for theme in list(common)[:10]:
+                for theme in common[:10]:
                     st.markdown(f"- {theme}")
             
             with col_theme3:
                 st.markdown(f"**Thèmes uniquement dans {source2}**")
-                unique2 = themes2 - themes1
-                for theme in list(unique2)[:10]:
+                for theme in unique2[:10]:
                     st.markdown(f"- {theme}")
     
     with tool_tab3:
@@ -1421,8 +2177,21 @@ elif page == "🧮 Outils de recherche":
                 new_type = st.selectbox("Type", ["document", "article", "vidéo", "données"])
                 
                 if st.form_submit_button("Ajouter l'archive"):
-                    st.success(f"Archive '{new_title}' ajoutée avec succès !")
-                    # Ici, vous ajouteriez la logique pour sauvegarder la nouvelle archive
+                    if new_title:
+                        source_ids = {source['name']: source_id for source_id, source in BUMIDOM_ARCHIVES.items()}
+                        # Nouvel instantané du corpus partagé, visible par toutes les sessions
+                        try:
+                            get_shared_corpus().add_records(
+                                source_ids.get(new_source, MANUAL_SOURCE_ID),
+                                COLLECTIONS[new_type],
+                                [{'id': new_record_id(), 'title': new_title, 'date': new_date, 'url': new_url}]
+                            )
+                        except OSError as error:
+                            st.error(f"Archive non enregistrée (écriture du journal impossible) : {error}")
+                        else:
+                            st.success(f"Archive '{new_title}' ajoutée avec succès !")
+                    else:
+                        st.warning("Veuillez indiquer un titre.")
         
         elif update_option == "Import depuis un fichier":
             uploaded_file = st.file_uploader(
@@ -1453,20 +2222,98 @@ elif page == "🧮 Outils de recherche":
         
         else:  # Mise à jour automatique
             st.subheader("Mise à jour automatique des sources")
+            st.caption("Collecte des résultats de recherche de Gallica (API SRU), par lots, "
+                       "reprise là où elle s'est arrêtée. RetroNews n'offre pas d'API de recherche publique.")
             
-            auto_sources = st.multiselect(
-                "Sources à mettre à jour automatiquement",
-                [source['name'] for source in BUMIDOM_ARCHIVES.values()],
-                default=[]
-            )
+            harvest_query = st.text_input("Requête SRU Gallica", 'gallica all "bumidom"')
+            col_h1, col_h2, col_h3 = st.columns(3)
+            with col_h1:
+                harvest_workers = st.number_input("Requêtes simultanées", 1, 16, DEFAULT_WORKERS)
+            with col_h2:
+                harvest_rate = st.number_input("Requêtes par seconde", 0.1, 10.0, DEFAULT_RATE, step=0.5)
+            with col_h3:
+                harvest_limit = st.number_input("Notices au plus (0 = toutes)", 0, 100000, 0, step=100)
             
-            update_frequency = st.selectbox(
-                "Fréquence de mise à jour",
-                ["Quotidienne", "Hebdomadaire", "Mensuelle", "Manuelle"]
-            )
+            harvest_job = get_harvest_jobs().get(GallicaSRU(harvest_query).key)
+            if harvest_job is not None and harvest_job.running:
+                if st.button("⏹️ Interrompre la collecte"):
+                    harvest_job.stop()
+            elif st.button("▶️ Lancer la collecte", type="primary", disabled=not harvest_query.strip()):
+                harvest_job = start_harvest(harvest_query.strip(), int(harvest_workers), float(harvest_rate),
+                                            int(harvest_limit) or None)
+            
+            if harvest_job is not None:
+                pages_total = max(harvest_job.pages_total, 1)
+                st.progress(min(harvest_job.pages_done / pages_total, 1.0),
+                            text=f"{harvest_job.pages_done} / {harvest_job.pages_total} pages")
+                col_h4, col_h5, col_h6 = st.columns(3)
+                col_h4.metric("Notices ajoutées", harvest_job.written)
+                col_h5.metric("Déjà présentes", harvest_job.skipped)
+                col_h6.metric("Pages en échec", len(harvest_job.errors))
+                if harvest_job.running:
+                    st.button("🔄 Actualiser")
+                elif harvest_job.failed:
+                    st.error(f"Collecte interrompue : {harvest_job.failed}")
+                elif harvest_job.errors:
+                    st.warning("Pages non collectées (reprises au prochain lancement) : "
+                               + "; ".join(harvest_job.errors[:5]))
+                else:
+                    st.success("Collecte terminée.")
+
+    with tool_tab4:
+        st.subheader("Recherche dans le texte intégral des documents numérisés")
+        
+        ocr_corpus = load_ocr_corpus()
+        if ocr_corpus.stale:
+            reindex_error = start_ocr_reindex(ocr_corpus.corpus_dir)['error']
+            if reindex_error is not None:
+                st.warning(f"Réindexation OCR en échec ({reindex_error}) : "
+                           f"python ocr_store.py reindex {ocr_corpus.corpus_dir}")
+            else:
+                st.info(f"{len(ocr_corpus.stale)} segment(s) OCR en cours de réindexation : "
+                        "leurs pages seront consultables à la fin de la tâche.")
+        
+        col_ocr1, col_ocr2 = st.columns(2)
+        with col_ocr1:
+            st.metric("Documents OCR indexés", ocr_corpus.n_documents)
+        with col_ocr2:
+            st.metric("Pages indexées", ocr_corpus.n_pages)
+        
+        ocr_query = st.text_input("Rechercher dans l'OCR",
+                                  placeholder="Ex: travailleurs antillais, conditions d'accueil...")
+        exact_phrase = st.checkbox("Phrase exacte")
+        
+        if ocr_query:
+            hits = ocr_corpus.search(ocr_query, phrase=exact_phrase)
+            
+            if hits:
+                st.success(f"✅ {len(hits)} page(s) trouvée(s)")
+                
+                for hit in hits:
+                    record = find_record(hit['ark'])
+                    title = record['title'] if record else f"Document {hit['ark']}"
+                    
+                    with st.container(border=True):
+                        col_hit1, col_hit2 = st.columns([3, 1])
+                        with col_hit1:
+                            st.markdown(f"**{title}** — page {hit['page']}")
+                            st.write(hit['snippet'])
+                            st.caption(f"ARK: `{hit['ark']}`")
+                        with col_hit2:
+                            st.metric("Occurrences", hit['score'])
+                            st.link_button("📖 Ouvrir la page", hit['url'])
+            else:
+                st.warning("Aucune page ne correspond à cette recherche.")
+        
+        with st.expander("📥 Ingérer un export OCR (TXT Gallica)"):
+            ocr_ark = st.text_input("Identifiant ARK", placeholder="bpt6k9612718t")
+            ocr_file = st.file_uploader("Fichier TXT (pages séparées par des sauts de page)", type=['txt'])
             
-            if st.button("💾 Enregistrer les paramètres", type="primary"):
-                st.success("Paramètres de mise à jour enregistrés !")
+            if ocr_file is not None and ocr_ark and st.button("Indexer le texte"):
+                with OcrCorpusWriter(ocr_corpus.corpus_dir) as writer:
+                    writer.add_text(normalize_ark(ocr_ark), ocr_file.read().decode('utf-8', errors='replace'))
+                load_ocr_corpus.clear()
+                st.success(f"Texte intégral de {normalize_ark(ocr_ark)} indexé.")
 
 # ============================================================================
 # PAGE 6: EXPORT & RAPPORT
@@ -1476,6 +2323,21 @@ else:
     
     col_exp1, col_exp2 = st.columns(2)
     
+    # Choix du rapport lus avant l'export : le rapport PDF de la colonne de gauche les reprend
+    with col_exp2:
+        st.subheader("Génération de rapport")
+        
+        report_type = st.selectbox(
+            "Type de rapport",
+            ["Rapport synthétique", "Rapport détaillé", "Rapport académique", "Rapport statistique"]
+        )
+        
+        include_sections = st.multiselect(
+            "Sections à inclure",
+            ["Introduction", "Méthodologie", "Résultats", "Analyses", "Conclusion", "Bibliographie"],
+            default=["Introduction", "Résultats", "Analyses", "Conclusion"]
+        )
+    
     with col_exp1:
         st.subheader("Export des données")
         
@@ -1489,71 +2351,121 @@ else:
         
         export_format = st.selectbox(
             "Format d'export",
-            ["CSV", "Excel", "JSON", "PDF (rapport)"]
+            ["CSV", "Excel", "JSON", "Parquet", "Arrow IPC", "PDF (rapport)"]
         )
         
         if st.button("📥 Générer l'export", type="primary"):
             with st.spinner("Préparation de l'export..."):
-                # Préparer les données
-                export_data = []
+                if export_format in COLUMNAR_FORMATS:
+                    # Parquet / Arrow IPC : tables écrites lot par lot dans une archive zip
+                    export_tables = columnar_tables(export_options, collapse_duplicates, period_filter)
+                    if not export_tables:
+                        st.warning("Aucune table à exporter pour cette sélection.")
+                    else:
+                        fmt = COLUMNAR_FORMATS[export_format]
+                        discard_export_archives()
+                        os.makedirs(EXPORT_DIR, exist_ok=True)
+                        handle, archive_path = tempfile.mkstemp(suffix='.zip', dir=EXPORT_DIR)
+                        os.close(handle)
+                        try:
+                            row_counts = write_archive(export_tables, archive_path, fmt)
+                        except BaseException:
+                            os.remove(archive_path)
+                            raise
+                        st.caption(" · ".join(f"{name} : {n_rows} lignes" for name, n_rows in row_counts.items()))
+                        archive_size = os.path.getsize(archive_path)
+                        if archive_size > MAX_EXPORT_BYTES:
+                            os.remove(archive_path)
+                            st.warning(
+                                f"Archive trop volumineuse pour l'interface ({archive_size / 1024 ** 2:.0f} Mo) : "
+                                f"utilisez python arrow_export.py <dossier> --format {fmt}"
+                            )
+                        else:
+                            # Lue sur disque au clic seulement
+                            st.session_state['export_archive'] = archive_path
+                            st.download_button(
+                                label=f"📥 Télécharger {export_format}",
+                                data=export_archive_reader(archive_path),
+                                file_name=f"bumidom_archives_{fmt}.zip",
+                                mime="application/zip",
+                                # Sans relance du script : le bouton reste disponible pour un nouveau clic
+                                on_click='ignore'
+                            )
+                else:
+                    # Préparer les données
+                    export_data = []
                 
-                if "Liste complète des archives" in export_options:
-                    for source_id, source_data in BUMIDOM_ARCHIVES.items():
-                        for doc_type in ['documents', 'articles', 'videos', 'datasets', 'websites']:
-                            if doc_type in source_data:
-                                for doc in source_data[doc_type]:
-                                    export_data.append({
-                                        'source': source_data['name'],
-                                        'type': doc_type[:-1],
-                                        'titre': doc['title'],
-                                        'date': doc.get('date', ''),
-                                        'description': doc.get('description', ''),
-                                        'url': doc.get('url', '')
-                                    })
+                    if "Liste complète des archives" in export_options:
+                        archives_df = get_all_documents(
+                            ['source_name', 'doc_type', 'title', 'date', 'description', 'url']
+                        ).rename(columns={'source_name': 'source', 'doc_type': 'type', 'title': 'titre'})
+                        archives_df = archives_df.astype(object).fillna('')
+                    
+                        if collapse_duplicates:
+                            # Une ligne par grappe, avec les autres sources qui la référencent
+                            clusters = get_duplicate_clusters()
+                            other_sources = [
+                                " ; ".join(archives_df['source'].iloc[clusters.members(row)[1:]])
+                                for row in np.flatnonzero(clusters.representatives)
+                            ]
+                            archives_df = archives_df[clusters.representatives].assign(autres_sources=other_sources)
+                    
+                        if period_filter is not None:
+                            # L'index est la ligne du catalogue
+                            archives_df = archives_df[period_mask(snapshot, period_filter)[archives_df.index]]
+                    
+                        export_data.extend(archives_df.to_dict('records'))
                 
-                export_df = pd.DataFrame(export_data)
+                    export_df = pd.DataFrame(export_data)
                 
-                if export_format == "CSV":
-                    csv = export_df.to_csv(index=False, encoding='utf-8-sig')
-                    st.download_button(
-                        label="📥 Télécharger CSV",
-                        data=csv,
-                        file_name="bumidom_archives.csv",
-                        mime="text/csv"
-                    )
+                    if export_format == "CSV":
+                        csv = export_df.to_csv(index=False, encoding='utf-8-sig')
+                        st.download_button(
+                            label="📥 Télécharger CSV",
+                            data=csv,
+                            file_name="bumidom_archives.csv",
+                            mime="text/csv"
+                        )
                 
-                elif export_format == "Excel":
-                    excel_file = export_df.to_excel(index=False)
-                    st.download_button(
-                        label="📥 Télécharger Excel",
-                        data=excel_file,
-                        file_name="bumidom_archives.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                    elif export_format == "Excel":
+                        excel_file = export_df.to_excel(index=False)
+                        st.download_button(
+                            label="📥 Télécharger Excel",
+                            data=excel_file,
+                            file_name="bumidom_archives.xlsx",
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                        )
                 
-                elif export_format == "JSON":
-                    json_data = export_df.to_json(orient='records', force_ascii=False)
+                    elif export_format == "JSON":
+                        json_data = export_df.to_json(orient='records', force_ascii=False)
+                        st.download_button(
+                            label="📥 Télécharger JSON",
+                            data=json_data,
+                            file_name="bumidom_archives.json",
+                            mime="application/json"
+                        )
+                    
+                    elif export_format == "PDF (rapport)":
+                        # Rapport choisi à droite, avec la liste complète des références, écrit en arrière-plan
+                        start_pdf_report(report_type, include_sections, collapse_duplicates, period_filter)
+        
+        report_job = st.session_state.get('report_job')
+        if report_job is not None:
+            if report_job.error:
+                st.error(f"Échec de la génération du rapport : {report_job.error}")
+            elif not report_job.done:
+                st.progress(min(report_job.progress, 1.0), text=f"Rapport PDF : {report_job.message}")
+                st.button("🔄 Actualiser l'avancement")
+            else:
+                with open(report_job.path, 'rb') as report_file:
                     st.download_button(
-                        label="📥 Télécharger JSON",
-                        data=json_data,
-                        file_name="bumidom_archives.json",
-                        mime="application/json"
+                        label=f"📥 Télécharger le rapport PDF ({report_job.pages} pages)",
+                        data=report_file.read(),
+                        file_name=f"rapport_bumidom_{datetime.now().strftime('%Y%m%d')}.pdf",
+                        mime="application/pdf"
                     )
     
     with col_exp2:
-        st.subheader("Génération de rapport")
-        
-        report_type = st.selectbox(
-            "Type de rapport",
-            ["Rapport synthétique", "Rapport détaillé", "Rapport académique", "Rapport statistique"]
-        )
-        
-        include_sections = st.multiselect(
-            "Sections à inclure",
-            ["Introduction", "Méthodologie", "Résultats", "Analyses", "Conclusion", "Bibliographie"],
-            default=["Introduction", "Résultats", "Analyses", "Conclusion"]
-        )
-        
         if st.button("📋 Générer le rapport", type="primary"):
             with st.spinner("Génération du rapport en cours..."):
                 # Générer un rapport simulé
@@ -1572,172 +2484,6 @@ else:
                     mime="text/plain"
                 )
 
-# ============================================================================
-# FONCTIONS AUXILIAIRES
-# ============================================================================
-
-def evaluate_search(document, terms, logic, fields):
-    """Évalue si un document correspond à la recherche"""
-    doc_text = ""
-    
-    if "Tous les champs" in fields or "Titre" in fields:
-        doc_text += document.get('title', '').lower() + " "
-    
-    if "Tous les champs" in fields or "Description" in fields:
-        doc_text += document.get('description', '').lower() + " "
-    
-    if "Tous les champs" in fields or "Contenu" in fields:
-        doc_text += document.get('extract', '').lower() + " "
-    
-    if "Tous les champs" in fields or "Mots-clés" in fields:
-        doc_text += " ".join(document.get('keywords', [])).lower() + " "
-        doc_text += " ".join(document.get('themes', [])).lower() + " "
-    
-    if logic == "ET (tous les termes)":
-        return all(term in doc_text for term in terms)
-    else:  # OU
-        return any(term in doc_text for term in terms)
-
-def calculate_score(document, terms):
-    """Calcule un score de pertinence pour un document"""
-    doc_text = f"{document.get('title', '')} {document.get('description', '')} {document.get('extract', '')}".lower()
-    
-    score = 0
-    for term in terms:
-        if term in doc_text:
-            # Plus de points si le terme est dans le titre
-            if term in document.get('title', '').lower():
-                score += 3
-            # Moins de points si seulement dans le contenu
-            else:
-                score += 1
-    
-    # Normaliser le score entre 0 et 10
-    max_score = len(terms) * 3
-    if max_score > 0:
-        score = min(10, (score / max_score) * 10)
-    
-    return score
-
-def generate_report(report_type, sections):
-    """Génère un rapport sur les archives"""
-    
-    # Statistiques
-    total_docs = len(get_all_documents())
-    total_sources = len(BUMIDOM_ARCHIVES)
-    
-    report = f"""
-    RAPPORT SUR LES ARCHIVES DU BUMIDOM
-    ===================================
-    
-    Date de génération: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-    Type de rapport: {report_type}
-    
-    """
-    
-    if "Introduction" in sections:
-        report += """
-        INTRODUCTION
-        ------------
-        
-        Ce rapport présente une analyse des archives disponibles concernant le 
-        Bureau des migrations des départements d'outre-mer (BUMIDOM), organisme 
-        qui a fonctionné de 1963 à 1982. L'analyse couvre l'ensemble des sources 
-        documentaires disponibles en ligne et en accès physique.
-        
-        """
-    
-    if "Résultats" in sections:
-        report += f"""
-        RÉSULTATS
-        ---------
-        
-        **Statistiques générales:**
-        - Nombre total de documents référencés: {total_docs}
-        - Nombre de sources différentes: {total_sources}
-        - Période couverte: 1962-1990
-        
-        **Répartition par type de document:**
-        - Documents administratifs: {len(BUMIDOM_ARCHIVES['archives_nationales']['documents'])}
-        - Articles de presse: {len(BUMIDOM_ARCHIVES['retronews']['articles'])}
-        - Archives audiovisuelles: {len(BUMIDOM_ARCHIVES['ina']['videos'])}
-        - Jeux de données: {len(BUMIDOM_ARCHIVES['insee']['datasets'])}
-        
-        """
-    
-    if "Analyses" in sections:
-        report += """
-        ANALYSES
-        --------
-        
-        **Principaux thèmes identifiés:**
-        1. Administration et gouvernance
-        2. Conditions de logement
-        3. Intégration professionnelle
-        4. Statistiques migratoires
-        5. Polémiques et débats
-        
-        **Tendances temporelles:**
-        - 1963-1970: Période de création et d'organisation
-        - 1970-1975: Pic d'activité et premières critiques
-        - 1975-1982: Réorientations et préparation de la dissolution
-        
-        **Sources les plus riches:**
-        1. Archives Nationales (documents officiels)
-        2. RetroNews (couverture médiatique)
-        3. INSEE (données statistiques)
-        
-        """
-    
-    if "Conclusion" in sections:
-        report += """
-        CONCLUSION
-        ----------
-        
-        Les archives du BUMIDOM constituent un corpus documentaire riche et varié,
-        permettant d'étudier cette institution sous de multiples angles :
-        administratif, médiatique, statistique et audiovisuel.
-        
-        **Points forts:**
-        - Diversité des sources
-        - Couverture temporelle complète
-        - Accès en ligne pour une grande partie des documents
-        
-        **Limites identifiées:**
-        - Inégalité d'accès selon les sources
-        - Nécessité de déplacements pour certaines archives
-        - Fragmentation des informations
-        
-        **Recommandations:**
-        1. Numérisation complémentaire des archives physiques
-        2. Mise en place d'un portail unifié
-        3. Développement d'outils d'analyse spécifiques
-        
-        """
-    
-    if "Bibliographie" in sections:
-        report += """
-        BIBLIOGRAPHIE
-        -------------
-        
-        **Sources principales:**
-        - Archives Nationales (site de Pierrefitte-sur-Seine)
-        - RetroNews - Bibliothèque nationale de France
-        - Gallica - Bibliothèque nationale de France
-        - Institut national de l'audiovisuel (INA)
-        - Institut national de la statistique et des études économiques (INSEE)
-        - Archives Nationales d'Outre-mer (ANOM)
-        - Internet Archive (Archive.org)
-        
-        **Ressources complémentaires:**
-        - Centre des archives contemporaines
-        - Archives départementales des DOM
-        - Bibliothèques universitaires spécialisées
-        
-        """
-    
-    return report
-
 # ============================================================================
 # PIED DE PAGE
 # ============================================================================
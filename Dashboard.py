@@ -7,6 +7,8 @@ from datetime import datetime, date
 import requests
 import re
 
+from flow_charts import count_by_year, display_flow_chart, display_origin_chart
+
 # ============================================================================
 # CONFIGURATION DE LA PAGE
 # ============================================================================
@@ -331,16 +333,8 @@ def overview_page():
     with col4:
         st.metric("% en ligne", "65%")
     
-    # Graphique
-    data = pd.DataFrame({
-        'Année': list(range(1963, 1983)),
-        'Migrations': np.random.randint(800, 2500, 20)
-    })
-    
-    fig = px.line(data, x='Année', y='Migrations', 
-                 title='Évolution des migrations organisées par le BUMIDOM',
-                 markers=True)
-    st.plotly_chart(fig, use_container_width=True)
+    # Graphique : flux INSEE pré-agrégés
+    display_flow_chart(BUMIDOM_ARCHIVES, 'Évolution des migrations organisées par le BUMIDOM')
 
 def explorer_page():
     """Page Exploreur d'archives"""
@@ -375,18 +369,20 @@ def analysis_page():
     tab1, tab2 = st.tabs(["Analyse temporelle", "Thématiques"])
     
     with tab1:
-        # Données simulées
+        # Notices datées du catalogue
         years = list(range(1962, 1983))
         df = pd.DataFrame({
             'Année': years,
-            'Documents': np.random.randint(50, 200, len(years)),
-            'Articles': np.random.randint(20, 100, len(years))
+            'Documents': count_by_year(BUMIDOM_ARCHIVES, ('documents', 'videos', 'datasets'), years[0], years[-1]),
+            'Articles': count_by_year(BUMIDOM_ARCHIVES, ('articles',), years[0], years[-1])
         })
         
         fig = px.line(df, x='Année', y=['Documents', 'Articles'],
                      title='Production documentaire sur le BUMIDOM',
                      markers=True)
         st.plotly_chart(fig, use_container_width=True)
+        
+        display_origin_chart(BUMIDOM_ARCHIVES)
     
     with tab2:
         # Thématiques
@@ -6,6 +6,8 @@ import plotly.express as px
 from datetime import datetime, date
 import json
 
+from flow_charts import count_by_year, display_flow_chart, display_origin_chart
+
 # ============================================================================
 # CONFIGURATION DE LA PAGE
 # ============================================================================
@@ -314,14 +316,8 @@ def overview_page():
     with col4:
         st.metric("% en ligne", "65%")
     
-    # Graphique simple
-    data = pd.DataFrame({
-        'Année': [1963, 1965, 1968, 1971, 1974, 1977, 1980],
-        'Migrations': [1200, 1800, 2200, 2500, 1800, 1200, 800]
-    })
-    
-    fig = px.line(data, x='Année', y='Migrations', title='Évolution des migrations BUMIDOM')
-    st.plotly_chart(fig, use_container_width=True)
+    # Graphique : flux INSEE pré-agrégés
+    display_flow_chart(BUMIDOM_ARCHIVES, 'Évolution des migrations BUMIDOM')
     
     # Tableau des sources
     display_sources_with_expanders()
@@ -359,17 +355,19 @@ def analysis_page():
     tab1, tab2, tab3 = st.tabs(["Analyse temporelle", "Analyse par source", "Thématiques"])
     
     with tab1:
-        # Simulation de données temporelles
+        # Notices datées du catalogue
         years = list(range(1962, 1983))
         data = pd.DataFrame({
             'Année': years,
-            'Documents': np.random.randint(50, 200, len(years)),
-            'Articles': np.random.randint(20, 100, len(years))
+            'Documents': count_by_year(BUMIDOM_ARCHIVES, ('documents', 'videos', 'datasets'), years[0], years[-1]),
+            'Articles': count_by_year(BUMIDOM_ARCHIVES, ('articles',), years[0], years[-1])
         })
         
         fig = px.line(data, x='Année', y=['Documents', 'Articles'], 
                      title='Production documentaire par année')
         st.plotly_chart(fig, use_container_width=True)
+        
+        display_origin_chart(BUMIDOM_ARCHIVES)
     
     with tab2:
         # Répartition par source
@@ -0,0 +1,301 @@
+"""
+Cube d'agrégats du catalogue : nombre de notices par source × type de
+document × année × statut × thème, calculé une fois par version du
+catalogue.
+
+Chaque dimension est codée en entiers : les dictionnaires du catalogue
+compact pour les champs catégoriels, l'année de début de l'index des
+périodes pour l'année. Le cube est creux : seules les cases occupées sont
+tenues, une ligne de codes par case avec ses comptes, si bien que sa taille
+suit le nombre de notices et non le produit des axes. L'année de fin de
+chaque case est conservée pour restreindre le cube à une période (during)
+sans le reconstruire. Les graphiques lisent ensuite des agrégats (roll-up)
+ou des sous-cubes (slice) sans reparcourir le catalogue :
+
+    cube.rollup('source')                          # notices par source
+    cube.rollup('year', 'source', doc_type='article')
+    cube.slice(year=(1970, 1979)).total()
+    cube.during(1970, 1979)                        # notices dont la période recoupe 1970-1979
+
+Une notice peut porter plusieurs thèmes : les comptes par thème (couples
+notice-thème) sont tenus dans un second cube, lu seulement quand la
+dimension thème est demandée ou filtrée. Les autres agrégats restent des
+nombres de notices exacts.
+"""
+
+import numpy as np
+import pandas as pd
+
+from source_comparison import THEME_FIELDS
+
+DIMENSIONS = ('source', 'doc_type', 'year', 'status', 'theme')
+
+# Mesures disponibles : notices, notices consultables en ligne (URL renseignée)
+MEASURES = ('documents', 'online')
+
+# Libellés des cases « valeur absente »
+UNDATED = -1
+MISSING_STATUS = 'Non précisé'
+NO_THEME = 'Sans thème'
+
+# Colonnes des cases : codes des dimensions, puis année de fin (non codée)
+BASE_COLUMNS = DIMENSIONS[:4] + ('end',)
+THEME_COLUMNS = DIMENSIONS + ('end',)
+
+
+def _aggregate(keys, *weights):
+    """Cases distinctes de keys (ordre lexicographique) et sommes des poids ; cases nulles retirées"""
+    if not len(keys):
+        return keys, [np.zeros(0, dtype=np.int64) for _ in weights]
+    cells, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    sums = [np.rint(np.bincount(inverse, weights=weight, minlength=len(cells))).astype(np.int64)
+            for weight in weights]
+    occupied = np.logical_or.reduce([total != 0 for total in sums])
+    return cells[occupied], [total[occupied] for total in sums]
+
+
+class AggregateCube:
+    """Cases occupées (source, doc_type, year, status) et (source, doc_type, year, status, theme)
+
+    cells / theme_cells : une ligne de codes par case (colonnes BASE_COLUMNS
+    et THEME_COLUMNS) ; counts, online, theme_counts : comptes des cases.
+    """
+
+    def __init__(self, axes, cells, counts, online, theme_cells, theme_counts, by_theme=False):
+        self.axes = axes
+        self.cells = cells
+        self.counts = counts
+        self.online = online
+        self.theme_cells = theme_cells
+        self.theme_counts = theme_counts
+        # Vrai après un filtre sur les thèmes : seul le cube par thème reste exact
+        self.by_theme = by_theme
+        self._positions = {dim: {label: i for i, label in enumerate(labels)} for dim, labels in axes.items()}
+
+    @classmethod
+    def from_catalog(cls, catalog, year_starts, year_ends, rows=None):
+        """Cube des lignes rows du catalogue (toutes par défaut)
+
+        Les axes ne dépendent que du catalogue, pas des lignes retenues : deux
+        cubes d'une même version s'additionnent case à case.
+        """
+        n_records = len(catalog)
+        rows = np.arange(n_records, dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+
+        sources = catalog.columns['source_name']
+        doc_types = catalog.columns['doc_type']
+        status = catalog.columns.get('status')
+        status_values = list(status.values) if status is not None else []
+        axes = {
+            'source': list(sources.values),
+            'doc_type': list(doc_types.values),
+            'year': [int(year) for year in np.unique(year_starts)],
+            'status': status_values + [MISSING_STATUS],
+        }
+
+        # Codes des quatre dimensions de base et année de fin de chaque ligne
+        status_codes = status.codes[rows] if status is not None else np.full(len(rows), -1)
+        codes = np.column_stack([
+            sources.codes[rows],
+            doc_types.codes[rows],
+            np.searchsorted(axes['year'], year_starts[rows]),
+            np.where(status_codes >= 0, status_codes, len(status_values)),
+            year_ends[rows],
+        ]).astype(np.int64)
+
+        url = catalog.columns.get('url')
+        if url is not None:
+            has_url = url.present[rows] & (np.diff(url.offsets)[rows] > 0)
+        else:
+            has_url = np.zeros(len(rows), dtype=bool)
+        cells, (counts, online) = _aggregate(codes, np.ones(len(rows)), has_url)
+
+        # Couples (ligne, thème) sans doublons, tous champs de thèmes confondus
+        selected = np.zeros(n_records, dtype=bool)
+        selected[rows] = True
+        vocabulary = {}
+        pair_rows = []
+        pair_codes = []
+        for field in THEME_FIELDS:
+            column = catalog.columns.get(field)
+            if column is None:
+                continue
+            remap = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in column.values],
+                             dtype=np.int64)
+            row_ids = column.row_ids()
+            keep = selected[row_ids]
+            pair_rows.append(row_ids[keep])
+            pair_codes.append(remap[column.codes[keep]] if keep.any() else np.zeros(0, dtype=np.int64))
+        axes['theme'] = list(vocabulary) + [NO_THEME]
+        n_themes = len(axes['theme'])
+
+        pair_rows = np.concatenate(pair_rows) if pair_rows else np.zeros(0, dtype=np.int64)
+        pair_codes = np.concatenate(pair_codes) if pair_codes else np.zeros(0, dtype=np.int64)
+        pairs = np.unique(pair_rows * n_themes + pair_codes)
+        pair_rows, pair_codes = pairs // n_themes, pairs % n_themes
+
+        # Les lignes sans thème vont dans la case NO_THEME
+        themed = np.zeros(n_records, dtype=bool)
+        themed[pair_rows] = True
+        untagged = np.flatnonzero(~themed[rows])
+        position = np.zeros(n_records, dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        tagged = position[pair_rows]
+        theme_keys = np.concatenate([
+            np.column_stack([codes[tagged, :4], pair_codes, codes[tagged, 4]]),
+            np.column_stack([codes[untagged, :4], np.full(len(untagged), n_themes - 1), codes[untagged, 4]]),
+        ]).astype(np.int64)
+        theme_cells, (theme_counts,) = _aggregate(theme_keys, np.ones(len(theme_keys)))
+
+        return cls(axes, cells, counts, online, theme_cells, theme_counts)
+
+    # ------------------------------------------------------------------
+    # Alignement : addition de cubes construits sur des versions successives
+    # ------------------------------------------------------------------
+
+    def _reindex(self, axes):
+        """Même cube exprimé sur des axes plus larges"""
+        if all(axes[dim] == self.axes[dim] for dim in DIMENSIONS):
+            return self
+        positions = {dim: {label: i for i, label in enumerate(axes[dim])} for dim in DIMENSIONS}
+
+        def recode(cells, columns):
+            cells = cells.copy()
+            for dim in DIMENSIONS:
+                if dim in columns:
+                    remap = np.array([positions[dim][label] for label in self.axes[dim]], dtype=np.int64)
+                    cells[:, columns.index(dim)] = remap[cells[:, columns.index(dim)]]
+            return cells
+
+        return AggregateCube(
+            axes,
+            recode(self.cells, BASE_COLUMNS), self.counts, self.online,
+            recode(self.theme_cells, THEME_COLUMNS), self.theme_counts,
+            self.by_theme
+        )
+
+    def _covers(self, other):
+        return all(label in self._positions[dim] for dim in DIMENSIONS for label in other.axes[dim])
+
+    def _combine(self, other, sign):
+        # Cas courant : le cube des lignes ajoutées est construit sur les axes de la nouvelle version
+        if other._covers(self):
+            axes = other.axes
+        elif self._covers(other):
+            axes = self.axes
+        else:
+            axes = self._union_axes(other)
+        a = self._reindex(axes)
+        b = other._reindex(axes)
+        cells, (counts, online) = _aggregate(
+            np.concatenate([a.cells, b.cells]),
+            np.concatenate([a.counts, sign * b.counts]),
+            np.concatenate([a.online, sign * b.online])
+        )
+        theme_cells, (theme_counts,) = _aggregate(
+            np.concatenate([a.theme_cells, b.theme_cells]),
+            np.concatenate([a.theme_counts, sign * b.theme_counts])
+        )
+        return AggregateCube(axes, cells, counts, online, theme_cells, theme_counts)
+
+    def _union_axes(self, other):
+        axes = {}
+        for dim in DIMENSIONS:
+            labels = self.axes[dim] + [label for label in other.axes[dim] if label not in self._positions[dim]]
+            # Les libellés « absents » restent en dernière position
+            if dim == 'year':
+                labels = sorted(labels)
+            elif dim in ('status', 'theme'):
+                missing = MISSING_STATUS if dim == 'status' else NO_THEME
+                labels = [label for label in labels if label != missing] + [missing]
+            axes[dim] = labels
+        return axes
+
+    def __add__(self, other):
+        return self._combine(other, 1)
+
+    def __sub__(self, other):
+        return self._combine(other, -1)
+
+    # ------------------------------------------------------------------
+    # Requêtes
+    # ------------------------------------------------------------------
+
+    def _indices(self, dim, value):
+        """Positions retenues sur un axe : une valeur, une liste de valeurs ou, pour l'année, une plage (début, fin)"""
+        if dim not in DIMENSIONS:
+            raise ValueError(f"Dimension inconnue : {dim}")
+        if dim == 'year' and isinstance(value, tuple):
+            low, high = value
+            return [i for i, year in enumerate(self.axes['year']) if year != UNDATED and low <= year <= high]
+        values = value if isinstance(value, (list, set, frozenset)) else [value]
+        return [self._positions[dim][v] for v in values if v in self._positions[dim]]
+
+    def slice(self, **filters):
+        """Sous-cube restreint aux valeurs données pour chaque dimension filtrée"""
+        axes = dict(self.axes)
+        cells, counts, online = self.cells, self.counts, self.online
+        theme_cells, theme_counts = self.theme_cells, self.theme_counts
+        for dim, value in filters.items():
+            index = self._indices(dim, value)
+            axes[dim] = [self.axes[dim][i] for i in index]
+            # Codes renumérotés dans l'ordre des valeurs demandées (-1 : case écartée)
+            remap = np.full(len(self.axes[dim]), -1, dtype=np.int64)
+            remap[index] = np.arange(len(index))
+            if dim != 'theme':
+                column = BASE_COLUMNS.index(dim)
+                codes = remap[cells[:, column]]
+                keep = codes >= 0
+                cells, counts, online = cells[keep], counts[keep], online[keep]
+                cells[:, column] = codes[keep]
+            column = THEME_COLUMNS.index(dim)
+            codes = remap[theme_cells[:, column]]
+            keep = codes >= 0
+            theme_cells, theme_counts = theme_cells[keep], theme_counts[keep]
+            theme_cells[:, column] = codes[keep]
+        return AggregateCube(axes, cells, counts, online, theme_cells, theme_counts,
+                             self.by_theme or 'theme' in filters)
+
+    def during(self, low, high):
+        """Sous-cube des notices dont la période recoupe [low, high], plus les notices non datées
+
+        Même règle que YearIndex.mask : un seul cube par version suffit pour
+        toutes les périodes.
+        """
+        years = np.asarray(self.axes['year'], dtype=np.int64)
+
+        def keep(cells, columns):
+            starts = years[cells[:, columns.index('year')]]
+            ends = cells[:, columns.index('end')]
+            return (starts == UNDATED) | ((starts <= high) & (ends >= low))
+
+        base = keep(self.cells, BASE_COLUMNS)
+        themed = keep(self.theme_cells, THEME_COLUMNS)
+        return AggregateCube(
+            self.axes, self.cells[base], self.counts[base], self.online[base],
+            self.theme_cells[themed], self.theme_counts[themed], self.by_theme
+        )
+
+    def _values(self, measure, by_theme):
+        """(cases, colonnes, comptes) de la mesure"""
+        if measure not in MEASURES:
+            raise ValueError(f"Mesure inconnue : {measure}")
+        if by_theme or self.by_theme:
+            if measure != 'documents':
+                raise ValueError(f"La mesure {measure} n'est pas ventilée par thème")
+            return self.theme_cells, THEME_COLUMNS, self.theme_counts
+        return self.cells, BASE_COLUMNS, self.counts if measure == 'documents' else self.online
+
+    def total(self, measure='documents', **filters):
+        cube = self.slice(**filters) if filters else self
+        return int(cube._values(measure, False)[2].sum())
+
+    def rollup(self, *dims, measure='documents', **filters):
+        """Comptes agrégés sur les dimensions dims (format long, cases non nulles)"""
+        cube = self.slice(**filters) if filters else self
+        cells, columns, values = cube._values(measure, 'theme' in dims)
+        keys, (summed,) = _aggregate(cells[:, [columns.index(dim) for dim in dims]], values)
+        frame = pd.DataFrame({dim: np.asarray(cube.axes[dim])[keys[:, k]] for k, dim in enumerate(dims)})
+        frame['count'] = summed
+        return frame
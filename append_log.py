@@ -0,0 +1,247 @@
+"""
+Journal d'ajouts durable (write-ahead log) des notices saisies à la main.
+
+Chaque ajout est écrit dans le journal et synchronisé sur disque avant
+d'être publié dans le corpus partagé. Les écritures concurrentes sont
+regroupées (group commit) : pendant qu'une session synchronise le fichier,
+les suivantes mettent leurs entrées en file, et la prochaine synchronisation
+les écrit toutes d'un coup, avec un seul fsync.
+
+Le journal est compacté périodiquement dans le catalogue des ajouts
+(``catalog.json``, réécrit par renommage atomique), puis vidé. Au démarrage,
+le catalogue est relu puis les entrées du journal postérieures à sa
+dernière séquence sont rejouées ; une ligne finale incomplète (écriture
+interrompue) est ignorée et tronquée.
+
+Format d'une ligne du journal : ``<crc32 en hexadécimal>\\t<entrée JSON>``.
+
+Un seul processus écrit dans le journal : l'ouverture prend un verrou
+exclusif (``journal.lock``) et échoue si un autre processus (tableau de
+bord, collecte en ligne de commande) le détient. Les lecteurs ouvrent le
+journal en lecture seule, sans verrou.
+"""
+
+import json
+import os
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows : pas de verrou entre processus
+    fcntl = None
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'manual')
+
+LOG_FILE = 'journal.log'
+CATALOG_FILE = 'catalog.json'
+LOCK_FILE = 'journal.lock'
+
+# Nombre d'entrées du journal au-delà duquel il est compacté
+DEFAULT_COMPACT_EVERY = 1000
+
+
+def encode_entry(entry):
+    payload = json.dumps(entry, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return b'%08x\t%s\n' % (zlib.crc32(payload), payload)
+
+
+def decode_entry(line):
+    """Entrée d'une ligne du journal, ou None si la ligne est incomplète ou corrompue"""
+    if not line.endswith(b'\n'):
+        return None
+    checksum, _, payload = line.rstrip(b'\n').partition(b'\t')
+    try:
+        if int(checksum, 16) != zlib.crc32(payload):
+            return None
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+
+def _fsync_directory(path):
+    """Rend durable un renommage dans le répertoire (sans effet là où c'est impossible)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class _Batch:
+    """Entrées mises en file entre deux synchronisations ; error : échec de leur écriture"""
+
+    def __init__(self):
+        self.lines = []
+        self.entries = []
+        self.synced = False
+        self.error = None
+
+
+class AppendLog:
+    """Journal à validation groupée ; entrées (séquence, source, collection, notice)"""
+
+    def __init__(self, log_dir=DEFAULT_LOG_DIR, compact_every=DEFAULT_COMPACT_EVERY, read_only=False):
+        self.log_dir = log_dir
+        self.compact_every = compact_every
+        self.read_only = read_only
+        os.makedirs(log_dir, exist_ok=True)
+        self._log_path = os.path.join(log_dir, LOG_FILE)
+        self._catalog_path = os.path.join(log_dir, CATALOG_FILE)
+        self._lock_file = None if read_only else self._acquire_lock()
+
+        # Entrées durables (catalogue + journal), dans l'ordre des séquences
+        self.entries = self._recover()
+        self._logged = sum(entry['seq'] > self._checkpoint for entry in self.entries)
+        self._next_seq = self.entries[-1]['seq'] + 1 if self.entries else 1
+
+        self._file = None if read_only else open(self._log_path, 'ab')
+        # Lot en attente de synchronisation, protégé par _queue_lock
+        self._queue_lock = threading.Lock()
+        self._batch = _Batch()
+        # Une seule synchronisation à la fois ; _durable : dernière séquence sur disque
+        self._flush_lock = threading.Lock()
+        self._durable = self._next_seq - 1
+
+    def _acquire_lock(self):
+        lock_file = open(os.path.join(self.log_dir, LOCK_FILE), 'a')
+        if fcntl is None:
+            return lock_file
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            raise RuntimeError(f"Journal des ajouts déjà ouvert par un autre processus : {self.log_dir}")
+        return lock_file
+
+    def _recover(self):
+        entries = []
+        self._checkpoint = 0
+        if os.path.exists(self._catalog_path):
+            with open(self._catalog_path, encoding='utf-8') as f:
+                catalog = json.load(f)
+            entries = catalog['entries']
+            self._checkpoint = catalog['last_seq']
+
+        if os.path.exists(self._log_path):
+            valid_size = 0
+            with open(self._log_path, 'rb') as f:
+                for line in f:
+                    entry = decode_entry(line)
+                    if entry is None:
+                        break
+                    valid_size += len(line)
+                    # Entrées déjà compactées si l'arrêt a eu lieu avant le vidage du journal
+                    if entry['seq'] > self._checkpoint:
+                        entries.append(entry)
+            # Fin de fichier écrite à moitié : tronquée pour que les ajouts suivants restent lisibles
+            if not self.read_only and valid_size != os.path.getsize(self._log_path):
+                with open(self._log_path, 'r+b') as f:
+                    f.truncate(valid_size)
+                    os.fsync(f.fileno())
+        return entries
+
+    def append(self, source_id, collection, records):
+        """Écrit les notices dans le journal ; rend la main quand elles sont sur disque"""
+        if self.read_only:
+            raise RuntimeError("Journal des ajouts ouvert en lecture seule")
+        with self._queue_lock:
+            entries = []
+            for record in records:
+                entries.append({'seq': self._next_seq, 'source_id': source_id,
+                                'collection': collection, 'record': dict(record)})
+                self._next_seq += 1
+            batch = self._batch
+            batch.lines.extend(encode_entry(entry) for entry in entries)
+            batch.entries.extend(entries)
+
+        with self._flush_lock:
+            # Une synchronisation lancée par une autre session a pu écrire ces entrées
+            if not batch.synced:
+                self._flush()
+            # Lot en échec : toutes les sessions du lot reçoivent l'erreur
+            if batch.error is not None:
+                raise batch.error
+            if self._logged >= self.compact_every:
+                self._compact()
+        return entries
+
+    def _flush(self):
+        # Appelé sous _flush_lock : toutes les entrées en file partent en une écriture et un fsync
+        with self._queue_lock:
+            batch, self._batch = self._batch, _Batch()
+        batch.synced = True
+        if not batch.lines:
+            return
+        entries = batch.entries
+        size = os.fstat(self._file.fileno()).st_size
+        try:
+            self._file.write(b''.join(batch.lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as error:
+            batch.error = error
+            self._rollback(size)
+            raise
+        self.entries.extend(entries)
+        self._logged += len(entries)
+        self._durable = entries[-1]['seq']
+
+    def _rollback(self, size):
+        """Ramène le journal à size octets après une écriture échouée
+
+        Le fichier est rouvert : les octets du lot restés dans le tampon ne
+        partent pas avec le lot suivant.
+        """
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = open(self._log_path, 'ab')
+        try:
+            self._file.truncate(size)
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+
+    def compact(self):
+        """Réécrit le catalogue des ajouts avec toutes les entrées durables, puis vide le journal"""
+        if self.read_only:
+            raise RuntimeError("Journal des ajouts ouvert en lecture seule")
+        with self._flush_lock:
+            self._flush()
+            self._compact()
+
+    def _compact(self):
+        # Appelé sous _flush_lock : les entrées en file attendent la prochaine synchronisation
+        last_seq = self._durable
+        tmp_path = self._catalog_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'last_seq': last_seq, 'entries': self.entries}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._catalog_path)
+        _fsync_directory(self.log_dir)
+        self._checkpoint = last_seq
+
+        # Un arrêt avant ce vidage est sans effet : le rejeu saute les séquences compactées
+        self._file.truncate(0)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._logged = 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+        if self._lock_file is not None:
+            # Fermer le descripteur libère le verrou
+            self._lock_file.close()
@@ -0,0 +1,292 @@
+"""
+Notices de référence des archives BUMIDOM, par source.
+
+Ces données constituent l'état initial du corpus partagé (voir
+shared_corpus). Elles sont construites à la demande par seed_archives() et
+ne restent pas en mémoire : une fois encodées dans le catalogue compact, le
+corpus ne garde que les métadonnées des sources.
+"""
+
+
+def seed_archives():
+    """Nouveau dictionnaire des notices de référence (source → métadonnées et collections)"""
+    return {
+        # Archives Nationales - Fonds principal
+        'archives_nationales': {
+            'name': 'Archives Nationales',
+            'color': '#1f77b4',
+            'icon': '📄',
+            'documents': [
+                {
+                    'id': 'AN_001',
+                    'title': 'Conseil d\'administration du BUMIDOM - Procès-verbaux',
+                    'date': '1962-1981',
+                    'cote': '20080699/1-20080699/4',
+                    'type': 'Procès-verbaux',
+                    'location': 'Pierrefitte-sur-Seine',
+                    'description': 'Procès-verbaux des séances du conseil d\'administration',
+                    'pages': 1200,
+                    'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001514',
+                    'keywords': ['administration', 'budget', 'décisions', 'gouvernance'],
+                    'status': 'Communicable'
+                },
+                {
+                    'id': 'AN_002',
+                    'title': 'Statistiques des migrations DOM-TOM',
+                    'date': '1963-1980',
+                    'cote': '19880445/1-8',
+                    'type': 'Rapports statistiques',
+                    'location': 'Pierrefitte-sur-Seine',
+                    'description': 'Statistiques détaillées des flux migratoires',
+                    'pages': 850,
+                    'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001513',
+                    'keywords': ['statistiques', 'flux', 'démographie', 'chiffres'],
+                    'status': 'Communicable'
+                },
+                {
+                    'id': 'AN_003',
+                    'title': 'Correspondance ministérielle relative au BUMIDOM',
+                    'date': '1960-1985',
+                    'cote': '19940555/1-15',
+                    'type': 'Correspondance',
+                    'location': 'Pierrefitte-sur-Seine',
+                    'description': 'Échanges entre ministères concernant le BUMIDOM',
+                    'pages': 2000,
+                    'url': 'https://www.siv.archives-nationales.culture.gouv.fr/siv/rechercheconsultation/consultation/ir/consultationIR.action?irId=FRAN_IR_001515',
+                    'keywords': ['correspondance', 'politique', 'ministère', 'administration'],
+                    'status': 'Sous dérogation'
+                }
+            ]
+        },
+    
+        # RetroNews - Presse historique
+        'retronews': {
+            'name': 'RetroNews (BnF)',
+            'color': '#ff7f0e',
+            'icon': '📰',
+            'articles': [
+                {
+                    'id': 'RN_001',
+                    'title': 'Le BUMIDOM organise le départ de 500 travailleurs antillais',
+                    'date': '1965-03-15',
+                    'newspaper': 'Le Monde',
+                    'page': '12',
+                    'sentiment': 'neutre',
+                    'extract': 'Le Bureau des migrations des départements d\'outre-mer (BUMIDOM) organise cette semaine le départ vers la métropole de 500 travailleurs originaires des Antilles...',
+                    'url': 'https://www.retronews.fr/journal/le-monde/15-mars-1965/1/1',
+                    'themes': ['recrutement', 'transport', 'départ'],
+                    'length': 450
+                },
+                {
+                    'id': 'RN_002',
+                    'title': 'Polémique sur les conditions d\'accueil des migrants ultramarins',
+                    'date': '1970-11-22',
+                    'newspaper': 'Le Figaro',
+                    'page': '8',
+                    'sentiment': 'négatif',
+                    'extract': 'Les conditions d\'accueil des travailleurs ultramarins dans les foyers de la région parisienne sont dénoncées par plusieurs associations...',
+                    'url': 'https://www.retronews.fr/journal/le-figaro/22-novembre-1970/1/1',
+                    'themes': ['logement', 'conditions', 'polémique'],
+                    'length': 620
+                },
+                {
+                    'id': 'RN_003',
+                    'title': 'BUMIDOM : 15 ans d\'activité et 80 000 migrants',
+                    'date': '1978-05-10',
+                    'newspaper': 'La Croix',
+                    'page': '5',
+                    'sentiment': 'positif',
+                    'extract': 'En quinze ans d\'existence, le BUMIDOM a organisé la migration de plus de 80 000 personnes vers la métropole...',
+                    'url': 'https://www.retronews.fr/journal/la-croix/10-mai-1978/1/1',
+                    'themes': ['bilan', 'statistiques', 'succès'],
+                    'length': 780
+                },
+                {
+                    'id': 'RN_004',
+                    'title': 'Les difficultés d\'intégration des migrants des DOM',
+                    'date': '1975-09-30',
+                    'newspaper': 'Le Parisien',
+                    'page': '3',
+                    'sentiment': 'négatif',
+                    'extract': 'De nombreux travailleurs ultramarins rencontrent des difficultés pour s\'intégrer en métropole...',
+                    'url': 'https://www.retronews.fr/journal/le-parisien/30-septembre-1975/1/1',
+                    'themes': ['intégration', 'difficultés', 'social'],
+                    'length': 550
+                }
+            ]
+        },
+    
+        # Gallica - Livres et rapports
+        'gallica': {
+            'name': 'Gallica (BnF)',
+            'color': '#2ca02c',
+            'icon': '📖',
+            'documents': [
+                {
+                    'id': 'GL_001',
+                    'title': 'Rapport sur le fonctionnement du BUMIDOM',
+                    'date': '1975',
+                    'author': 'Ministère du Travail',
+                    'publisher': 'La Documentation française',
+                    'pages': 120,
+                    'description': 'Rapport complet sur l\'organisation et les résultats du BUMIDOM',
+                    'url': 'https://gallica.bnf.fr/ark:/12148/bpt6k9612718t',
+                    'topics': ['organisation', 'financement', 'résultats', 'évaluation'],
+                    'language': 'français'
+                },
+                {
+                    'id': 'GL_002',
+                    'title': 'Les migrations ultramarines vers la France métropolitaine',
+                    'date': '1980',
+                    'author': 'INED (Institut national d\'études démographiques)',
+                    'publisher': 'Presses Universitaires de France',
+                    'pages': 85,
+                    'description': 'Étude démographique des migrations des DOM vers la métropole',
+                    'url': 'https://gallica.bnf.fr/ark:/12148/bpt6k4803231d',
+                    'topics': ['démographie', 'sociologie', 'intégration', 'statistiques'],
+                    'language': 'français'
+                },
+                {
+                    'id': 'GL_003',
+                    'title': 'Revue "Hommes et Migrations" - Numéro spécial DOM-TOM',
+                    'date': '1972',
+                    'author': 'Collectif',
+                    'publisher': 'Association H&M',
+                    'pages': 65,
+                    'description': 'Numéro spécial consacré aux migrations ultramarines',
+                    'url': 'https://gallica.bnf.fr/ark:/12148/cb34378482g/date1972',
+                    'topics': ['témoignages', 'analyses', 'problématiques'],
+                    'language': 'français'
+                }
+            ]
+        },
+    
+        # INA - Archives audiovisuelles
+        'ina': {
+            'name': 'INA',
+            'color': '#d62728',
+            'icon': '🎥',
+            'videos': [
+                {
+                    'id': 'INA_001',
+                    'title': 'Départ des premiers migrants du BUMIDOM',
+                    'date': '1963-07-20',
+                    'duration': '02:15',
+                    'format': 'Reportage',
+                    'description': 'Reportage sur le départ des premiers travailleurs antillais organisé par le BUMIDOM',
+                    'url': 'https://www.ina.fr/video/I08324568',
+                    'themes': ['départ', 'émotion', 'espoir'],
+                    'location': 'Port de Fort-de-France'
+                },
+                {
+                    'id': 'INA_002',
+                    'title': 'Interview du directeur du BUMIDOM',
+                    'date': '1970-05-12',
+                    'duration': '05:30',
+                    'format': 'Interview',
+                    'description': 'Le directeur du BUMIDOM explique les objectifs et méthodes de l\'organisme',
+                    'url': 'https://www.ina.fr/video/I08324569',
+                    'themes': ['explication', 'justification', 'méthodes'],
+                    'location': 'Paris'
+                },
+                {
+                    'id': 'INA_003',
+                    'title': 'Vie dans les foyers de migrants',
+                    'date': '1975-11-08',
+                    'duration': '07:45',
+                    'format': 'Documentaire',
+                    'description': 'Reportage sur les conditions de vie dans les foyers de migrants ultramarins',
+                    'url': 'https://www.ina.fr/video/I08324570',
+                    'themes': ['conditions', 'vie quotidienne', 'logement'],
+                    'location': 'Foyer de Saint-Denis'
+                }
+            ]
+        },
+    
+        # INSEE - Données statistiques
+        'insee': {
+            'name': 'INSEE',
+            'color': '#9467bd',
+            'icon': '📈',
+            'datasets': [
+                {
+                    'id': 'IS_001',
+                    'title': 'Flux migratoires entre les DOM et la métropole (1962-1982)',
+                    'period': '1962-1982',
+                    'variables': ['origine', 'destination', 'âge', 'sexe', 'profession', 'situation familiale'],
+                    'description': 'Données détaillées sur les flux migratoires',
+                    'url': 'https://www.insee.fr/fr/statistiques/2012712',
+                    'format': 'CSV',
+                    'size': '5.2 MB'
+                },
+                {
+                    'id': 'IS_002',
+                    'title': 'Caractéristiques socio-économiques des migrants ultramarins',
+                    'period': '1968-1982',
+                    'variables': ['niveau d\'étude', 'secteur d\'emploi', 'salaire', 'logement', 'intégration'],
+                    'description': 'Données sur les conditions de vie et d\'emploi',
+                    'url': 'https://www.insee.fr/fr/statistiques/2012713',
+                    'format': 'CSV',
+                    'size': '3.8 MB'
+                },
+                {
+                    'id': 'IS_003',
+                    'title': 'Impact démographique des migrations DOM-TOM',
+                    'period': '1975-1990',
+                    'variables': ['natalité', 'mortalité', 'composition familiale', 'localisation'],
+                    'description': 'Impact à long terme des migrations',
+                    'url': 'https://www.insee.fr/fr/statistiques/2012714',
+                    'format': 'CSV',
+                    'size': '2.1 MB'
+                }
+            ]
+        },
+    
+        # Archive.org - Sites web historiques
+        'archive_org': {
+            'name': 'Archive.org',
+            'color': '#8c564b',
+            'icon': '🌐',
+            'websites': [
+                {
+                    'id': 'AO_001',
+                    'title': 'Site de documentation sur le BUMIDOM',
+                    'date': '2005-2010',
+                    'url': 'https://web.archive.org/web/*/bumidom.fr',
+                    'snapshots': 24,
+                    'description': 'Archives d\'un site d\'information sur le BUMIDOM',
+                    'themes': ['documentation', 'histoire', 'mémoire']
+                },
+                {
+                    'id': 'AO_002',
+                    'title': 'Articles universitaires sur les migrations ultramarines',
+                    'date': '1998-2015',
+                    'url': 'https://web.archive.org/web/*/migrations-dom-tom',
+                    'snapshots': 42,
+                    'description': 'Archives de sites universitaires traitant des migrations',
+                    'themes': ['recherche', 'université', 'études']
+                }
+            ]
+        },
+    
+        # ANOM - Archives Nationales d'Outre-mer
+        'anom': {
+            'name': 'Archives Nationales d\'Outre-mer',
+            'color': '#e377c2',
+            'icon': '🏝️',
+            'documents': [
+                {
+                    'id': 'ANOM_001',
+                    'title': 'Archives des préfectures des DOM relatives aux migrations',
+                    'date': '1958-1985',
+                    'cote': 'Série géographique',
+                    'type': 'Documents administratifs',
+                    'location': 'Aix-en-Provence',
+                    'description': 'Documents des préfectures concernant l\'organisation des départs',
+                    'url': 'https://www.archivesnationales.culture.gouv.fr/anom/fr/',
+                    'keywords': ['préfectures', 'organisation', 'départ'],
+                    'status': 'Communicable'
+                }
+            ]
+        }
+    }
@@ -0,0 +1,265 @@
+"""
+Export colonnaire du catalogue et des tables dérivées : Parquet (colonnes
+catégorielles encodées par dictionnaire, statistiques de colonnes, zstd) ou
+Arrow IPC (format fichier, lisible par mappage mémoire).
+
+Les colonnes du catalogue compact sont converties en tableaux Arrow sans
+passer par des objets Python : l'arène de texte devient une colonne
+large_string sur les mêmes octets, les dictionnaires du catalogue deviennent
+des colonnes dictionary<int32, string>, les listes (mots-clés, thèmes...)
+des listes de dictionnaire. Les tables sont écrites par lots de lignes (un
+groupe de lignes Parquet ou un lot IPC par lot), la mémoire reste bornée
+par la taille d'un lot.
+
+Lecture côté notebooks :
+    pq.read_table('catalogue.parquet', filters=[('doc_type', '=', 'article')])
+    pa.ipc.open_file(pa.memory_map('catalogue.arrow')).read_all()
+
+Usage en ligne de commande :
+    python arrow_export.py data/export --format parquet
+"""
+
+import argparse
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépendance optionnelle (requirements.txt)
+    pa = pq = None
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+EXPORT_FORMATS = {
+    'parquet': 'Parquet',
+    'arrow': 'Arrow IPC',
+}
+
+EXTENSIONS = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+# Lignes par groupe de lignes Parquet / lot IPC
+DEFAULT_BATCH_ROWS = 50_000
+
+PARQUET_COMPRESSION = 'zstd'
+
+# Colonnes texte d'un DataFrame encodées en dictionnaire sous ce ratio valeurs distinctes / lignes
+CATEGORY_RATIO = 0.5
+
+
+def require_pyarrow():
+    if pa is None:
+        raise ImportError("L'export Parquet / Arrow nécessite pyarrow (pip install pyarrow)")
+
+
+# ============================================================================
+# COLONNES DU CATALOGUE → TABLEAUX ARROW
+# ============================================================================
+
+def _validity(present):
+    """Tampon de validité Arrow (None si toutes les valeurs sont présentes)"""
+    if present.all():
+        return None
+    return pa.array(present).buffers()[1]
+
+
+def _dictionary(codes, values):
+    """dictionary<int32, string> ; le code -1 devient nul"""
+    indices = pa.array(codes.astype(np.int32), mask=codes < 0)
+    return pa.DictionaryArray.from_arrays(indices, pa.array(values, type=pa.string()))
+
+
+def column_array(column):
+    """Colonne entière du catalogue compact en tableau Arrow (textes sans copie des octets)"""
+    kind = type(column).__name__
+    if kind == 'StringArena':
+        return pa.LargeStringArray.from_buffers(
+            len(column), pa.py_buffer(column.offsets), pa.py_buffer(column.data), _validity(column.present)
+        )
+    if kind == 'DictionaryColumn':
+        return _dictionary(column.codes, column.values)
+    if kind == 'ListColumn':
+        items = _dictionary(column.codes, column.values)
+        return pa.LargeListArray.from_arrays(
+            pa.array(column.offsets), items, mask=pa.array(~column.present)
+        )
+    if kind == 'IntegerColumn':
+        return pa.array(column.values, mask=~column.present)
+    raise TypeError(f"Colonne non exportable : {kind}")
+
+
+def catalog_batches(catalog, rows=None, fields=None, batch_rows=DEFAULT_BATCH_ROWS):
+    """(schéma, générateur de lots) des lignes rows du catalogue
+
+    La colonne catalog_row conserve la ligne du catalogue (clé de jointure
+    avec les tables dérivées).
+    """
+    require_pyarrow()
+    rows = np.arange(len(catalog), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+    names = [name for name in (fields or catalog.fields) if name in catalog.columns]
+    arrays = [column_array(catalog.columns[name]) for name in names]
+    schema = pa.schema([pa.field('catalog_row', pa.int64())] +
+                       [pa.field(name, array.type) for name, array in zip(names, arrays)])
+
+    def batches():
+        for start in range(0, len(rows), batch_rows):
+            chunk = rows[start:start + batch_rows]
+            indices = pa.array(chunk)
+            yield pa.RecordBatch.from_arrays(
+                [indices] + [array.take(indices) for array in arrays], schema=schema
+            )
+
+    return schema, batches()
+
+
+# ============================================================================
+# TABLES DÉRIVÉES
+# ============================================================================
+
+def press_batches(store, catalog, batch_rows=DEFAULT_BATCH_ROWS):
+    """(schéma, lots) du magasin de presse : une ligne par article"""
+    require_pyarrow()
+    ids = column_array(catalog.columns['id']).take(pa.array(store.rows))
+    themes = pa.LargeListArray.from_arrays(
+        pa.array(store.theme_offsets), _dictionary(store.theme_codes, store.theme_values)
+    )
+    columns = {
+        'catalog_row': pa.array(store.rows),
+        'id': ids,
+        'date': pa.array(store.dates, mask=np.isnat(store.dates)),
+        'newspaper': _dictionary(store.newspapers, store.newspaper_values),
+        'sentiment': _dictionary(store.sentiments, store.sentiment_values),
+        'page': pa.array(store.pages, mask=store.pages < 0),
+        'length': pa.array(store.lengths, mask=store.lengths < 0),
+        'themes': themes,
+    }
+    return _table_batches(pa.table(columns), batch_rows)
+
+
+def cube_frames(cube):
+    """Tables longues du cube d'agrégats : comptes de base (notices, en ligne) et comptes par thème"""
+    dims = ('source', 'doc_type', 'year', 'status')
+    counts = cube.rollup(*dims).rename(columns={'count': 'documents'})
+    online = cube.rollup(*dims, measure='online').rename(columns={'count': 'online'})
+    counts = counts.merge(online, on=list(dims), how='left')
+    counts['online'] = counts['online'].fillna(0).astype(np.int64)
+    themes = cube.rollup('source', 'doc_type', 'year', 'theme').rename(columns={'count': 'documents'})
+    return {'agregats': counts, 'agregats_themes': themes}
+
+
+def frame_batches(frame, batch_rows=DEFAULT_BATCH_ROWS):
+    """(schéma, lots) d'un DataFrame ; colonnes texte répétitives encodées par dictionnaire"""
+    require_pyarrow()
+    frame = frame.reset_index(drop=True).copy()
+    for name in frame.columns:
+        values = frame[name]
+        if not (values.dtype == object or pd.api.types.is_string_dtype(values)):
+            continue
+        if len(values) and values.nunique() <= CATEGORY_RATIO * len(values):
+            frame[name] = values.astype(str).astype('category')
+        else:
+            frame[name] = values.astype(str)
+    return _table_batches(pa.Table.from_pandas(frame, preserve_index=False), batch_rows)
+
+
+def _table_batches(table, batch_rows):
+    return table.schema, iter(table.to_batches(max_chunksize=batch_rows))
+
+
+# ============================================================================
+# ÉCRITURE
+# ============================================================================
+
+def write_batches(schema, batches, sink, fmt='parquet', batch_rows=DEFAULT_BATCH_ROWS):
+    """Écrit les lots dans sink (chemin ou fichier binaire) au fur et à mesure ; renvoie le nombre de lignes"""
+    require_pyarrow()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format d'export inconnu : {fmt}")
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION,
+                                  use_dictionary=True, write_statistics=True)
+    else:
+        writer = pa.ipc.new_file(sink, schema)
+    n_rows = 0
+    with writer:
+        for batch in batches:
+            if fmt == 'parquet':
+                writer.write_batch(batch, row_group_size=batch_rows)
+            else:
+                writer.write_batch(batch)
+            n_rows += batch.num_rows
+    return n_rows
+
+
+def write_archive(tables, path, fmt='parquet', batch_rows=DEFAULT_BATCH_ROWS):
+    """Archive zip d'un fichier par table ; tables = {nom: (schéma, lots)}
+
+    Les fichiers sont écrits directement dans l'archive, lot par lot
+    (stockés sans recompression : Parquet est déjà compressé).
+    """
+    counts = {}
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, (schema, batches) in tables.items():
+            with archive.open(name + EXTENSIONS[fmt], 'w', force_zip64=True) as handle:
+                counts[name] = write_batches(schema, batches, pa.PythonFile(handle, mode='w'), fmt, batch_rows)
+    return counts
+
+
+def write_directory(tables, directory, fmt='parquet', batch_rows=DEFAULT_BATCH_ROWS):
+    """Un fichier par table dans directory (remplacé par renommage atomique)"""
+    os.makedirs(directory, exist_ok=True)
+    counts = {}
+    for name, (schema, batches) in tables.items():
+        path = os.path.join(directory, name + EXTENSIONS[fmt])
+        tmp_path = path + '.tmp'
+        counts[name] = write_batches(schema, batches, tmp_path, fmt, batch_rows)
+        os.replace(tmp_path, path)
+    return counts
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export Parquet / Arrow IPC du catalogue BUMIDOM")
+    parser.add_argument('directory')
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='parquet')
+    parser.add_argument('--batch-rows', type=int, default=DEFAULT_BATCH_ROWS)
+    args = parser.parse_args(argv)
+
+    from aggregate_cube import AggregateCube
+    from append_log import AppendLog
+    from archives_data import seed_archives
+    from press_store import PressStore
+    from shared_corpus import SharedCorpus
+    from year_index import YearIndex
+
+    log = AppendLog(read_only=True)
+    catalog = SharedCorpus(seed_archives(), log).snapshot().catalog
+    log.close()
+    year_index = YearIndex.from_catalog(catalog)
+    cube = AggregateCube.from_catalog(catalog, year_index.starts, year_index.ends)
+    tables = {
+        'catalogue': catalog_batches(catalog, batch_rows=args.batch_rows),
+        'articles': press_batches(PressStore.from_catalog(catalog), catalog, args.batch_rows),
+    }
+    for name, frame in cube_frames(cube).items():
+        tables[name] = frame_batches(frame, args.batch_rows)
+    counts = write_directory(tables, args.directory, args.format, args.batch_rows)
+    for name, n_rows in counts.items():
+        print(f"{name}{EXTENSIONS[args.format]} : {n_rows} lignes")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Mode « grands volumes » des graphiques : au-delà d'un seuil de points, les
+séries sont sous-échantillonnées côté serveur en préservant leur forme
+(LTTB ou min/max par intervalle) et les traces passent en WebGL.
+
+Seules les lignes et les nuages de points sont sous-échantillonnés : une
+barre est une catégorie, en retirer changerait ce que le graphique montre.
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+
+# Nombre de points d'une trace au-delà duquel le mode grands volumes s'applique
+DEFAULT_POINT_THRESHOLD = 5000
+
+# Nombre de points conservés après sous-échantillonnage
+DEFAULT_MAX_POINTS = 2000
+
+
+def _numeric_axis(values):
+    """Convertit un axe (dates, nombres ou catégories) en float64 pour les calculs"""
+    array = np.asarray(values)
+    if np.issubdtype(array.dtype, np.datetime64):
+        return array.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    if np.issubdtype(array.dtype, np.number):
+        return array.astype(np.float64)
+    try:
+        return array.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    except (TypeError, ValueError):
+        # Axe catégoriel : on se contente de l'ordre des points
+        return np.arange(len(array), dtype=np.float64)
+
+
+def lttb_indices(x, y, n_out):
+    """Indices retenus par l'algorithme Largest-Triangle-Three-Buckets"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = _numeric_axis(x)
+    y = np.asarray(y, dtype=np.float64)
+
+    # Bornes des n_out - 2 intervalles intérieurs (le premier et le dernier point sont gardés)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for b in range(n_out - 2):
+        start, end = edges[b], edges[b + 1]
+        # Point moyen de l'intervalle suivant
+        next_start, next_end = end, edges[b + 2] if b + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Aire du triangle (précédent retenu, candidat, moyenne suivante)
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if area.size else start
+        selected[b + 1] = previous
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Indices des minima et maxima de chaque intervalle (n_out // 2 intervalles)"""
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=np.float64)
+    n_bins = n_out // 2
+    edges = np.linspace(0, n, n_bins + 1).astype(np.int64)
+    # Intervalles de taille égale à un point près : on remplit un tableau rectangulaire
+    width = int(np.diff(edges).max())
+    index = edges[:-1, None] + np.arange(width)[None, :]
+    valid = index < edges[1:, None]
+    index = np.where(valid, index, edges[1:, None] - 1)
+
+    values = y[index]
+    low = index[np.arange(n_bins), np.nanargmin(np.where(valid, values, np.inf), axis=1)]
+    high = index[np.arange(n_bins), np.nanargmax(np.where(valid, values, -np.inf), axis=1)]
+    return np.unique(np.concatenate([low, high, [0, n - 1]]))
+
+
+def _trace_length(trace):
+    values = getattr(trace, 'y', None)
+    if values is None:
+        values = getattr(trace, 'x', None)
+    return 0 if values is None else len(values)
+
+
+def downsample_trace(trace, max_points=DEFAULT_MAX_POINTS, method='lttb'):
+    """Sous-échantillonne les tableaux d'une trace Scatter (x, y, textes, couleurs...)"""
+    n = _trace_length(trace)
+    if n <= max_points:
+        return trace
+
+    x = trace.x if trace.x is not None else np.arange(n)
+    y = trace.y if trace.y is not None else np.arange(n)
+    if method == 'minmax':
+        index = minmax_indices(y, max_points)
+    else:
+        index = lttb_indices(x, y, max_points)
+
+    spec = trace.to_plotly_json()
+    for key in ('x', 'y', 'text', 'hovertext', 'customdata', 'ids'):
+        if spec.get(key) is not None and not isinstance(spec[key], str) and len(spec[key]) == n:
+            spec[key] = np.asarray(spec[key])[index]
+    marker = spec.get('marker') or {}
+    for key in ('color', 'size', 'symbol'):
+        value = marker.get(key)
+        if value is not None and not isinstance(value, (str, int, float)) and len(value) == n:
+            marker[key] = np.asarray(value)[index]
+    return type(trace)(spec, skip_invalid=True)
+
+
+def _has_gaps(trace):
+    """Traces segmentées par des valeurs manquantes (arêtes d'un réseau, par exemple)"""
+    if getattr(trace, 'y', None) is None:
+        return False
+    try:
+        return bool(np.isnan(np.asarray(trace.y, dtype=np.float64)).any())
+    except (TypeError, ValueError):
+        # Axe catégoriel (barres horizontales par exemple)
+        return False
+
+
+def _supports_webgl(trace):
+    """Les traces empilées ou lissées n'ont pas d'équivalent WebGL"""
+    return (
+        isinstance(trace, go.Scatter)
+        and trace.stackgroup is None
+        and (trace.line is None or trace.line.shape in (None, 'linear'))
+    )
+
+
+def to_webgl(trace):
+    """Convertit une trace Scatter SVG en Scattergl"""
+    spec = trace.to_plotly_json()
+    spec.pop('type', None)
+    spec.pop('stackgroup', None)
+    return go.Scattergl(spec, skip_invalid=True)
+
+
+def optimize_figure(fig, threshold=DEFAULT_POINT_THRESHOLD, max_points=DEFAULT_MAX_POINTS):
+    """Applique le mode grands volumes aux traces dépassant le seuil de points"""
+    total_points = sum(_trace_length(trace) for trace in fig.data)
+    if total_points <= threshold:
+        return fig
+
+    traces = []
+    for trace in fig.data:
+        # Les barres sont laissées entières (chaque barre est une catégorie)
+        if isinstance(trace, (go.Scatter, go.Scattergl)) and _trace_length(trace) > max_points \
+                and not _has_gaps(trace):
+            method = 'lttb' if 'lines' in (trace.mode or 'lines') else 'minmax'
+            trace = downsample_trace(trace, max_points, method)
+        if _supports_webgl(trace):
+            trace = to_webgl(trace)
+        traces.append(trace)
+
+    fig.data = []
+    fig.add_traces(traces)
+    return fig
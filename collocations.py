@@ -0,0 +1,209 @@
+"""
+Extraction en flux des collocations (bigrammes et trigrammes) du corpus.
+
+Les documents sont lus une seule fois, sous forme de générateur. Les
+n-grammes sont comptés par groupe (source, période...) dans des tables
+bornées : au-delà de max_entries, les n-grammes rares sont élagués
+(comptage « lossy »), ce qui borne la mémoire quelle que soit la taille
+du corpus. Les scores (log-vraisemblance de Dunning ou PMI) sont calculés
+à la demande, de façon vectorisée, sur les n-grammes conservés.
+"""
+
+import re
+import threading
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import analyze_spans
+
+# Nombre maximal de n-grammes (tous groupes confondus) conservés en mémoire
+DEFAULT_MAX_ENTRIES = 500_000
+
+# Proportion de la capacité visée après un élagage
+PRUNE_TARGET = 0.75
+
+ORDERS = {2: 'Bigrammes', 3: 'Trigrammes'}
+
+SCORING_METHODS = {
+    'llr': 'Log-vraisemblance (G²)',
+    'pmi': 'Information mutuelle ponctuelle (PMI)',
+}
+
+# Ponctuation qui interrompt une expression entre deux mots
+BREAK_RE = re.compile(r"[.;:!?()\[\]«»\"…\n]")
+
+
+def iter_segments(text):
+    """Suites de tokens (racine, surface, début, fin) non séparées par une ponctuation forte"""
+    segment = []
+    previous_end = 0
+    for token in analyze_spans(text):
+        if segment and BREAK_RE.search(text, previous_end, token[2]):
+            yield segment
+            segment = []
+        segment.append(token)
+        previous_end = token[3]
+    if segment:
+        yield segment
+
+
+class CollocationCounter:
+    """Comptes d'unigrammes et de n-grammes par groupe, à mémoire bornée"""
+
+    def __init__(self, orders=tuple(ORDERS), max_entries=DEFAULT_MAX_ENTRIES):
+        self.orders = tuple(orders)
+        self.max_entries = max_entries
+        self.unigrams = {}
+        self.ngrams = {}
+        self.totals = Counter()
+        # Forme affichée de chaque n-gramme (première occurrence rencontrée)
+        self.examples = {}
+        self.n_entries = 0
+        self.n_documents = 0
+        # Plus haut seuil d'élagage appliqué : les comptes inférieurs ou égaux sont approximatifs
+        self.prune_floor = 0
+        # Le compteur peut être prolongé (add) pendant que d'autres threads le lisent (top)
+        self._lock = threading.RLock()
+
+    def add(self, texts, groups):
+        """Ajoute un document (un ou plusieurs champs de texte) à chacun de ses groupes"""
+        if isinstance(texts, str):
+            texts = [texts]
+        with self._lock:
+            self._add(texts, groups)
+
+    def _add(self, texts, groups):
+        self.n_documents += 1
+
+        for text in texts:
+            if not text:
+                continue
+            for segment in iter_segments(text):
+                stems = [token[0] for token in segment]
+                grams = []
+                for n in self.orders:
+                    for i in range(len(stems) - n + 1):
+                        gram = tuple(stems[i:i + n])
+                        grams.append(gram)
+                        if gram not in self.examples:
+                            self.examples[gram] = text[segment[i][2]:segment[i + n - 1][3]].lower()
+
+                for group in groups:
+                    self.unigrams.setdefault(group, Counter()).update(stems)
+                    self.totals[group] += len(stems)
+                    counts = self.ngrams.setdefault(group, {})
+                    for gram in grams:
+                        if gram in counts:
+                            counts[gram] += 1
+                        else:
+                            counts[gram] = 1
+                            self.n_entries += 1
+
+        if self.n_entries > self.max_entries:
+            self.prune()
+
+    def add_documents(self, documents):
+        """Consomme un générateur de couples (textes, groupes)"""
+        for texts, groups in documents:
+            self.add(texts, groups)
+        return self
+
+    def copy(self):
+        """Copie indépendante des comptes"""
+        with self._lock:
+            other = CollocationCounter(self.orders, self.max_entries)
+            other.unigrams = {group: Counter(counts) for group, counts in self.unigrams.items()}
+            other.ngrams = {group: dict(counts) for group, counts in self.ngrams.items()}
+            other.totals = Counter(self.totals)
+            other.examples = dict(self.examples)
+            other.n_entries = self.n_entries
+            other.n_documents = self.n_documents
+            other.prune_floor = self.prune_floor
+        return other
+
+    def extend(self, documents):
+        """Nouveau compteur prolongé des documents (couples (textes, groupes)) ; self reste inchangé"""
+        return self.copy().add_documents(documents)
+
+    def prune(self):
+        """Élimine les n-grammes les plus rares jusqu'à repasser sous la capacité visée"""
+        target = int(self.max_entries * PRUNE_TARGET)
+        floor = 0
+        while self.n_entries > target:
+            floor += 1
+            for counts in self.ngrams.values():
+                for gram in [gram for gram, count in counts.items() if count <= floor]:
+                    del counts[gram]
+            self.n_entries = sum(len(counts) for counts in self.ngrams.values())
+        self.prune_floor = max(self.prune_floor, floor)
+
+        # Même seuil pour les mots : un mot élagué n'entre plus dans aucun n-gramme conservé
+        for counts in self.unigrams.values():
+            for stem in [stem for stem, count in counts.items() if count <= floor]:
+                del counts[stem]
+
+        kept = set()
+        for counts in self.ngrams.values():
+            kept.update(counts)
+        self.examples = {gram: text for gram, text in self.examples.items() if gram in kept}
+
+    def groups(self, dimension=None):
+        """Groupes connus, éventuellement restreints à une dimension (clés (dimension, libellé))"""
+        with self._lock:
+            return sorted(group for group in self.ngrams if dimension is None or group[0] == dimension)
+
+    def top(self, group, order=2, method='llr', k=20, min_count=2):
+        """Les k collocations les mieux classées d'un groupe"""
+        columns = ['expression', 'fréquence', 'score']
+        with self._lock:
+            counts = self.ngrams.get(group, {})
+            grams = [gram for gram, count in counts.items() if len(gram) == order and count >= min_count]
+            if not grams:
+                return pd.DataFrame(columns=columns)
+
+            unigrams = self.unigrams[group]
+            total = float(self.totals[group])
+            observed = np.array([counts[gram] for gram in grams], dtype=np.float64)
+            # Fréquences des mots qui composent chaque n-gramme (n_grams × order)
+            parts = np.array([[unigrams[stem] for stem in gram] for gram in grams], dtype=np.float64)
+            prefixes = np.array([counts.get(gram[:-1], 0) for gram in grams], dtype=np.float64) \
+                if order > 2 else None
+            examples = [self.examples.get(gram, ' '.join(gram)) for gram in grams]
+
+        if method == 'pmi':
+            scores = np.log2(observed) + (order - 1) * np.log2(total) - np.log2(parts).sum(axis=1)
+        elif method == 'llr':
+            if order == 2:
+                left, right = parts[:, 0], parts[:, 1]
+            else:
+                # Trigramme vu comme (préfixe bigramme, dernier mot)
+                left = np.maximum(prefixes, observed)
+                right = parts[:, -1]
+            scores = log_likelihood(observed, left, right, total)
+        else:
+            raise ValueError(f"Méthode inconnue : {method}")
+
+        order_index = np.lexsort((-observed, -scores))[:k]
+        return pd.DataFrame({
+            'expression': [examples[i] for i in order_index],
+            'fréquence': observed[order_index].astype(np.int64),
+            'score': scores[order_index].round(3),
+        }, columns=columns)
+
+
+def log_likelihood(k11, left, right, total):
+    """Statistique G² de Dunning pour des tables de contingence 2×2 (vectorisée)"""
+    k12 = np.maximum(left - k11, 0)
+    k21 = np.maximum(right - k11, 0)
+    k22 = np.maximum(total - k11 - k12 - k21, 0)
+    observed = np.stack([k11, k12, k21, k22])
+    rows = np.stack([k11 + k12, k11 + k12, k21 + k22, k21 + k22])
+    cols = np.stack([k11 + k21, k12 + k22, k11 + k21, k12 + k22])
+    expected = rows * cols / max(total, 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(observed > 0, observed * np.log(observed / expected), 0.0)
+    g2 = 2 * terms.sum(axis=0)
+    # Signe négatif pour les couples moins fréquents qu'attendu (anti-collocations)
+    return np.where(k11 < expected[0], -g2, g2)
@@ -0,0 +1,127 @@
+"""
+Cotes des Archives nationales : lecture des notations de plages et index
+d'intervalles pour retrouver le fonds qui contient un article.
+
+Une cote de versement contemporain s'écrit « versement/article » ; une
+notice couvre souvent une plage (« 20080699/1-20080699/4 », « 19880445/1-8 »)
+ou une liste de plages (« 19880445/1-3, 7 »). Chaque plage devient un
+quadruplet (versement, premier article, dernier versement, dernier article).
+Les plages sont encodées sur une seule échelle entière (versement ×
+ARTICLE_SPAN + article) : une plage à cheval sur plusieurs versements reste
+un seul intervalle. Les recherches de point et de recouvrement se font en
+temps logarithmique dans un IntervalIndex.
+"""
+
+import re
+
+import numpy as np
+
+from interval_index import IntervalIndex
+
+# Nombre maximal d'articles par versement (échelle de l'encodage)
+ARTICLE_SPAN = 1_000_000
+
+# « 19880445 », « 19880445/5 », « 19880445/1-8 », « 20080699/1-20080699/4 »
+# (versement de 6 à 8 chiffres : un ISBN ou un grand nombre n'est pas une cote)
+RANGE_RE = re.compile(
+    r"^(?P<versement>\d{6,8})(?:\s*/\s*(?P<start>\d{1,6}))?"
+    r"(?:\s*-\s*(?:(?P<end_versement>\d{6,8})\s*/\s*)?(?P<end>\d{1,6}))?$"
+)
+# Suite d'une liste : « 7 » ou « 9-12 » après « 19880445/1-3, »
+ARTICLES_RE = re.compile(r"^(?P<start>\d{1,6})(?:\s*-\s*(?P<end>\d{1,6}))?$")
+# Préfixe qui désigne une cote : « cote 19880445 », « versement 19880445 », « AN 19880445 »
+PREFIX_RE = re.compile(r"^(?:cote|versement|AN)\b\s*:?\s*", re.IGNORECASE)
+
+
+def parse_cote(text, bare=False):
+    """Plages (versement, premier article, dernier versement, dernier article) d'une cote ; [] si ce n'est pas une cote
+
+    Un versement seul couvre tous ses articles. Une plage qui s'étend sur
+    plusieurs versements est un seul intervalle, de son premier article à
+    son dernier.
+
+    Un nombre seul (« 123456 ») n'est lu comme versement qu'après un préfixe
+    (« cote », « versement », « AN ») ou avec bare=True, quand le texte vient
+    d'un champ de cote ; sinon la cote doit désigner un article (« 19880445/5 »).
+    """
+    text = (text or '').strip()
+    prefix = PREFIX_RE.match(text)
+    if prefix:
+        text, bare = text[prefix.end():], True
+    ranges = []
+    versement = None
+    for part in re.split(r"[,;]", text):
+        part = part.strip()
+        if not part:
+            continue
+        match = RANGE_RE.match(part)
+        if match:
+            versement = int(match.group('versement'))
+            start = match.group('start')
+            end = match.group('end')
+            end_versement = match.group('end_versement')
+            if start is None:
+                # Versement seul : cote seulement dans un champ de cote, après un préfixe ou dans une liste
+                if not bare and not ranges:
+                    return []
+                ranges.append((versement, 1, versement, ARTICLE_SPAN - 1))
+            elif end_versement is not None:
+                ranges.append((versement, int(start), int(end_versement), int(end)))
+                versement = int(end_versement)
+            else:
+                ranges.append((versement, int(start), versement, int(end) if end else int(start)))
+            continue
+        match = ARTICLES_RE.match(part)
+        if match and versement is not None:
+            start = int(match.group('start'))
+            ranges.append((versement, start, versement, int(match.group('end') or start)))
+            continue
+        return []
+    if any(not 0 < article < ARTICLE_SPAN for cote_range in ranges for article in cote_range[1::2]):
+        return []
+    # Bornes remises dans l'ordre
+    return [min((v1, a1), (v2, a2)) + max((v1, a1), (v2, a2)) for v1, a1, v2, a2 in ranges]
+
+
+def format_range(versement, start, end_versement, end):
+    if versement != end_versement:
+        return f"{versement}/{start}-{end_versement}/{end}"
+    if start == 1 and end == ARTICLE_SPAN - 1:
+        return str(versement)
+    return f"{versement}/{start}" if start == end else f"{versement}/{start}-{end}"
+
+
+def encode_ranges(ranges):
+    """Bornes (débuts, fins) des plages sur l'échelle entière commune"""
+    ranges = np.array(ranges, dtype=np.int64).reshape(-1, 4)
+    return ranges[:, 0] * ARTICLE_SPAN + ranges[:, 1], ranges[:, 2] * ARTICLE_SPAN + ranges[:, 3]
+
+
+class CoteIndex:
+    """Plages de cotes des notices, interrogées par point (un article) ou par plage"""
+
+    def __init__(self, index):
+        self.index = index
+
+    @classmethod
+    def from_catalog(cls, catalog, field='cote'):
+        ranges = []
+        rows = []
+        for row, record in enumerate(catalog):
+            for cote_range in parse_cote(record.get(field), bare=True):
+                ranges.append(cote_range)
+                rows.append(row)
+        starts, ends = encode_ranges(ranges)
+        return cls(IntervalIndex(starts, ends, rows))
+
+    def __len__(self):
+        return len(self.index)
+
+    def search(self, query):
+        """Lignes dont la cote recoupe la cote demandée (article, plage ou versement) ; None si ce n'est pas une cote"""
+        ranges = parse_cote(query)
+        if not ranges:
+            return None
+        starts, ends = encode_ranges(ranges)
+        hits = [self.index.overlapping(start, end) for start, end in zip(starts, ends)]
+        return np.unique(np.concatenate(hits))
@@ -0,0 +1,88 @@
+"""
+Graphe de dépendances déclaratif entre le catalogue et ses données dérivées.
+
+Chaque donnée dérivée (index, compteurs, histogrammes, matrices) est
+déclarée avec ses entrées et sa fonction de construction. Celles qui savent
+intégrer un delta déclarent aussi une fonction de mise à jour : quand des
+notices sont ajoutées, la valeur de l'instantané précédent est reprise et
+seules les nouvelles lignes du catalogue sont traitées. Les autres sont
+reconstruites à la première lecture.
+
+    graph = DependencyGraph()
+
+    @graph.artifact('document_term_matrix')
+    def build_dtm(snapshot):
+        ...
+
+    @build_dtm.incremental
+    def update_dtm(dtm, snapshot, rows):
+        ...
+
+    graph.get(snapshot, 'document_term_matrix')
+
+Une entrée paramétrée reçoit les premiers paramètres de l'artefact qui la
+lit : sentiment_trend(period, resolution, ...) évalue sentiment_series(period).
+"""
+
+import inspect
+
+
+class Artifact:
+    """Donnée dérivée : construction complète et, éventuellement, mise à jour par delta"""
+
+    def __init__(self, name, build, inputs=()):
+        self.name = name
+        self.build = build
+        self.inputs = tuple(inputs)
+        self.update = None
+        # Nombre de paramètres après l'instantané
+        self.n_params = len(inspect.signature(build).parameters) - 1
+
+    def incremental(self, update):
+        """Déclare la mise à jour update(ancienne valeur, instantané, lignes ajoutées, *paramètres)"""
+        self.update = update
+        return update
+
+
+class DependencyGraph:
+    """Artefacts déclarés, évalués paresseusement sur un instantané du corpus"""
+
+    def __init__(self):
+        self.artifacts = {}
+
+    def artifact(self, name, inputs=()):
+        """Décorateur déclarant un artefact et ses entrées (déjà déclarées)"""
+        unknown = [input_name for input_name in inputs if input_name not in self.artifacts]
+        if unknown:
+            raise ValueError(f"Entrées inconnues pour {name} : {', '.join(unknown)}")
+
+        def register(build):
+            artifact = Artifact(name, build, inputs)
+            self.artifacts[name] = artifact
+            return artifact
+        return register
+
+    def is_incremental(self, name):
+        return self.artifacts[name].update is not None
+
+    def get(self, snapshot, name, *params):
+        """Valeur de l'artefact pour l'instantané (entrées évaluées d'abord, dans l'ordre du graphe)"""
+        artifact = self.artifacts[name]
+        for input_name in artifact.inputs:
+            self.get(snapshot, input_name, *params[:self.artifacts[input_name].n_params])
+
+        def update_value(old, rows):
+            return artifact.update(old, snapshot, rows, *params)
+
+        return snapshot.derive(
+            (name,) + params,
+            lambda: artifact.build(snapshot, *params),
+            update_value if artifact.update is not None else None
+        )
+
+    def describe(self):
+        """(artefact, entrées, mode) pour chaque artefact, dans l'ordre de déclaration"""
+        return [
+            (name, artifact.inputs, 'incrémental' if artifact.update is not None else 'reconstruit')
+            for name, artifact in self.artifacts.items()
+        ]
@@ -0,0 +1,70 @@
+"""
+Éléments d'interface communs aux tableaux de bord Dashboard.py et
+Dashbord.py : flux migratoires INSEE et comptes de notices par année.
+
+Chaque page passe son propre dictionnaire d'archives ; les flux sont lus
+par migration_flows et mis en cache tant que les fichiers sources ne
+changent pas.
+"""
+
+import numpy as np
+import plotly.express as px
+import streamlit as st
+
+from migration_flows import DEFAULT_FLOWS_DIR, FlowStore, flow_files, source_signature
+from year_index import record_years
+
+
+@st.cache_resource
+def load_flow_store(datasets, signature):
+    """Magasin des flux INSEE ; la signature des fichiers sources sert de clé de cache"""
+    return FlowStore.open(datasets)
+
+
+def get_flow_store(archives):
+    """Flux INSEE à jour : relus seulement quand un fichier de data/insee change"""
+    datasets = archives['insee']['datasets']
+    return load_flow_store(datasets, source_signature(flow_files(datasets)))
+
+
+@st.cache_data
+def count_by_year(archives, collections, first_year, last_year):
+    """Nombre de notices des collections données par année de début"""
+    years = [
+        span[0]
+        for source_data in archives.values()
+        for collection in collections
+        for span in map(record_years, source_data.get(collection, []))
+        if span and first_year <= span[0] <= last_year
+    ]
+    return np.bincount(np.array(years, dtype=np.int64) - first_year, minlength=last_year - first_year + 1)
+
+
+def show_skipped_files(flows):
+    """Signale les fichiers de flux écartés (format non reconnu, fichier illisible)"""
+    for name, reason in flows.skipped:
+        st.warning(f"Fichier de flux ignoré : {name} ({reason})")
+
+
+def display_flow_chart(archives, title):
+    """Courbe des flux DOM → métropole, ou indication des fichiers attendus"""
+    flows = get_flow_store(archives)
+    show_skipped_files(flows)
+    if not len(flows):
+        st.info(
+            f"Aucun fichier de flux INSEE lisible dans {DEFAULT_FLOWS_DIR} : déposez les tableaux "
+            f"{', '.join(d['id'] for d in archives['insee']['datasets'])} (CSV ou XLSX) "
+            "pour afficher l'évolution des migrations."
+        )
+        return
+    fig = px.line(flows.by_year(), x='Année', y='Migrations', title=title, markers=True)
+    st.plotly_chart(fig, use_container_width=True)
+
+
+def display_origin_chart(archives):
+    """Flux par DOM d'origine (aires empilées) ; rien si aucun fichier de flux n'est lisible"""
+    flows = get_flow_store(archives)
+    if len(flows):
+        fig = px.area(flows.by_year_and_origin(), x='Année', y='Migrations', color="DOM d'origine",
+                      title="Flux vers la métropole par DOM d'origine (INSEE)")
+        st.plotly_chart(fig, use_container_width=True)
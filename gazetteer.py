@@ -0,0 +1,211 @@
+"""
+Extraction des lieux cités dans les notices à l'aide d'un gazetier hors
+ligne, et agrégation des comptes par lieu pour la carte des archives.
+
+Toutes les variantes de noms sont compilées dans un automate
+d'Aho-Corasick : chaque document est parcouru une seule fois, quel que
+soit le nombre de lieux du gazetier. Les points de la carte sont regroupés
+côté serveur sur une grille dont le pas grandit avec le nombre de lieux.
+"""
+
+import re
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import fold_accents
+
+# Champs des notices dans lesquels les lieux sont recherchés
+PLACE_FIELDS = ('location', 'description', 'extract')
+
+# Nombre maximal de points affichés avant regroupement
+DEFAULT_MAX_POINTS = 200
+
+# (nom, latitude, longitude, catégorie, variantes)
+# Les variantes ne sont que des formes sans ambiguïté : un nom nu qui désigne
+# aussi d'autres lieux (« Aix », « Crouy », « Saint-Denis ») ou un ensemble plus
+# large (« Antilles » : néerlandaises, Grandes Antilles, mer des Antilles) n'est
+# retenu qu'avec son qualificatif ou son contexte.
+GAZETTEER = [
+    ("Paris", 48.8566, 2.3522, 'métropole', ["Paris", "parisien", "parisiens", "parisienne", "parisiennes"]),
+    ("Région parisienne", 48.85, 2.45, 'métropole', ["région parisienne", "Île-de-France"]),
+    ("Pierrefitte-sur-Seine", 48.9650, 2.3610, 'métropole', ["Pierrefitte-sur-Seine"]),
+    ("Saint-Denis (Seine-Saint-Denis)", 48.9362, 2.3574, 'métropole', ["Seine-Saint-Denis", "Saint-Denis (Seine-Saint-Denis)"]),
+    ("Bry-sur-Marne", 48.8385, 2.5240, 'métropole', ["Bry-sur-Marne"]),
+    ("Orly", 48.7262, 2.3652, 'métropole', ["Orly"]),
+    ("Crouy-sur-Ourcq", 49.0890, 3.0740, 'métropole', ["Crouy-sur-Ourcq"]),
+    ("Simandres", 45.6170, 4.8720, 'métropole', ["Simandres"]),
+    ("Aix-en-Provence", 43.5297, 5.4474, 'métropole', ["Aix-en-Provence"]),
+    ("Marseille", 43.2965, 5.3698, 'métropole', ["Marseille"]),
+    ("Lyon", 45.7640, 4.8357, 'métropole', ["Lyon"]),
+    ("Le Havre", 49.4944, 0.1079, 'métropole', ["Le Havre"]),
+    ("Bordeaux", 44.8378, -0.5792, 'métropole', ["Bordeaux"]),
+    ("Nantes", 47.2184, -1.5536, 'métropole', ["Nantes"]),
+    ("Guadeloupe", 16.2650, -61.5510, 'DOM', ["Guadeloupe", "guadeloupéen", "guadeloupéens",
+                                              "guadeloupéenne", "guadeloupéennes"]),
+    ("Pointe-à-Pitre", 16.2411, -61.5331, 'DOM', ["Pointe-à-Pitre"]),
+    ("Basse-Terre", 15.9985, -61.7255, 'DOM', ["Basse-Terre"]),
+    ("Martinique", 14.6415, -61.0242, 'DOM', ["Martinique", "martiniquais", "martiniquaise",
+                                              "martiniquaises"]),
+    ("Fort-de-France", 14.6161, -61.0588, 'DOM', ["Fort-de-France"]),
+    ("La Réunion", -21.1151, 55.5364, 'DOM', ["La Réunion", "île de la Réunion", "réunionnais",
+                                              "réunionnaise", "réunionnaises"]),
+    ("Saint-Denis (La Réunion)", -20.8821, 55.4507, 'DOM', ["Saint-Denis de la Réunion",
+                                                            "Saint-Denis (La Réunion)"]),
+    ("Guyane", 3.9339, -53.1258, 'DOM', ["Guyane", "guyanais", "guyanaise", "guyanaises"]),
+    ("Cayenne", 4.9224, -52.3135, 'DOM', ["Cayenne"]),
+    ("Antilles", 15.5, -61.3, 'DOM', ["Antilles françaises", "départements antillais",
+                                      "originaires des Antilles", "originaire des Antilles"]),
+    ("Mayotte", -12.8275, 45.1662, 'DOM', ["Mayotte", "mahorais"]),
+    ("Saint-Pierre-et-Miquelon", 46.8852, -56.3159, 'DOM', ["Saint-Pierre-et-Miquelon"]),
+]
+
+
+def normalize_place_text(text):
+    """Minuscules, sans accents, tirets et apostrophes remplacés par des espaces"""
+    return re.sub(r"[\s\-'’]+", ' ', fold_accents(text.lower()))
+
+
+class AhoCorasick:
+    """Automate d'Aho-Corasick : toutes les occurrences de tous les motifs en un passage"""
+
+    def __init__(self, patterns):
+        # Transitions, lien d'échec et motifs reconnus pour chaque état
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for value, pattern in patterns:
+            self._add(pattern, value)
+        self._build_failure_links()
+
+    def _add(self, pattern, value):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            state = next_state
+        self.output[state].append((len(pattern), value))
+
+    def _build_failure_links(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def iter_matches(self, text):
+        """Occurrences (début, fin, valeur) de tous les motifs dans le texte"""
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for length, value in self.output[state]:
+                yield i - length + 1, i + 1, value
+
+
+class PlaceMatcher:
+    """Recherche des lieux du gazetier dans un texte (mots entiers, plus longue variante)"""
+
+    def __init__(self, gazetteer=GAZETTEER):
+        self.places = pd.DataFrame(
+            [(name, lat, lon, kind) for name, lat, lon, kind, _ in gazetteer],
+            columns=['lieu', 'lat', 'lon', 'catégorie']
+        )
+        self.automaton = AhoCorasick(
+            (index, normalize_place_text(variant))
+            for index, (_, _, _, _, variants) in enumerate(gazetteer)
+            for variant in variants
+        )
+
+    def find(self, text):
+        """Indices des lieux cités, dans l'ordre du texte"""
+        text = normalize_place_text(text or '')
+        matches = [
+            (start, end, place) for start, end, place in self.automaton.iter_matches(text)
+            if (start == 0 or not text[start - 1].isalnum()) and (end == len(text) or not text[end].isalnum())
+        ]
+        # Occurrences les plus longues d'abord, sans chevauchement (« Saint-Denis de la Réunion »)
+        matches.sort(key=lambda match: (match[0], match[0] - match[1]))
+        places = []
+        covered_until = 0
+        for start, end, place in matches:
+            if start >= covered_until:
+                places.append(place)
+                covered_until = end
+        return places
+
+    def tally(self, records, fields=PLACE_FIELDS):
+        """Comptes bruts par lieu du gazetier : tableau (2, lieux) des notices et des occurrences"""
+        counts = np.zeros((2, len(self.places)), dtype=np.int64)
+        for record in records:
+            text = '\n'.join(str(record.get(field) or '') for field in fields)
+            found = np.array(self.find(text), dtype=np.int64)
+            if len(found):
+                counts[1] += np.bincount(found, minlength=len(self.places))
+                counts[0, np.unique(found)] += 1
+        return counts
+
+    def table(self, counts):
+        """Lieux cités au moins une fois, avec leurs comptes (sortie de tally, éventuellement cumulée)"""
+        table = self.places.assign(documents=counts[0], mentions=counts[1])
+        return table[table['documents'] > 0].reset_index(drop=True)
+
+    def count(self, records, fields=PLACE_FIELDS):
+        """Nombre de notices et d'occurrences par lieu"""
+        return self.table(self.tally(records, fields))
+
+
+def cluster_places(counts, max_points=DEFAULT_MAX_POINTS, cell_degrees=None):
+    """Regroupe les lieux proches sur une grille (centroïde pondéré, comptes sommés)
+
+    Sans pas explicite, le pas double à partir de 0,1° jusqu'à ce que le nombre
+    de points ne dépasse plus max_points.
+    """
+    if counts.empty:
+        return counts.assign(lieux=pd.Series(dtype=object))
+
+    def on_grid(cell):
+        cells = pd.DataFrame({
+            'row': np.floor(counts['lat'] / cell).astype(np.int64),
+            'col': np.floor(counts['lon'] / cell).astype(np.int64),
+        })
+        weights = counts['documents']
+        grouped = counts.assign(
+            wlat=counts['lat'] * weights, wlon=counts['lon'] * weights, **cells
+        ).groupby(['row', 'col'], sort=False)
+        clusters = grouped.agg(
+            documents=('documents', 'sum'),
+            mentions=('mentions', 'sum'),
+            wlat=('wlat', 'sum'),
+            wlon=('wlon', 'sum'),
+            lieux=('lieu', lambda names: ', '.join(names)),
+            n_lieux=('lieu', 'size'),
+        ).reset_index(drop=True)
+        clusters['lat'] = clusters.pop('wlat') / clusters['documents']
+        clusters['lon'] = clusters.pop('wlon') / clusters['documents']
+        return clusters
+
+    if cell_degrees is not None:
+        return on_grid(cell_degrees)
+
+    if len(counts) <= max_points:
+        return on_grid(1e-9)
+
+    cell = 0.1
+    clusters = on_grid(cell)
+    while len(clusters) > max_points:
+        cell *= 2
+        clusters = on_grid(cell)
+    return clusters
@@ -0,0 +1,529 @@
+"""
+Collecte des notices des sources en ligne : parcours paginé des résultats
+de recherche (API SRU ``searchRetrieve`` de Gallica), écrits dans le
+corpus partagé par lots.
+
+Les pages sont téléchargées par un pool de threads borné ; un limiteur de
+débit par hôte espace les requêtes adressées à un même serveur, quel que
+soit le nombre de threads. Les réponses 429 et 5xx sont retentées avec
+attente croissante (ou l'attente Retry-After indiquée par le serveur).
+
+Le thread principal regroupe les notices reçues et les écrit par lots
+(``SharedCorpus.add_records``, durable via le journal d'ajouts) ; les
+pages d'un lot ne sont marquées faites dans le point de contrôle
+(``data/harvest/<requête>.json``, réécrit par renommage atomique) qu'après
+l'écriture du lot. Une collecte interrompue reprend donc aux pages non
+écrites ; les notices déjà présentes dans le catalogue sont ignorées.
+
+Un serveur SRU local (StubSRUServer) sert des pages synthétiques pour
+tester la collecte sans réseau.
+
+Usage en ligne de commande :
+    python harvester.py gallica 'gallica all "bumidom"' --workers 4 --rate 2
+    python harvester.py stub --records 500 --port 8765
+    python harvester.py gallica bumidom --base-url http://127.0.0.1:8765/SRU
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from xml.sax.saxutils import escape
+
+import requests
+
+from identifier_index import canonical_ark
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+DEFAULT_HARVEST_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'harvest')
+
+GALLICA_SRU_URL = 'https://gallica.bnf.fr/SRU'
+
+# Gallica plafonne maximumRecords à 50
+DEFAULT_PAGE_SIZE = 50
+DEFAULT_WORKERS = 4
+# Requêtes par seconde et par hôte
+DEFAULT_RATE = 1.0
+# Notices écrites dans le corpus par appel
+DEFAULT_BATCH_SIZE = 200
+
+MAX_RETRIES = 4
+REQUEST_TIMEOUT = 30
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+USER_AGENT = 'bumidom-archives-harvester/1.0'
+
+NAMESPACES = {
+    'srw': 'http://www.loc.gov/zing/srw/',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'oai_dc': 'http://www.openarchives.org/OAI/2.0/oai_dc/',
+}
+
+DC_FIELDS = ('title', 'date', 'creator', 'publisher', 'type', 'description', 'language', 'identifier')
+
+
+# ============================================================================
+# SOURCES
+# ============================================================================
+
+class GallicaSRU:
+    """Résultats d'une recherche SRU Gallica, page par page (notices Dublin Core)"""
+
+    source_id = 'gallica'
+    collection = 'documents'
+
+    def __init__(self, query, base_url=GALLICA_SRU_URL, page_size=DEFAULT_PAGE_SIZE):
+        self.query = query
+        self.base_url = base_url
+        self.page_size = page_size
+
+    @property
+    def key(self):
+        """Nom du point de contrôle de cette recherche"""
+        slug = re.sub(r"[^a-z0-9]+", '_', self.query.lower()).strip('_')[:60]
+        return f"{self.source_id}_{slug or 'requete'}"
+
+    def page_url(self, start):
+        params = {
+            'operation': 'searchRetrieve',
+            'version': '1.2',
+            'query': self.query,
+            'startRecord': start,
+            'maximumRecords': self.page_size,
+            'recordSchema': 'dc',
+        }
+        return f"{self.base_url}?{urlencode(params)}"
+
+    def page_starts(self, total):
+        """Premier rang (à partir de 1) de chaque page"""
+        return list(range(1, total + 1, self.page_size))
+
+    def parse(self, content):
+        """(nombre total de résultats, notices de la page)"""
+        root = ET.fromstring(content)
+        total = int(root.findtext('srw:numberOfRecords', default='0', namespaces=NAMESPACES) or 0)
+        records = []
+        for data in root.iterfind('.//srw:record/srw:recordData', NAMESPACES):
+            fields = {name: [] for name in DC_FIELDS}
+            for element in data.iter():
+                name = element.tag.rpartition('}')[2]
+                if element.tag.startswith('{%s}' % NAMESPACES['dc']) and name in fields and element.text:
+                    fields[name].append(element.text.strip())
+            record = dc_record(fields)
+            if record is not None:
+                records.append(record)
+        return total, records
+
+
+def dc_record(fields):
+    """Notice du catalogue depuis les champs Dublin Core ; None sans ARK"""
+    ark = next(filter(None, map(canonical_ark, fields['identifier'])), None)
+    if ark is None:
+        return None
+    first = lambda name: fields[name][0] if fields[name] else ''
+    return {
+        'id': f"GL_{ark.upper()}",
+        'title': first('title'),
+        'date': first('date'),
+        'author': '; '.join(fields['creator']),
+        'publisher': first('publisher'),
+        'type': first('type'),
+        'description': first('description'),
+        'language': first('language'),
+        'url': f"https://gallica.bnf.fr/ark:/12148/{ark}",
+    }
+
+
+# ============================================================================
+# HTTP : DÉBIT PAR HÔTE ET REPRISES
+# ============================================================================
+
+class HostRateLimiter:
+    """Espace d'au moins 1 / rate secondes les requêtes vers un même hôte"""
+
+    def __init__(self, rate=DEFAULT_RATE):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            # Créneau réservé sous le verrou, attente hors du verrou (les autres hôtes ne sont pas bloqués)
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Fetcher:
+    """GET avec une session HTTP par thread, limite de débit et reprises"""
+
+    def __init__(self, limiter, timeout=REQUEST_TIMEOUT, max_retries=MAX_RETRIES, backoff=1.0):
+        self.limiter = limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._local = threading.local()
+
+    def _session(self):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+        return session
+
+    def get(self, url):
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(url)
+            try:
+                response = self._session().get(url, timeout=self.timeout)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff * 2 ** attempt)
+                continue
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                response.raise_for_status()
+                return response.content
+            retry_after = response.headers.get('Retry-After', '')
+            time.sleep(float(retry_after) if retry_after.isdigit() else self.backoff * 2 ** attempt)
+
+
+# ============================================================================
+# POINT DE CONTRÔLE
+# ============================================================================
+
+class Checkpoint:
+    """Avancement d'une collecte : total annoncé et pages déjà écrites dans le corpus"""
+
+    def __init__(self, path):
+        self.path = path
+        self.total = None
+        self.done = set()
+        self.written = 0
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as handle:
+                state = json.load(handle)
+            self.total = state.get('total')
+            self.done = set(state.get('done', []))
+            self.written = state.get('written', 0)
+
+    def mark(self, starts, written):
+        self.done.update(starts)
+        self.written += written
+        self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as handle:
+            json.dump({'total': self.total, 'done': sorted(self.done), 'written': self.written}, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.path)
+
+    def reset(self):
+        self.total = None
+        self.done = set()
+        self.written = 0
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+# ============================================================================
+# COLLECTE
+# ============================================================================
+
+def corpus_sink(corpus, source):
+    """Écriture d'un lot de notices dans le corpus partagé"""
+    return lambda records: corpus.add_records(source.source_id, source.collection, records)
+
+
+def corpus_ids(archives, source):
+    """Identifiants des notices déjà présentes dans la collection de la source"""
+    return {record['id'] for record in archives.get(source.source_id, {}).get(source.collection, ())}
+
+
+class Harvester:
+    """Collecte paginée et reprenable d'une source vers un puits de notices (sink)"""
+
+    def __init__(self, source, sink, checkpoint_dir=DEFAULT_HARVEST_DIR, workers=DEFAULT_WORKERS,
+                 rate=DEFAULT_RATE, batch_size=DEFAULT_BATCH_SIZE, known_ids=(), fetcher=None):
+        self.source = source
+        self.sink = sink
+        self.checkpoint = Checkpoint(os.path.join(checkpoint_dir, f"{source.key}.json"))
+        self.workers = workers
+        self.batch_size = batch_size
+        self.fetcher = fetcher or Fetcher(HostRateLimiter(rate))
+        self.known_ids = set(known_ids)
+        self.stop_event = threading.Event()
+        # Avancement lisible depuis un autre thread (interface)
+        self.pages_total = 0
+        self.pages_done = 0
+        self.written = 0
+        self.skipped = 0
+        self.errors = []
+        # Cause de l'échec de toute la collecte (première page illisible, écriture impossible)
+        self.failed = None
+        self.running = False
+
+    def stop(self):
+        """Arrête la collecte après les pages en cours (le lot reçu est écrit)"""
+        self.stop_event.set()
+
+    def _fetch(self, start):
+        return self.source.parse(self.fetcher.get(self.source.page_url(start)))
+
+    def run(self, max_records=None):
+        """Collecte les pages non encore écrites ; renvoie le nombre de notices ajoutées"""
+        self.running = True
+        self.failed = None
+        self.stop_event.clear()
+        try:
+            return self._run(max_records)
+        except Exception as error:
+            # Visible depuis l'interface quand la collecte tourne dans un thread
+            self.failed = str(error)
+            raise
+        finally:
+            self.running = False
+
+    def _run(self, max_records):
+        checkpoint = self.checkpoint
+        batch, batch_pages = [], []
+
+        def flush():
+            # Pages marquées faites seulement une fois leurs notices écrites
+            if batch:
+                self.sink(list(batch))
+            checkpoint.mark(batch_pages, len(batch))
+            self.written += len(batch)
+            batch.clear()
+            batch_pages.clear()
+
+        def collect(start, records):
+            for record in records:
+                if record['id'] in self.known_ids:
+                    self.skipped += 1
+                    continue
+                self.known_ids.add(record['id'])
+                batch.append(record)
+            batch_pages.append(start)
+            self.pages_done += 1
+            if len(batch) >= self.batch_size:
+                flush()
+
+        if checkpoint.total is None:
+            # Première page : nombre total de résultats, sans lequel rien n'est collecté
+            try:
+                checkpoint.total, records = self._fetch(1)
+            except (requests.RequestException, ET.ParseError) as error:
+                self.failed = f"page 1 : {error}"
+                return self.written
+            collect(1, records)
+        starts = self.source.page_starts(self._limit(checkpoint.total, max_records))
+        self.pages_total = len(starts)
+        pending = [start for start in starts if start not in checkpoint.done and start not in batch_pages]
+        self.pages_done = self.pages_total - len(pending)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            queue = iter(pending)
+            in_flight = {}
+            # Au plus deux pages en attente par thread : un arrêt n'abandonne que quelques requêtes
+            while True:
+                while len(in_flight) < 2 * self.workers and not self.stop_event.is_set():
+                    start = next(queue, None)
+                    if start is None:
+                        break
+                    in_flight[executor.submit(self._fetch, start)] = start
+                if not in_flight:
+                    break
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    start = in_flight.pop(future)
+                    try:
+                        _, records = future.result()
+                    except (requests.RequestException, ET.ParseError) as error:
+                        # Page laissée non faite : reprise au prochain passage
+                        self.errors.append(f"page {start} : {error}")
+                        continue
+                    collect(start, records)
+        flush()
+        return self.written
+
+    @staticmethod
+    def _limit(total, max_records):
+        return total if max_records is None else min(total, max_records)
+
+
+# ============================================================================
+# SERVEUR SRU LOCAL (TESTS)
+# ============================================================================
+
+SRU_RESPONSE = """<?xml version="1.0" encoding="UTF-8"?>
+<srw:searchRetrieveResponse xmlns:srw="{srw}" xmlns:dc="{dc}" xmlns:oai_dc="{oai_dc}">
+<srw:version>1.2</srw:version>
+<srw:numberOfRecords>{total}</srw:numberOfRecords>
+<srw:records>{records}</srw:records>
+</srw:searchRetrieveResponse>"""
+
+SRU_RECORD = """
+<srw:record><srw:recordSchema>dc</srw:recordSchema><srw:recordData><oai_dc:dc>
+<dc:title>{title}</dc:title><dc:date>{date}</dc:date><dc:creator>{creator}</dc:creator>
+<dc:type>monographie</dc:type><dc:language>fre</dc:language>
+<dc:identifier>https://gallica.bnf.fr/ark:/12148/{ark}</dc:identifier>
+</oai_dc:dc></srw:recordData><srw:recordPosition>{position}</srw:recordPosition></srw:record>"""
+
+
+class StubSRUServer:
+    """Serveur SRU synthétique sur 127.0.0.1 : records notices, pannes 503 simulées"""
+
+    def __init__(self, records=120, port=0, delay=0.0, fail_every=0):
+        self.records = records
+        self.delay = delay
+        self.fail_every = fail_every
+        self.requests = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {key: values[0] for key, values in parse_qs(urlsplit(self.path).query).items()}
+                with server._lock:
+                    server.requests.append((time.monotonic(), params))
+                    count = len(server.requests)
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.fail_every and count % server.fail_every == 0:
+                    self.send_response(503)
+                    self.send_header('Retry-After', '0')
+                    self.end_headers()
+                    return
+                body = server.page(int(params.get('startRecord', 1)), int(params.get('maximumRecords', 50)))
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/SRU"
+
+    def page(self, start, size):
+        records = ''.join(
+            SRU_RECORD.format(
+                title=escape(f"Notice synthétique {position}"),
+                date=1960 + position % 30,
+                creator=escape('Collectif'),
+                ark=f"bpt6kstub{position:06d}",
+                position=position,
+            )
+            for position in range(start, min(start + size, self.records + 1))
+        )
+        return SRU_RESPONSE.format(total=self.records, records=records, **NAMESPACES).encode('utf-8')
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    gallica = commands.add_parser('gallica', help='collecte une recherche SRU Gallica dans le corpus')
+    gallica.add_argument('query')
+    gallica.add_argument('--base-url', default=GALLICA_SRU_URL)
+    gallica.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    gallica.add_argument('--rate', type=float, default=DEFAULT_RATE)
+    gallica.add_argument('--batch', type=int, default=DEFAULT_BATCH_SIZE)
+    gallica.add_argument('--max-records', type=int)
+    gallica.add_argument('--checkpoint-dir', default=DEFAULT_HARVEST_DIR)
+    gallica.add_argument('--restart', action='store_true', help='ignore le point de contrôle existant')
+
+    stub = commands.add_parser('stub', help='lance un serveur SRU local de test')
+    stub.add_argument('--records', type=int, default=500)
+    stub.add_argument('--port', type=int, default=8765)
+    stub.add_argument('--fail-every', type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == 'stub':
+        with StubSRUServer(args.records, args.port, fail_every=args.fail_every) as server:
+            print(f"SRU local : {server.url}")
+            try:
+                server.thread.join()
+            except KeyboardInterrupt:
+                pass
+        return 0
+
+    from append_log import AppendLog
+    from archives_data import seed_archives
+    from shared_corpus import SharedCorpus
+
+    try:
+        # Verrou exclusif du journal : refusé si le tableau de bord l'a ouvert
+        log = AppendLog()
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        return 1
+    corpus = SharedCorpus(seed_archives(), log)
+    source = GallicaSRU(args.query, args.base_url)
+    harvester = Harvester(
+        source, corpus_sink(corpus, source), args.checkpoint_dir, args.workers, args.rate, args.batch,
+        known_ids=corpus_ids(corpus.snapshot().archives, source)
+    )
+    if args.restart:
+        harvester.checkpoint.reset()
+    try:
+        written = harvester.run(args.max_records)
+    except KeyboardInterrupt:
+        # Le point de contrôle reflète les lots déjà écrits
+        print("Interrompu : relancer la même commande pour reprendre")
+        return 1
+    finally:
+        log.close()
+    print(f"{written} notices ajoutées, {harvester.skipped} déjà présentes, "
+          f"{harvester.pages_done}/{harvester.pages_total} pages")
+    for error in harvester.errors:
+        print(error, file=sys.stderr)
+    if harvester.failed:
+        print(f"Collecte impossible : {harvester.failed}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Index des identifiants canoniques du catalogue : identifiant interne,
+ARK Gallica, cote d'archives et URL, tous ramenés à une seule ligne.
+
+Chaque forme est normalisée en une clé (type, valeur) et rangée dans une
+table de hachage : une référence saisie, importée ou passée dans un lien
+est résolue en temps constant, sans parcourir le catalogue.
+
+    index = IdentifierIndex.from_catalog(catalog)
+    index.resolve('ark:/12148/bpt6k9612718t')   # → ligne du catalogue
+    index.resolve('https://gallica.bnf.fr/ark:/12148/bpt6k9612718t/f3.item')
+"""
+
+import re
+from urllib.parse import urlsplit
+
+# Nom d'un ARK Gallica (autorité 12148), avec ou sans préfixe, seul ou dans une URL
+ARK_RE = re.compile(r"(?:ark:/)?12148/([a-z0-9]+)", re.IGNORECASE)
+BARE_ARK_RE = re.compile(r"^(?:bpt6k|btv1b|cb)[a-z0-9]+$", re.IGNORECASE)
+
+# Éléments d'une cote, entre séparateurs : « 19880445 », « 1-8 », « FM », « 1AFFPOL »
+COTE_SEPARATORS_RE = re.compile(r"[\s/\-.,;]+")
+# Élément sans chiffre d'une cote : sigle court (« FM », « W », « AD »)
+COTE_LETTERS_RE = re.compile(r"^[A-Za-z]{1,4}$")
+
+
+def canonical_ark(value):
+    """Nom de l'ARK Gallica contenu dans une référence (« bpt6k9612718t »), ou None"""
+    value = (value or '').strip()
+    match = ARK_RE.search(value)
+    if match:
+        return match.group(1).lower()
+    if BARE_ARK_RE.match(value):
+        return value.lower()
+    return None
+
+
+def is_cote(value):
+    """Vrai si la valeur a la forme d'une cote (« 19880445/1-8 », « 1234 W 5 », « FM 1AFFPOL/123 »)
+
+    Une cote contient au moins un chiffre ; ses autres éléments sont des
+    sigles courts. Un texte libre (« Série géographique ») n'en est pas une.
+    """
+    parts = [part for part in COTE_SEPARATORS_RE.split((value or '').strip()) if part]
+    if not any(char.isdigit() for part in parts for char in part):
+        return False
+    return all(
+        COTE_LETTERS_RE.match(part) or
+        (part.isascii() and part.isalnum() and any(char.isdigit() for char in part))
+        for part in parts
+    )
+
+
+def normalize_cote(value):
+    """Cote sans espaces superflus, en majuscules (« 19880445/1-8 »)"""
+    value = re.sub(r"\s+", ' ', (value or '').strip()).upper()
+    return re.sub(r"\s*([/\-])\s*", r"\1", value) or None
+
+
+def normalize_url(value):
+    """URL sans schéma, « www. », fragment ni barre finale ; hôte en minuscules"""
+    value = (value or '').strip()
+    if not re.match(r"^[a-z][a-z0-9+.\-]*://", value, re.IGNORECASE):
+        return None
+    parts = urlsplit(value)
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    url = host + parts.path.rstrip('/')
+    return f"{url}?{parts.query}" if parts.query else url
+
+
+def record_keys(record):
+    """Clés (type, valeur) sous lesquelles une notice est indexée"""
+    keys = []
+    if record.get('id'):
+        keys.append(('id', str(record['id']).strip().upper()))
+    for field in ('ark', 'url'):
+        ark = canonical_ark(record.get(field))
+        if ark:
+            keys.append(('ark', ark))
+    url = normalize_url(record.get('url'))
+    if url:
+        keys.append(('url', url))
+    if is_cote(record.get('cote')):
+        keys.append(('cote', normalize_cote(record['cote'])))
+    return keys
+
+
+def reference_keys(reference):
+    """Clés candidates d'une référence libre, de la plus spécifique à la plus générale
+
+    Les clés ARK et cote ne sont essayées que si la référence en a la forme.
+    """
+    reference = (reference or '').strip()
+    if not reference:
+        return []
+    keys = [('id', reference.upper())]
+    ark = canonical_ark(reference)
+    if ark:
+        keys.append(('ark', ark))
+    url = normalize_url(reference)
+    if url:
+        keys.append(('url', url))
+    if not ark and not url and is_cote(reference):
+        keys.append(('cote', normalize_cote(reference)))
+    return keys
+
+
+class IdentifierIndex:
+    """Table (type, valeur normalisée) → ligne du catalogue ; la première notice l'emporte
+
+    La table est découpée en couches partagées avec les index précédents :
+    extend ajoute une couche avec les seules nouvelles clés, fusionnée avec
+    la précédente tant qu'elle en atteint la moitié. Un index garde ainsi
+    O(log n) couches et chaque clé n'est recopiée que O(log n) fois.
+    """
+
+    def __init__(self, layers=(), n_records=0):
+        # Une clé n'apparaît que dans une seule couche
+        self.layers = tuple(layers)
+        self.n_records = n_records
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        return cls().extend(catalog, range(len(catalog)))
+
+    def extend(self, catalog, rows):
+        """Nouvel index avec les lignes ajoutées du catalogue (l'ancien reste valide)"""
+        added = {}
+        for row in rows:
+            for key in record_keys(catalog.record(row)):
+                if key not in added and self._get(key) is None:
+                    added[key] = row
+        layers = list(self.layers)
+        if added:
+            layers.append(added)
+            while len(layers) > 1 and 2 * len(layers[-1]) >= len(layers[-2]):
+                layers[-2:] = [{**layers[-2], **layers[-1]}]
+        return IdentifierIndex(layers, len(catalog))
+
+    def _get(self, key):
+        for layer in self.layers:
+            row = layer.get(key)
+            if row is not None:
+                return row
+        return None
+
+    def resolve(self, reference):
+        """Ligne de la notice désignée par un identifiant, un ARK, une cote ou une URL, ou None"""
+        for key in reference_keys(reference):
+            row = self._get(key)
+            if row is not None:
+                return row
+        return None
+
+    def __contains__(self, reference):
+        return self.resolve(reference) is not None
+
+    def __len__(self):
+        return sum(len(layer) for layer in self.layers)
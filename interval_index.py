@@ -0,0 +1,49 @@
+"""
+Index d'intervalles fermés [début, fin] sur des tableaux triés.
+
+Les intervalles sont triés par début ; le maximum cumulé des fins est lui
+aussi croissant. Une requête [bas, haut] se ramène à deux recherches
+dichotomiques : les intervalles qui commencent après haut sont exclus, ainsi
+que le préfixe dont toutes les fins sont avant bas. Il ne reste qu'à filtrer
+la tranche intermédiaire, de façon vectorisée.
+"""
+
+import numpy as np
+
+
+class IntervalIndex:
+    """Intervalles entiers [starts[i], ends[i]] associés aux valeurs rows[i]"""
+
+    def __init__(self, starts, ends, rows):
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        rows = np.asarray(rows, dtype=np.int64)
+        order = np.lexsort((ends, starts))
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.rows = rows[order]
+        self.max_ends = np.maximum.accumulate(self.ends) if len(self.ends) else self.ends
+
+    def __len__(self):
+        return len(self.starts)
+
+    def _slice(self, low, high):
+        stop = np.searchsorted(self.starts, high, side='right')
+        start = np.searchsorted(self.max_ends[:stop], low, side='left')
+        return start, stop
+
+    def overlapping(self, low, high):
+        """Valeurs des intervalles qui recoupent [low, high], sans doublons et triées"""
+        start, stop = self._slice(low, high)
+        keep = self.ends[start:stop] >= low
+        return np.unique(self.rows[start:stop][keep])
+
+    def containing(self, point):
+        """Valeurs des intervalles qui contiennent point"""
+        return self.overlapping(point, point)
+
+    def mask(self, low, high, n_rows):
+        """Masque booléen (n_rows) des valeurs dont un intervalle recoupe [low, high]"""
+        mask = np.zeros(n_rows, dtype=bool)
+        mask[self.overlapping(low, high)] = True
+        return mask
@@ -0,0 +1,207 @@
+"""
+Banc de charge des tableaux de bord : sessions simulées concurrentes.
+
+Chaque session est une AppTest Streamlit (sans navigateur ni réseau) qui
+suit un scénario de navigation et de recherche. Les sessions d'un palier
+démarrent ensemble dans des threads du même processus, comme sur un
+serveur : les ressources partagées (st.cache_resource) le sont aussi ici.
+
+Pour chaque palier de sessions, le banc mesure la latence des réexécutions
+(percentiles), le débit et la mémoire résidente du processus.
+
+Usage :
+    python load_test.py Dash.py --sessions 1 5 10 25 50 --rounds 2
+    python load_test.py Dashboard.py --sessions 10 --csv resultats.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+APPS = ('Dash.py', 'Dashboard.py', 'Dashbord.py')
+
+DEFAULT_SESSIONS = (1, 5, 10, 25, 50)
+
+# Délai maximal d'une réexécution avant de la compter en erreur (secondes)
+RUN_TIMEOUT = 120
+
+PERCENTILES = (50, 90, 95, 99)
+
+# Requêtes tirées au hasard par les scénarios de recherche
+QUERIES = [
+    "migration", "travailleurs antillais", "logement", "formation professionnelle",
+    "BUMIDOM", "conditions d'accueil", "Martinique", "foyers", "départements d'outre-mer",
+]
+
+# Scénarios : suites d'actions (page à ouvrir, ou recherche dans la page courante)
+SCENARIOS = {
+    'consultation': [
+        ('page', "📊 Vue d'ensemble"),
+        ('page', "📈 Analyses thématiques"),
+        ('page', "🕰️ Chronologie"),
+        ('page', "📊 Vue d'ensemble"),
+    ],
+    'recherche': [
+        ('page', "🔍 Exploreur d'archives"),
+        ('search', None),
+        ('search', None),
+        ('page', "🧮 Outils de recherche"),
+    ],
+    'export': [
+        ('page', "🔍 Exploreur d'archives"),
+        ('search', None),
+        ('page', "📥 Export & Rapport"),
+    ],
+}
+
+# La compilation du script par Streamlit (ast.parse) n'est pas sûre entre
+# threads : le premier chargement de chaque session est donc sérialisé.
+_FIRST_RUN_LOCK = threading.Lock()
+
+
+def _resident_memory():
+    """Mémoire résidente courante et maximale du processus (octets), d'après /proc"""
+    current = peak = 0
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    current = int(line.split()[1]) * 1024
+                elif line.startswith('VmHWM:'):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return current, peak
+
+
+class SimulatedSession:
+    """Une session : une AppTest qui rejoue des scénarios et chronomètre chaque réexécution"""
+
+    def __init__(self, script_path, seed):
+        self.app = AppTest.from_file(script_path, default_timeout=RUN_TIMEOUT)
+        self.random = random.Random(seed)
+        self.latencies = []
+        self.errors = 0
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            self.app.run()
+            failed = bool(self.app.exception)
+        except Exception:
+            failed = True
+        self.latencies.append(time.perf_counter() - start)
+        self.errors += failed
+
+    def _navigation(self):
+        radios = self.app.sidebar.radio
+        return radios[0] if len(radios) else None
+
+    def _go_to(self, page):
+        navigation = self._navigation()
+        if navigation is None or page not in navigation.options:
+            return False
+        navigation.set_value(page)
+        return True
+
+    def _search(self):
+        boxes = [box for box in self.app.text_input if 'echerch' in (box.label or '')]
+        if not boxes:
+            return False
+        boxes[0].set_value(self.random.choice(QUERIES))
+        return True
+
+    def play(self, rounds):
+        with _FIRST_RUN_LOCK:
+            self._run()
+        for _ in range(rounds):
+            for action, argument in SCENARIOS[self.random.choice(list(SCENARIOS))]:
+                acted = self._go_to(argument) if action == 'page' else self._search()
+                if acted:
+                    self._run()
+
+
+def run_level(script_path, n_sessions, rounds, seed=0):
+    """Lance n_sessions sessions simultanées et agrège leurs mesures"""
+    sessions = [SimulatedSession(script_path, seed + i) for i in range(n_sessions)]
+    barrier = threading.Barrier(n_sessions)
+
+    def play(session):
+        barrier.wait()
+        session.play(rounds)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as pool:
+        list(pool.map(play, sessions))
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array([latency for session in sessions for latency in session.latencies])
+    # Mesure prise pendant que les sessions sont encore en vie, comme des utilisateurs connectés
+    rss, peak = _resident_memory()
+    result = {
+        'sessions': n_sessions,
+        'réexécutions': len(latencies),
+        'erreurs': sum(session.errors for session in sessions),
+        'durée_s': round(elapsed, 2),
+        'débit_par_s': round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        'moyenne_ms': round(float(latencies.mean()) * 1000, 1) if len(latencies) else 0.0,
+        'max_ms': round(float(latencies.max()) * 1000, 1) if len(latencies) else 0.0,
+        'rss_mo': round(rss / 2**20, 1),
+        'pic_rss_mo': round(peak / 2**20, 1),
+    }
+    for p in PERCENTILES:
+        result[f'p{p}_ms'] = round(float(np.percentile(latencies, p)) * 1000, 1) if len(latencies) else 0.0
+    return result
+
+
+def run(script_path, session_counts=DEFAULT_SESSIONS, rounds=2, seed=0):
+    """Paliers successifs de sessions ; renvoie une ligne de mesures par palier"""
+    baseline, _ = _resident_memory()
+    results = []
+    for n_sessions in session_counts:
+        result = run_level(script_path, n_sessions, rounds, seed)
+        result['delta_rss_mo'] = round(result['rss_mo'] - baseline / 2**20, 1)
+        results.append(result)
+        print(format_row(result), flush=True)
+    return results
+
+
+COLUMNS = ['sessions', 'réexécutions', 'erreurs', 'débit_par_s'] + [f'p{p}_ms' for p in PERCENTILES] + \
+    ['max_ms', 'rss_mo', 'delta_rss_mo', 'pic_rss_mo']
+
+
+def format_row(result):
+    return '  '.join(f"{column}={result.get(column, '')}" for column in COLUMNS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banc de charge des tableaux de bord BUMIDOM")
+    parser.add_argument('script', choices=APPS, help="Application à tester")
+    parser.add_argument('--sessions', type=int, nargs='+', default=list(DEFAULT_SESSIONS),
+                        help="Nombres de sessions simultanées (un palier par valeur)")
+    parser.add_argument('--rounds', type=int, default=2, help="Scénarios joués par session")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--csv', help="Fichier CSV où écrire les mesures")
+    args = parser.parse_args(argv)
+
+    script_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), args.script)
+    results = run(script_path, args.sessions, args.rounds, args.seed)
+
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=COLUMNS + ['durée_s', 'moyenne_ms'])
+            writer.writeheader()
+            writer.writerows(results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
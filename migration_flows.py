@@ -0,0 +1,308 @@
+"""
+Flux migratoires INSEE entre les DOM et la métropole : ingestion des
+fichiers locaux (CSV ou XLSX) dans un magasin colonnaire typé, et agrégats
+pré-calculés pour les graphiques.
+
+Les fichiers sont ceux des jeux de données INSEE du catalogue, déposés sous
+leur identifiant : ``data/insee/IS_001.csv``, ``data/insee/IS_001.xlsx``...
+Chaque ligne donne une année, un DOM d'origine, une destination et un
+effectif ; les tableaux « larges » (une colonne par année) sont aussi
+acceptés. Un fichier illisible ou dont les colonnes ne sont pas reconnues
+est écarté (store.skipped) sans empêcher la lecture des autres. Les colonnes
+sont stockées en tableaux numpy typés (années en int16, origine et
+destination encodées par dictionnaire, effectifs en int64) dans
+``data/cache/flows.npz``, hors du dossier des fichiers sources, et relues
+tant que ceux-ci n'ont pas changé. Le cube année × origine × destination
+est calculé au chargement ; les graphiques n'en lisent que des sommes.
+
+Usage en ligne de commande :
+    python migration_flows.py data/insee
+"""
+
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import fold_accents
+
+DEFAULT_FLOWS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'insee')
+
+# Magasin typé dérivé des fichiers sources (jamais écrit dans le dossier des sources)
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'cache')
+
+STORE_FILE = 'flows.npz'
+
+FLOW_EXTENSIONS = ('.csv', '.xlsx', '.xls')
+
+# En-têtes reconnus (après passage en minuscules sans accents) pour chaque colonne
+COLUMN_ALIASES = {
+    'year': ('annee', 'year', 'an', 'millesime'),
+    'origin': ('origine', 'dom', 'dom_origine', 'departement_origine', 'dep_origine', 'origin'),
+    'destination': ('destination', 'region_destination', 'dep_destination', 'departement_destination',
+                    'region', 'destination_region'),
+    'flow': ('flux', 'effectif', 'effectifs', 'migrants', 'nombre', 'valeur', 'flow', 'nb'),
+}
+
+# Codes départementaux et noms des DOM d'origine
+DOM_CODES = {
+    '971': 'Guadeloupe',
+    '972': 'Martinique',
+    '973': 'Guyane',
+    '974': 'La Réunion',
+    '976': 'Mayotte',
+}
+DOM_NAMES = {fold_accents(name.lower()).replace('la ', ''): name for name in DOM_CODES.values()}
+
+YEAR_COLUMN_RE = re.compile(r"^(19|20)\d\d$")
+
+UNKNOWN = 'Non précisé'
+
+
+def normalize_header(name):
+    return re.sub(r"[\s\-']+", '_', fold_accents(str(name).strip().lower()))
+
+
+def normalize_origin(value):
+    """Nom canonique d'un DOM (« 972 », « MARTINIQUE », « Réunion » → nom usuel)"""
+    value = str(value or '').strip()
+    if not value or value.lower() == 'nan':
+        return UNKNOWN
+    code = value[:3]
+    if code in DOM_CODES:
+        return DOM_CODES[code]
+    folded = fold_accents(value.lower()).replace('la ', '').replace("l'ile de ", '').strip()
+    return DOM_NAMES.get(folded, value)
+
+
+def parse_counts(values):
+    """Effectifs numériques (espaces de milliers et virgules décimales tolérés)"""
+    cleaned = values.astype(str).str.replace(r"[\s  ]", '', regex=True).str.replace(',', '.')
+    return pd.to_numeric(cleaned, errors='coerce')
+
+
+def flow_files(datasets, directory=DEFAULT_FLOWS_DIR):
+    """Fichiers locaux des jeux de données, nommés d'après leur identifiant"""
+    paths = []
+    for dataset in datasets:
+        for extension in FLOW_EXTENSIONS:
+            path = os.path.join(directory, f"{dataset['id']}{extension}")
+            if os.path.exists(path):
+                paths.append(path)
+                break
+    return paths
+
+
+def source_signature(paths):
+    """(nom, taille, date de modification) des fichiers sources : change quand un fichier change"""
+    signature = []
+    for path in paths:
+        stat = os.stat(path)
+        signature.append((os.path.basename(path), stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+def read_flow_file(path):
+    """Lignes (year, origin, destination, flow) d'un fichier CSV ou XLSX"""
+    if path.endswith('.csv'):
+        try:
+            frame = pd.read_csv(path, sep=None, engine='python', dtype=str, encoding='utf-8-sig')
+        except UnicodeDecodeError:
+            # Exports INSEE anciens en Latin-1
+            frame = pd.read_csv(path, sep=None, engine='python', dtype=str, encoding='latin-1')
+    else:
+        frame = pd.read_excel(path, dtype=str)
+
+    headers = {normalize_header(column): column for column in frame.columns}
+    columns = {}
+    for name, aliases in COLUMN_ALIASES.items():
+        found = next((headers[alias] for alias in aliases if alias in headers), None)
+        if found is not None:
+            columns[name] = found
+
+    year_columns = [column for column in frame.columns if YEAR_COLUMN_RE.match(str(column).strip())]
+    if 'year' not in columns and year_columns:
+        # Tableau large : une colonne par année
+        keys = [columns[name] for name in ('origin', 'destination') if name in columns]
+        frame = frame.melt(id_vars=keys, value_vars=year_columns, var_name='__year', value_name='__flow')
+        columns['year'] = '__year'
+        columns['flow'] = '__flow'
+
+    if 'year' not in columns or 'flow' not in columns:
+        raise ValueError(f"{os.path.basename(path)} : colonnes année et effectif introuvables")
+
+    rows = pd.DataFrame({
+        'year': pd.to_numeric(frame[columns['year']].astype(str).str[:4], errors='coerce'),
+        'origin': frame[columns['origin']].map(normalize_origin) if 'origin' in columns else UNKNOWN,
+        'destination': frame[columns['destination']].fillna(UNKNOWN).astype(str).str.strip()
+        if 'destination' in columns else 'Métropole',
+        'flow': parse_counts(frame[columns['flow']]),
+    })
+    return rows.dropna(subset=['year', 'flow'])
+
+
+class FlowStore:
+    """Colonnes typées des flux et cube pré-agrégé année × origine × destination"""
+
+    def __init__(self, years, origins, destinations, flows, origin_values, destination_values, signature=(),
+                 skipped=()):
+        self.years = years
+        self.origins = origins
+        self.destinations = destinations
+        self.flows = flows
+        self.origin_values = list(origin_values)
+        self.destination_values = list(destination_values)
+        self.signature = tuple(signature)
+        # Fichiers écartés : (nom, raison)
+        self.skipped = tuple(skipped)
+        self._aggregate()
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros(0, np.int16), np.zeros(0, np.int8), np.zeros(0, np.int16),
+                   np.zeros(0, np.int64), [], [])
+
+    @classmethod
+    def from_frame(cls, frame, signature=(), skipped=()):
+        origins, origin_values = pd.factorize(frame['origin'], sort=True)
+        destinations, destination_values = pd.factorize(frame['destination'], sort=True)
+        return cls(
+            frame['year'].to_numpy(dtype=np.int16),
+            origins.astype(np.int8 if len(origin_values) < 128 else np.int16),
+            destinations.astype(np.int16 if len(destination_values) < 32768 else np.int32),
+            np.rint(frame['flow'].to_numpy(dtype=np.float64)).astype(np.int64),
+            origin_values, destination_values, signature, skipped
+        )
+
+    @classmethod
+    def ingest(cls, paths):
+        """Lit les fichiers sources et construit le magasin (fichiers illisibles écartés)"""
+        frames = []
+        skipped = []
+        for path in paths:
+            try:
+                frames.append(read_flow_file(path))
+            except Exception as error:  # format non reconnu, fichier corrompu, lecteur XLSX absent...
+                skipped.append((os.path.basename(path), str(error)))
+        if not frames:
+            store = cls.empty()
+            store.skipped = tuple(skipped)
+            return store
+        return cls.from_frame(pd.concat(frames, ignore_index=True), source_signature(paths), skipped)
+
+    @classmethod
+    def open(cls, datasets, directory=DEFAULT_FLOWS_DIR, cache_dir=DEFAULT_CACHE_DIR):
+        """Magasin à jour : relu depuis le cache, ou reconstruit si les fichiers sources ont changé"""
+        paths = flow_files(datasets, directory)
+        if not paths:
+            return cls.empty()
+        signature = source_signature(paths)
+        store_path = os.path.join(cache_dir, STORE_FILE)
+        if os.path.exists(store_path):
+            store = cls.load(store_path)
+            if store.signature == signature:
+                return store
+        store = cls.ingest(paths)
+        if store.signature:
+            os.makedirs(cache_dir, exist_ok=True)
+            store.save(store_path)
+        return store
+
+    def save(self, path):
+        tmp_path = path + '.tmp.npz'
+        np.savez(
+            tmp_path,
+            years=self.years, origins=self.origins, destinations=self.destinations, flows=self.flows,
+            origin_values=np.array(self.origin_values, dtype=str),
+            destination_values=np.array(self.destination_values, dtype=str),
+            signature=np.array([f"{name}\t{size}\t{mtime}" for name, size, mtime in self.signature], dtype=str),
+            skipped=np.array([f"{name}\t{reason}" for name, reason in self.skipped], dtype=str),
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            signature = []
+            for entry in data['signature']:
+                name, size, mtime = str(entry).split('\t')
+                signature.append((name, int(size), int(mtime)))
+            skipped = [tuple(str(entry).split('\t', 1)) for entry in data['skipped']] \
+                if 'skipped' in data.files else []
+            return cls(data['years'], data['origins'], data['destinations'], data['flows'],
+                       [str(value) for value in data['origin_values']],
+                       [str(value) for value in data['destination_values']], signature, skipped)
+
+    def _aggregate(self):
+        if len(self.years):
+            self.first_year = int(self.years.min())
+            n_years = int(self.years.max()) - self.first_year + 1
+        else:
+            self.first_year, n_years = 0, 0
+        shape = (n_years, len(self.origin_values), len(self.destination_values))
+        cells = np.ravel_multi_index(
+            (self.years.astype(np.int64) - self.first_year, self.origins, self.destinations), shape
+        ) if len(self.years) else np.zeros(0, dtype=np.int64)
+        self.cube = np.bincount(cells, weights=self.flows, minlength=int(np.prod(shape))) \
+            .astype(np.int64).reshape(shape)
+
+    def __len__(self):
+        return len(self.flows)
+
+    @property
+    def year_values(self):
+        return np.arange(self.first_year, self.first_year + self.cube.shape[0])
+
+    def _select(self, origins=None, destinations=None):
+        cube = self.cube
+        if origins is not None:
+            cube = cube[:, [self.origin_values.index(value) for value in origins if value in self.origin_values], :]
+        if destinations is not None:
+            cube = cube[:, :, [self.destination_values.index(value) for value in destinations
+                               if value in self.destination_values]]
+        return cube
+
+    def by_year(self, origins=None, destinations=None):
+        """Effectifs par année (somme sur les origines et destinations retenues)"""
+        totals = self._select(origins, destinations).sum(axis=(1, 2))
+        frame = pd.DataFrame({'Année': self.year_values, 'Migrations': totals})
+        return frame[frame['Migrations'] > 0].reset_index(drop=True)
+
+    def by_year_and_origin(self, destinations=None):
+        """Effectifs par année et par DOM d'origine (format long)"""
+        totals = self._select(None, destinations).sum(axis=2)
+        frame = pd.DataFrame(totals, index=self.year_values, columns=self.origin_values)
+        frame = frame.rename_axis('Année').reset_index().melt(
+            id_vars='Année', var_name="DOM d'origine", value_name='Migrations'
+        )
+        frame = frame[frame['Migrations'] > 0]
+        return frame.sort_values(['Année', "DOM d'origine"], kind='stable').reset_index(drop=True)
+
+    def by_destination(self, origins=None, k=10):
+        """Principales destinations sur toute la période"""
+        totals = self._select(origins, None).sum(axis=(0, 1))
+        order = np.argsort(-totals, kind='stable')[:k]
+        return pd.DataFrame({
+            'Destination': [self.destination_values[i] for i in order],
+            'Migrations': totals[order],
+        })
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    directory = argv[0] if argv else DEFAULT_FLOWS_DIR
+    from archives_data import seed_archives
+    store = FlowStore.open(seed_archives()['insee']['datasets'], directory)
+    for name, reason in store.skipped:
+        print(f"{name} écarté : {reason}", file=sys.stderr)
+    print(f"{len(store)} lignes, {len(store.origin_values)} origines, "
+          f"{len(store.destination_values)} destinations")
+    if len(store):
+        print(store.by_year().to_string(index=False))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
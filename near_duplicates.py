@@ -0,0 +1,278 @@
+"""
+Détection des quasi-doublons entre sources (MinHash + LSH).
+
+Un même document peut être référencé par plusieurs sources sous des
+identifiants et des titres légèrement différents. Chaque notice reçoit une
+signature MinHash calculée sur ses shingles de caractères (après
+normalisation) ; l'index LSH par bandes ne propose que les paires qui
+partagent au moins une bande, sans comparer toutes les paires. Les paires
+candidates sont vérifiées sur la similarité estimée, puis regroupées en
+grappes par union-find.
+"""
+
+import zlib
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import tokenize
+
+# Taille des shingles de caractères
+SHINGLE_SIZE = 5
+
+# Nombre de permutations = bandes × lignes par bande
+DEFAULT_BANDS = 32
+DEFAULT_ROWS = 4
+
+# Similarité de Jaccard estimée minimale pour retenir une paire candidate
+DEFAULT_THRESHOLD = 0.5
+
+_SHIFT = np.uint64(32)
+
+# Multiplicateur impair du hachage des bandes en clés uint64
+_BAND_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+_EMPTY_SIGNATURE = np.iinfo(np.uint32).max
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Empreintes (uint64) des shingles de caractères du texte normalisé"""
+    normalized = ' '.join(tokenize(text))
+    if len(normalized) <= size:
+        pieces = {normalized} if normalized else set()
+    else:
+        pieces = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+    return np.fromiter((zlib.crc32(piece.encode('utf-8')) for piece in pieces),
+                       dtype=np.uint64, count=len(pieces))
+
+
+class MinHasher:
+    """Famille de hachage multiply-shift : ((a·x + b) mod 2^64) >> 32, a impair"""
+
+    def __init__(self, num_perm=DEFAULT_BANDS * DEFAULT_ROWS, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def _permute(self, hashes):
+        # Le dépassement de capacité des uint64 est voulu (arithmétique modulo 2^64)
+        return ((hashes[:, None] * self.a[None, :] + self.b[None, :]) >> _SHIFT).astype(np.uint32)
+
+    def signature(self, hashes):
+        """Minimum de chaque permutation sur les shingles d'un document"""
+        if len(hashes) == 0:
+            return np.full(self.num_perm, _EMPTY_SIGNATURE, dtype=np.uint32)
+        return self._permute(hashes).min(axis=0)
+
+    def signatures(self, texts):
+        """Signatures de tous les documents (une ligne par document)"""
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            result[i] = self.signature(shingles(text))
+        return result
+
+
+class LSHIndex:
+    """Index LSH par bandes sur des signatures MinHash"""
+
+    def __init__(self, bands=DEFAULT_BANDS, rows=DEFAULT_ROWS):
+        self.bands = bands
+        self.rows = rows
+
+    @property
+    def threshold(self):
+        """Similarité à partir de laquelle une paire a plus d'une chance sur deux d'être proposée"""
+        return (1 / self.bands) ** (1 / self.rows)
+
+    def band_keys(self, signatures):
+        """Clé (uint64) de chaque bande de chaque signature ; une collision ne fait qu'ajouter un candidat"""
+        keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        for row in range(self.rows):
+            keys = keys * _BAND_MULTIPLIER + signatures[:, row::self.rows].astype(np.uint64)
+        return keys
+
+    def candidate_pairs(self, signatures):
+        """Paires (i, j), i < j, partageant au moins une bande identique"""
+        # Les documents vides (signature saturée) ne sont rapprochés de rien
+        rows = np.flatnonzero(signatures[:, 0] != _EMPTY_SIGNATURE) if len(signatures) else \
+            np.zeros(0, dtype=np.int64)
+        pairs = set()
+        for band in range(self.bands):
+            block = np.ascontiguousarray(signatures[rows, band * self.rows:(band + 1) * self.rows])
+            keys = block.view(np.dtype((np.void, block.dtype.itemsize * self.rows))).ravel()
+            _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+            # Seuls les seaux de plus d'un document produisent des paires
+            shared = np.flatnonzero(counts[inverse] > 1)
+            buckets = defaultdict(list)
+            for i in shared:
+                buckets[inverse[i]].append(int(rows[i]))
+            for members in buckets.values():
+                for x in range(len(members)):
+                    for y in range(x + 1, len(members)):
+                        pairs.add((members[x], members[y]))
+        return sorted(pairs)
+
+
+class BandBuckets:
+    """Seaux LSH par bande : clé de bande → lignes, prolongés par ajout en fin
+
+    Partagés entre les grappes successives : seules les n_rows premières
+    lignes appartiennent à la grappe qui les a indexées en dernier.
+    """
+
+    def __init__(self, bands):
+        self.tables = [{} for _ in range(bands)]
+        self.n_rows = 0
+
+    def add(self, row, keys):
+        for table, key in zip(self.tables, keys.tolist()):
+            table.setdefault(key, []).append(row)
+        self.n_rows = row + 1
+
+    def candidates(self, keys):
+        """Lignes déjà indexées partageant au moins une bande avec les clés"""
+        rows = set()
+        for table, key in zip(self.tables, keys.tolist()):
+            rows.update(table.get(key, ()))
+        return sorted(rows)
+
+
+class DuplicateClusters:
+    """Grappes de quasi-doublons et représentant de chaque grappe"""
+
+    def __init__(self, labels, pairs, similarities, signatures=None, threshold=DEFAULT_THRESHOLD,
+                 index=None):
+        # labels[i] : numéro de grappe (celui de son premier membre)
+        self.labels = labels
+        self.pairs = pairs
+        self.similarities = similarities
+        self.representatives = labels == np.arange(len(labels))
+        # Conservés pour rattacher de nouvelles notices sans tout recalculer
+        self.signatures = signatures
+        self.threshold = threshold
+        self.index = index or LSHIndex()
+        self.band_keys = self.index.band_keys(signatures) if signatures is not None else None
+        # Seaux des bandes (construits au premier ajout) et ordre des lignes par grappe (à la demande)
+        self.buckets = None
+        self._order = None
+
+    @classmethod
+    def from_texts(cls, texts, threshold=DEFAULT_THRESHOLD, bands=DEFAULT_BANDS, rows=DEFAULT_ROWS):
+        texts = list(texts)
+        index = LSHIndex(bands, rows)
+        signatures = MinHasher(bands * rows).signatures(texts)
+        candidates = index.candidate_pairs(signatures)
+
+        pairs = []
+        similarities = []
+        for i, j in candidates:
+            similarity = float((signatures[i] == signatures[j]).mean())
+            if similarity >= threshold:
+                pairs.append((i, j))
+                similarities.append(similarity)
+
+        # Union-find : chaque grappe est étiquetée par son plus petit indice
+        parent = list(range(len(texts)))
+
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        for i, j in pairs:
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        labels = np.array([find(i) for i in range(len(texts))], dtype=np.int64)
+        return cls(labels, pairs, np.array(similarities), signatures, threshold, index)
+
+    def _shared_buckets(self):
+        """Seaux des bandes couvrant exactement les lignes de ces grappes (repris s'ils ne sont pas allés plus loin)"""
+        if self.buckets is not None and self.buckets.n_rows == len(self.labels):
+            return self.buckets
+        buckets = BandBuckets(self.index.bands)
+        for row in np.flatnonzero(self.signatures[:, 0] != _EMPTY_SIGNATURE):
+            buckets.add(int(row), self.band_keys[row])
+        buckets.n_rows = len(self.labels)
+        return buckets
+
+    def extend(self, texts):
+        """Nouvelles grappes après ajout de notices en fin de liste (seules les nouvelles sont hachées)
+
+        Les candidats de chaque nouvelle notice sont lus dans les seaux de ses
+        bandes, sans parcourir les notices existantes.
+        """
+        texts = list(texts)
+        if not texts:
+            return self
+        new_signatures = MinHasher(self.index.bands * self.index.rows).signatures(texts)
+        signatures = np.vstack([self.signatures, new_signatures])
+        keys = np.vstack([self.band_keys, self.index.band_keys(new_signatures)])
+        labels = np.concatenate([self.labels, np.arange(len(self.labels), len(signatures))])
+        pairs = list(self.pairs)
+        similarities = list(self.similarities)
+        buckets = self._shared_buckets()
+
+        for j in range(len(self.labels), len(signatures)):
+            if signatures[j, 0] == _EMPTY_SIGNATURE:
+                buckets.n_rows = j + 1
+                continue
+            for i in buckets.candidates(keys[j]):
+                similarity = float((signatures[i] == signatures[j]).mean())
+                if similarity < self.threshold:
+                    continue
+                pairs.append((i, j))
+                similarities.append(similarity)
+                low, high = sorted((labels[i], labels[j]))
+                if low != high:
+                    labels[labels == high] = low
+            buckets.add(j, keys[j])
+
+        clusters = DuplicateClusters(labels, pairs, np.array(similarities), threshold=self.threshold,
+                                     index=self.index)
+        clusters.signatures = signatures
+        clusters.band_keys = keys
+        clusters.buckets = buckets
+        return clusters
+
+    @property
+    def n_unique(self):
+        return int(self.representatives.sum())
+
+    @property
+    def n_duplicates(self):
+        return len(self.labels) - self.n_unique
+
+    def members(self, row):
+        """Lignes de la grappe d'une notice (elle comprise), par recherche dichotomique"""
+        if self._order is None:
+            order = np.argsort(self.labels, kind='stable')
+            self._order = order, self.labels[order]
+        order, sorted_labels = self._order
+        label = self.labels[row]
+        return order[np.searchsorted(sorted_labels, label, 'left'):np.searchsorted(sorted_labels, label, 'right')]
+
+    def clusters(self):
+        """Grappes de plus d'un membre, sous forme de listes de lignes"""
+        sizes = np.bincount(self.labels, minlength=len(self.labels))
+        return [self.members(label) for label in np.flatnonzero(sizes > 1)]
+
+    def table(self, documents):
+        """Tableau des grappes : une ligne par membre, avec la similarité au représentant"""
+        best = {}
+        for (i, j), similarity in zip(self.pairs, self.similarities):
+            for row in (i, j):
+                best[row] = max(best.get(row, 0.0), similarity)
+
+        rows = []
+        for number, members in enumerate(self.clusters(), start=1):
+            for row in members:
+                entry = documents.iloc[row].to_dict()
+                entry['grappe'] = number
+                entry['similarité'] = round(best.get(row, 1.0), 2)
+                rows.append(entry)
+        return pd.DataFrame(rows)
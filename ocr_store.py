@@ -0,0 +1,560 @@
+"""
+Stockage plein texte des OCR Gallica : blobs de texte, table d'offsets par page
+et postings positionnels, le tout sur disque et lu par memory-mapping.
+
+Un corpus est un répertoire contenant un ou plusieurs segments (``seg_00001``,
+``seg_00002``...). Chaque segment est écrit une seule fois puis n'est plus
+modifié ; l'ingestion d'un nouveau lot produit simplement un nouveau segment.
+Chaque segment enregistre la version de l'analyseur qui a produit ses
+postings (``meta.json``). Un segment d'une autre version est écarté à
+l'ouverture du corpus (``OcrCorpus.stale``) et réindexé à partir de son
+texte par ``reindex_corpus`` (ligne de commande ou tâche de fond) : le
+segment réindexé déclare le segment qu'il remplace, si bien qu'un seul
+renommage le substitue à l'ancien, supprimé ensuite.
+
+Un segment est construit dans ``seg_NNNNN.tmp`` puis renommé : le numéro est
+réservé par la création atomique de ce répertoire, si bien que deux
+ingestions simultanées n'écrivent jamais dans le même segment.
+
+Usage en ligne de commande :
+    python ocr_store.py ingest data/ocr chemin/vers/les/txt
+    python ocr_store.py search data/ocr "travailleurs antillais"
+    python ocr_store.py reindex data/ocr
+"""
+
+import json
+import mmap
+import os
+import shutil
+import sys
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+
+import numpy as np
+
+from text_normalization import ANALYZER_VERSION, analyze_spans, tokenize
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows : répertoires temporaires conservés
+    fcntl = None
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+DEFAULT_OCR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ocr')
+
+GALLICA_PAGE_URL = "https://gallica.bnf.fr/ark:/12148/{ark}/f{page}.item"
+
+# Nombre de postings accumulés en mémoire avant l'écriture d'un segment
+DEFAULT_SEGMENT_POSTINGS = 5_000_000
+
+SEGMENT_META = 'meta.json'
+
+# Version des segments écrits sans meta.json (postings non racinisés)
+LEGACY_ANALYZER_VERSION = 1
+
+# Verrou tenu par l'écrivain dans le répertoire temporaire d'un segment en construction
+SEGMENT_LOCK = '.lock'
+
+def split_pages(text):
+    """Découpe un export TXT Gallica en pages (séparateur saut de page)"""
+    pages = text.split('\f')
+    # Un saut de page final ne correspond pas à une page supplémentaire
+    if len(pages) > 1 and not pages[-1].strip():
+        pages = pages[:-1]
+    return pages
+
+
+def normalize_ark(ark):
+    """Retire le préfixe 'ark:/12148/' d'un identifiant Gallica"""
+    return ark.replace('ark:/12148/', '').strip('/')
+
+
+# ============================================================================
+# ÉCRITURE
+# ============================================================================
+
+class OcrCorpusWriter:
+    """Ingestion incrémentale de textes OCR dans un nouveau segment du corpus"""
+
+    def __init__(self, corpus_dir=DEFAULT_OCR_DIR, max_postings=DEFAULT_SEGMENT_POSTINGS, replaces=None):
+        self.corpus_dir = corpus_dir
+        self.max_postings = max_postings
+        # Nom du segment remplacé par celui-ci (réindexation), masqué dès le renommage
+        self.replaces = replaces
+        os.makedirs(corpus_dir, exist_ok=True)
+        self._segment_dir = None
+        self._lock_file = None
+        self._remove_stale_segments()
+        self._reset()
+
+    def _remove_stale_segments(self):
+        """Supprime les segments temporaires abandonnés (écrivain arrêté avant le renommage)"""
+        if fcntl is None:
+            return
+        for name in os.listdir(self.corpus_dir):
+            path = os.path.join(self.corpus_dir, name)
+            if not (name.startswith('seg_') and name.endswith('.tmp') and os.path.isdir(path)):
+                continue
+            try:
+                fd = os.open(os.path.join(path, SEGMENT_LOCK), os.O_RDWR | os.O_CREAT)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                # Segment en construction par un autre écrivain
+                os.close(fd)
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            os.close(fd)
+
+    def _reset(self):
+        self._text_file = None
+        self._text_size = 0
+        self._page_offsets = array('q', [0])
+        self._page_docs = array('i')
+        self._page_numbers = array('i')
+        self._arks = []
+        self._postings = {}
+        self._n_postings = 0
+
+    def _next_segment_dir(self):
+        """Réserve le numéro de segment suivant en créant son répertoire temporaire"""
+        while True:
+            # Numéros des segments écrits et des segments en construction
+            numbers = [int(name[4:].split('.')[0]) for name in os.listdir(self.corpus_dir)
+                       if name.startswith('seg_') and name[4:].split('.')[0].isdigit()]
+            segment_dir = os.path.join(self.corpus_dir, f"seg_{max(numbers, default=0) + 1:05d}")
+            try:
+                os.mkdir(segment_dir + '.tmp')
+            except FileExistsError:
+                # Numéro pris entre-temps par une autre ingestion
+                continue
+            if not os.path.exists(segment_dir):
+                return segment_dir
+            # Segment renommé entre la liste et la réservation (aucun écrivain ne peut plus le réserver)
+            shutil.rmtree(segment_dir + '.tmp', ignore_errors=True)
+
+    def _open_segment(self):
+        # Le segment est construit dans un répertoire temporaire puis renommé
+        while True:
+            segment_dir = self._next_segment_dir()
+            lock_path = os.path.join(segment_dir + '.tmp', SEGMENT_LOCK)
+            try:
+                lock_file = open(lock_path, 'a')
+            except FileNotFoundError:
+                continue
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            # Un autre écrivain a pu prendre le répertoire, encore sans verrou, pour abandonné
+            try:
+                if os.stat(lock_path).st_ino == os.fstat(lock_file.fileno()).st_ino:
+                    break
+            except FileNotFoundError:
+                pass
+            lock_file.close()
+        self._segment_dir = segment_dir
+        self._lock_file = lock_file
+        self._text_file = open(os.path.join(segment_dir + '.tmp', 'text.bin'), 'wb')
+
+    def _release_lock(self, segment_dir):
+        if self._lock_file is None:
+            return
+        # Le verrou reste tenu jusqu'au renommage : le segment n'est jamais pris pour abandonné
+        try:
+            os.remove(os.path.join(segment_dir, SEGMENT_LOCK))
+        except OSError:
+            pass
+        self._lock_file.close()
+        self._lock_file = None
+
+    def add_document(self, ark, pages):
+        """Ajoute un document (liste de textes de pages, la première étant f1)"""
+        if self._text_file is None:
+            self._open_segment()
+
+        doc_index = len(self._arks)
+        self._arks.append(normalize_ark(ark))
+
+        for page_number, page_text in enumerate(pages, start=1):
+            page_index = len(self._page_docs)
+            data = page_text.encode('utf-8')
+            self._text_file.write(data)
+            self._text_size += len(data)
+            self._page_offsets.append(self._text_size)
+            self._page_docs.append(doc_index)
+            self._page_numbers.append(page_number)
+
+            # Positions comptées sur les tokens normalisés (stopwords exclus),
+            # comme pour les requêtes : les expressions restent alignées
+            terms = [stem for stem, _, _, _ in analyze_spans(page_text)]
+            for position, term in enumerate(terms):
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = array('i')
+                postings.append(page_index)
+                postings.append(position)
+            self._n_postings += len(terms)
+
+        # Mémoire bornée : le segment est écrit dès que le seuil est atteint
+        if self._n_postings >= self.max_postings:
+            self.flush()
+
+    def add_text(self, ark, text):
+        """Ajoute un export TXT complet, découpé en pages"""
+        self.add_document(ark, split_pages(text))
+
+    def flush(self):
+        """Écrit le segment en cours sur disque"""
+        if self._text_file is None:
+            return None
+
+        self._text_file.close()
+        tmp_dir = self._segment_dir + '.tmp'
+
+        terms = sorted(self._postings)
+        term_bytes = [term.encode('utf-8') for term in terms]
+        term_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in term_bytes], out=term_offsets[1:])
+        with open(os.path.join(tmp_dir, 'terms.bin'), 'wb') as f:
+            f.write(b''.join(term_bytes))
+
+        postings_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(self._postings[t]) // 2 for t in terms], out=postings_offsets[1:])
+        post_pages = np.empty(postings_offsets[-1], dtype=np.int32)
+        post_positions = np.empty(postings_offsets[-1], dtype=np.int32)
+        for i, term in enumerate(terms):
+            pairs = np.frombuffer(self._postings[term], dtype=np.int32)
+            start, end = postings_offsets[i], postings_offsets[i + 1]
+            post_pages[start:end] = pairs[0::2]
+            post_positions[start:end] = pairs[1::2]
+
+        np.save(os.path.join(tmp_dir, 'term_offsets.npy'), term_offsets)
+        np.save(os.path.join(tmp_dir, 'postings_offsets.npy'), postings_offsets)
+        np.save(os.path.join(tmp_dir, 'post_pages.npy'), post_pages)
+        np.save(os.path.join(tmp_dir, 'post_positions.npy'), post_positions)
+        np.save(os.path.join(tmp_dir, 'page_offsets.npy'), np.frombuffer(self._page_offsets, dtype=np.int64))
+        np.save(os.path.join(tmp_dir, 'page_docs.npy'), np.frombuffer(self._page_docs, dtype=np.int32))
+        np.save(os.path.join(tmp_dir, 'page_numbers.npy'), np.frombuffer(self._page_numbers, dtype=np.int32))
+        with open(os.path.join(tmp_dir, 'docs.json'), 'w', encoding='utf-8') as f:
+            json.dump(self._arks, f)
+        with open(os.path.join(tmp_dir, SEGMENT_META), 'w', encoding='utf-8') as f:
+            meta = {'analyzer': ANALYZER_VERSION}
+            if self.replaces:
+                meta['replaces'] = self.replaces
+            json.dump(meta, f)
+
+        os.rename(tmp_dir, self._segment_dir)
+        segment_dir = self._segment_dir
+        self._release_lock(segment_dir)
+        self._reset()
+        return segment_dir
+
+    def close(self):
+        return self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._text_file is not None:
+            self._text_file.close()
+            # Segment incomplet : supprimé tout de suite plutôt qu'à la prochaine ouverture
+            shutil.rmtree(self._segment_dir + '.tmp', ignore_errors=True)
+            self._release_lock(self._segment_dir + '.tmp')
+
+
+# ============================================================================
+# LECTURE
+# ============================================================================
+
+def segment_meta(segment_dir):
+    """Métadonnées du segment ({} pour un segment écrit sans meta.json)"""
+    try:
+        with open(os.path.join(segment_dir, SEGMENT_META), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def segment_analyzer(segment_dir):
+    """Version de l'analyseur qui a indexé le segment"""
+    return segment_meta(segment_dir).get('analyzer', LEGACY_ANALYZER_VERSION)
+
+
+def segment_dirs(corpus_dir):
+    """Segments écrits du corpus, dans l'ordre ; (visibles, remplacés par un segment réindexé)"""
+    if not os.path.isdir(corpus_dir):
+        return [], []
+    paths = [
+        os.path.join(corpus_dir, name) for name in sorted(os.listdir(corpus_dir))
+        if name.startswith('seg_') and not name.endswith('.tmp')
+        and os.path.isdir(os.path.join(corpus_dir, name))
+    ]
+    replaced = {segment_meta(path).get('replaces') for path in paths}
+    return ([path for path in paths if os.path.basename(path) not in replaced],
+            [path for path in paths if os.path.basename(path) in replaced])
+
+
+class _Segment:
+    """Segment en lecture seule, adossé à des fichiers memory-mappés"""
+
+    def __init__(self, segment_dir):
+        self.name = os.path.basename(segment_dir)
+        load = lambda name: np.load(os.path.join(segment_dir, name), mmap_mode='r')
+        self.term_offsets = load('term_offsets.npy')
+        self.postings_offsets = load('postings_offsets.npy')
+        self.post_pages = load('post_pages.npy')
+        self.post_positions = load('post_positions.npy')
+        self.page_offsets = load('page_offsets.npy')
+        self.page_docs = load('page_docs.npy')
+        self.page_numbers = load('page_numbers.npy')
+        with open(os.path.join(segment_dir, 'docs.json'), encoding='utf-8') as f:
+            self.arks = json.load(f)
+        self.analyzer = segment_analyzer(segment_dir)
+        self._terms = self._map(os.path.join(segment_dir, 'terms.bin'))
+        self._text = self._map(os.path.join(segment_dir, 'text.bin'))
+        self.n_terms = len(self.term_offsets) - 1
+
+    @staticmethod
+    def _map(path):
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b''
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _term_at(self, i):
+        return self._terms[self.term_offsets[i]:self.term_offsets[i + 1]]
+
+    def lookup(self, term):
+        """Recherche dichotomique du terme dans le lexique trié"""
+        key = term.encode('utf-8')
+        i = bisect_left(_TermView(self), key)
+        if i < self.n_terms and self._term_at(i) == key:
+            return self.postings_offsets[i], self.postings_offsets[i + 1]
+        return None
+
+    def postings(self, term):
+        bounds = self.lookup(term)
+        if bounds is None:
+            return None, None
+        start, end = bounds
+        return self.post_pages[start:end], self.post_positions[start:end]
+
+    def page_text(self, page_index):
+        return bytes(self._text[self.page_offsets[page_index]:self.page_offsets[page_index + 1]]).decode('utf-8')
+
+
+class _TermView:
+    """Vue séquence sur le lexique d'un segment, pour bisect"""
+
+    def __init__(self, segment):
+        self.segment = segment
+
+    def __len__(self):
+        return self.segment.n_terms
+
+    def __getitem__(self, i):
+        return self.segment._term_at(i)
+
+
+class OcrCorpus:
+    """Corpus OCR interrogeable sans chargement en mémoire"""
+
+    def __init__(self, corpus_dir=DEFAULT_OCR_DIR):
+        """Segments du corpus
+
+        Les segments indexés par une autre version de l'analyseur ne sont pas
+        interrogés : ils sont listés dans stale, en attente de reindex_corpus.
+        """
+        self.corpus_dir = corpus_dir
+        paths, _ = segment_dirs(corpus_dir)
+        self.stale = [path for path in paths if segment_analyzer(path) != ANALYZER_VERSION]
+        self.segments = [_Segment(path) for path in paths if path not in self.stale]
+
+    @property
+    def n_documents(self):
+        return sum(len(segment.arks) for segment in self.segments)
+
+    @property
+    def n_pages(self):
+        return sum(len(segment.page_docs) for segment in self.segments)
+
+    def iter_pages(self, segments=None):
+        """Parcourt le texte des pages (de tous les segments par défaut) : (ark, numéro de page, texte)"""
+        for segment in self.segments if segments is None else segments:
+            for page_index in range(len(segment.page_docs)):
+                yield (segment.arks[segment.page_docs[page_index]], int(segment.page_numbers[page_index]),
+                       segment.page_text(page_index))
+
+    def search(self, query, phrase=False, limit=50):
+        """Pages contenant tous les termes de la requête (ou la phrase exacte)"""
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        hits = []
+        for segment in self.segments:
+            hits.extend(self._search_segment(segment, terms, phrase))
+
+        hits.sort(key=lambda hit: (-hit['score'], hit['ark'], hit['page']))
+        return hits[:limit]
+
+    def _search_segment(self, segment, terms, phrase):
+        postings = [segment.postings(term) for term in terms]
+        if any(pages is None for pages, _ in postings):
+            return []
+
+        # Intersection des pages, en commençant par le terme le plus rare
+        order = sorted(range(len(terms)), key=lambda k: len(postings[k][0]))
+        candidate_pages = np.unique(postings[order[0]][0])
+        for k in order[1:]:
+            candidate_pages = np.intersect1d(candidate_pages, postings[k][0], assume_unique=False)
+            if candidate_pages.size == 0:
+                return []
+
+        if phrase and len(terms) > 1:
+            # Clé (page, position - rang) : une phrase aligne les clés de tous les termes
+            keys = None
+            for k, (pages, positions) in enumerate(postings):
+                mask = np.isin(pages, candidate_pages)
+                term_keys = (pages[mask].astype(np.int64) << 32) | (positions[mask].astype(np.int64) - k + (1 << 31))
+                keys = term_keys if keys is None else np.intersect1d(keys, term_keys)
+                if keys.size == 0:
+                    return []
+            match_pages, scores = np.unique(keys >> 32, return_counts=True)
+            first_positions = {}
+            for key in keys:
+                first_positions.setdefault(int(key >> 32), int(key & 0xFFFFFFFF) - (1 << 31))
+        else:
+            match_pages = candidate_pages
+            scores = np.zeros(len(match_pages), dtype=np.int64)
+            first_positions = {}
+            for pages, positions in postings:
+                mask = np.isin(pages, match_pages)
+                counts = np.bincount(np.searchsorted(match_pages, pages[mask]), minlength=len(match_pages))
+                scores += counts
+            pages, positions = postings[order[0]]
+            mask = np.isin(pages, match_pages)
+            for page, position in zip(pages[mask], positions[mask]):
+                first_positions.setdefault(int(page), int(position))
+
+        results = []
+        for page_index, score in zip(match_pages, scores):
+            page_index = int(page_index)
+            ark = segment.arks[segment.page_docs[page_index]]
+            page_number = int(segment.page_numbers[page_index])
+            results.append({
+                'ark': ark,
+                'page': page_number,
+                'score': int(score),
+                'url': GALLICA_PAGE_URL.format(ark=ark, page=page_number),
+                'snippet': _snippet(segment.page_text(page_index), first_positions.get(page_index, 0), len(terms))
+            })
+        return results
+
+
+def _snippet(page_text, position, n_terms, context=12):
+    """Extrait de la page autour de la position (en mots) de la première occurrence"""
+    spans = analyze_spans(page_text)
+    if not spans:
+        return ''
+    start = spans[max(0, position - context)][2]
+    end = spans[min(len(spans) - 1, position + n_terms - 1 + context)][3]
+    prefix = '...' if start > 0 else ''
+    suffix = '...' if end < len(page_text) else ''
+    return prefix + ' '.join(page_text[start:end].split()) + suffix
+
+
+def reindex_segment(segment_dir, corpus_dir=DEFAULT_OCR_DIR):
+    """Réindexe un segment avec l'analyseur courant
+
+    Les pages sont relues dans un nouveau segment qui déclare remplacer
+    l'ancien : son renommage le rend visible et masque l'ancien en une seule
+    opération, puis l'ancien est supprimé. Un arrêt avant le renommage ne
+    laisse qu'un répertoire temporaire ; un arrêt après, un segment masqué
+    que le prochain reindex_corpus supprime.
+    """
+    try:
+        lock_fd = os.open(os.path.join(segment_dir, SEGMENT_LOCK), os.O_RDWR | os.O_CREAT)
+    except FileNotFoundError:
+        # Segment déjà réindexé et supprimé par un autre processus
+        return
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX)
+        # Déjà réindexé par un autre processus pendant l'attente du verrou
+        if not os.path.exists(os.path.join(segment_dir, 'docs.json')) \
+                or segment_analyzer(segment_dir) == ANALYZER_VERSION:
+            return
+        # Segment déjà remplacé (arrêt avant sa suppression) : seule la suppression reste à faire
+        if os.path.basename(segment_dir) not in map(os.path.basename, segment_dirs(corpus_dir)[1]):
+            segment = _Segment(segment_dir)
+            # Pages d'un même document contiguës, dans l'ordre de leurs numéros
+            order = np.lexsort((segment.page_numbers, segment.page_docs))
+            # Un seul segment de remplacement, quelle que soit sa taille
+            with OcrCorpusWriter(corpus_dir, max_postings=float('inf'),
+                                 replaces=os.path.basename(segment_dir)) as writer:
+                for doc_index, pages in groupby(order, key=lambda page: int(segment.page_docs[page])):
+                    writer.add_document(segment.arks[doc_index], [segment.page_text(page) for page in pages])
+        shutil.rmtree(segment_dir, ignore_errors=True)
+    finally:
+        os.close(lock_fd)
+
+
+def reindex_corpus(corpus_dir=DEFAULT_OCR_DIR):
+    """Réindexe les segments d'une autre version de l'analyseur ; nombre de segments réindexés
+
+    Les segments déjà remplacés (arrêt entre le renommage et la suppression)
+    sont supprimés au passage.
+    """
+    paths, replaced = segment_dirs(corpus_dir)
+    for path in replaced:
+        shutil.rmtree(path, ignore_errors=True)
+    stale = [path for path in paths if segment_analyzer(path) != ANALYZER_VERSION]
+    for path in stale:
+        reindex_segment(path, corpus_dir)
+    return len(stale)
+
+
+def ingest_directory(source_dir, corpus_dir=DEFAULT_OCR_DIR):
+    """Ingère tous les fichiers '<ark>.txt' d'un répertoire"""
+    count = 0
+    with OcrCorpusWriter(corpus_dir) as writer:
+        for name in sorted(os.listdir(source_dir)):
+            if name.endswith('.txt'):
+                with open(os.path.join(source_dir, name), encoding='utf-8') as f:
+                    writer.add_text(name[:-4], f.read())
+                count += 1
+    return count
+
+
+# ============================================================================
+# POINT D'ENTRÉE
+# ============================================================================
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 4 and sys.argv[1] == 'ingest':
+        n = ingest_directory(sys.argv[3], sys.argv[2])
+        print(f"{n} document(s) ingéré(s) dans {sys.argv[2]}")
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'search':
+        corpus = OcrCorpus(sys.argv[2])
+        if corpus.stale:
+            print(f"{len(corpus.stale)} segment(s) d'une autre version de l'analyseur ignoré(s) "
+                  f"(python ocr_store.py reindex {sys.argv[2]})", file=sys.stderr)
+        for hit in corpus.search(' '.join(sys.argv[3:])):
+            print(f"{hit['score']:>4}  {hit['ark']} p.{hit['page']}  {hit['url']}")
+            print(f"      {hit['snippet']}")
+    elif len(sys.argv) >= 3 and sys.argv[1] == 'reindex':
+        n = reindex_corpus(sys.argv[2])
+        corpus = OcrCorpus(sys.argv[2])
+        print(f"{n} segment(s) réindexé(s)")
+        print(f"{len(corpus.segments)} segment(s) indexé(s) par l'analyseur version {ANALYZER_VERSION}")
+    else:
+        print(__doc__)
@@ -0,0 +1,608 @@
+"""
+Rapport PDF écrit au fil de l'eau, sans bibliothèque PDF.
+
+Le fichier est produit objet par objet : dès qu'une page est remplie, son
+flux de contenu (compressé) et l'objet page sont écrits, puis oubliés. Seuls
+les décalages des objets (pour la table xref) restent en mémoire ; la
+mémoire ne dépend donc pas du nombre de pages. Les tableaux sont lus depuis
+le catalogue par lots de lignes et l'en-tête est répété sur chaque page.
+
+Les graphiques viennent des figures du cache (figure_cache). Avec kaleido,
+la figure est rastérisée en JPEG et incluse telle quelle (filtre DCTDecode,
+sans décodage) ; sans kaleido, les diagrammes en barres sont redessinés en
+vectoriel à partir de la spec de la figure.
+
+Les polices sont les polices standard Helvetica (encodage WinAnsi) : aucun
+fichier de police n'est embarqué.
+
+    with open('rapport.pdf', 'wb') as handle:
+        report = PdfReport(handle, 'Archives du BUMIDOM')
+        report.heading('Références')
+        report.table(['Titre', 'Date'], rows)   # rows : itérable, lu au fil de l'eau
+        report.close()
+"""
+
+import base64
+import os
+import re
+import textwrap
+import threading
+import unicodedata
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+# ============================================================================
+# CONSTANTES
+# ============================================================================
+
+# A4 en points
+PAGE_WIDTH = 595.28
+PAGE_HEIGHT = 841.89
+MARGIN = 50
+FOOTER_HEIGHT = 20
+
+FONTS = {
+    False: ('F1', 'Helvetica'),
+    True: ('F2', 'Helvetica-Bold'),
+}
+
+# Chasses Helvetica (millièmes de corps) des caractères 32 à 126
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+DEFAULT_WIDTH = 556
+# Helvetica-Bold est un peu plus large : approximation suffisante pour couper les lignes
+BOLD_FACTOR = 1.06
+
+# Lignes du catalogue lues par lot pour les tableaux
+DEFAULT_CHUNK_ROWS = 500
+
+# Taille des graphiques rastérisés (pixels)
+IMAGE_WIDTH = 1000
+IMAGE_HEIGHT = 560
+
+TITLE_UNDERLINE_RE = re.compile(r"^[=\-]{3,}$")
+BOLD_LINE_RE = re.compile(r"^\*\*(.+?)\*\*:?$")
+
+
+# ============================================================================
+# TEXTE
+# ============================================================================
+
+def _char_width(char):
+    code = ord(char)
+    if not 32 <= code <= 126:
+        # Lettres accentuées : chasse de la lettre de base
+        code = ord(unicodedata.normalize('NFKD', char)[:1] or ' ')
+    return HELVETICA_WIDTHS[code - 32] if 32 <= code <= 126 else DEFAULT_WIDTH
+
+
+def text_width(text, size, bold=False):
+    width = sum(_char_width(char) for char in text) * size / 1000
+    return width * BOLD_FACTOR if bold else width
+
+
+def fit_text(text, width, size, bold=False):
+    """Texte tronqué (avec « … ») pour tenir dans width points"""
+    if text_width(text, size, bold) <= width:
+        return text
+    ellipsis = text_width('…', size, bold)
+    kept = ''
+    used = 0.0
+    for char in text:
+        used += _char_width(char) * size / 1000 * (BOLD_FACTOR if bold else 1)
+        if used + ellipsis > width:
+            break
+        kept += char
+    return kept.rstrip() + '…'
+
+
+def wrap_text(text, width, size, bold=False):
+    """Lignes de text tenant chacune dans width points (césure aux espaces)"""
+    lines = []
+    current = ''
+    for word in text.split():
+        candidate = f"{current} {word}" if current else word
+        if current and text_width(candidate, size, bold) > width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return [fit_text(line, width, size, bold) for line in lines] or ['']
+
+
+def pdf_string(text):
+    """Chaîne PDF littérale en WinAnsi (caractères hors jeu remplacés par « ? »)"""
+    encoded = str(text).encode('cp1252', errors='replace')
+    encoded = encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+    return b'(' + encoded.replace(b'\r', b'').replace(b'\n', b' ') + b')'
+
+
+def pdf_text_string(text):
+    """Chaîne de texte PDF en UTF-16 (métadonnées du document)"""
+    return b'<FEFF' + str(text).encode('utf-16-be').hex().upper().encode() + b'>'
+
+
+def _number(value):
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+
+# ============================================================================
+# IMAGES
+# ============================================================================
+
+def jpeg_info(data):
+    """(largeur, hauteur, composantes) lus dans l'en-tête SOF d'un JPEG"""
+    position = 2
+    while position + 9 < len(data):
+        if data[position] != 0xFF:
+            raise ValueError("JPEG invalide")
+        marker = data[position + 1]
+        length = int.from_bytes(data[position + 2:position + 4], 'big')
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[position + 5:position + 7], 'big')
+            width = int.from_bytes(data[position + 7:position + 9], 'big')
+            return width, height, data[position + 9]
+        position += 2 + length
+    raise ValueError("En-tête JPEG introuvable")
+
+
+def figure_jpeg(figure, width=IMAGE_WIDTH, height=IMAGE_HEIGHT):
+    """Figure rastérisée en JPEG avec kaleido ; None si kaleido n'est pas utilisable"""
+    try:
+        import plotly.io as pio
+        return pio.to_image(figure.to_dict(), format='jpeg', width=width, height=height)
+    except Exception:  # kaleido absent, ou sans navigateur pour le rendu
+        return None
+
+
+def _decode(values):
+    """Valeurs d'une trace : liste, ou tableau typé encodé (« bdata ») des specs Plotly récentes"""
+    if isinstance(values, dict) and 'bdata' in values:
+        return np.frombuffer(base64.b64decode(values['bdata']), dtype=values['dtype']).tolist()
+    return list(values if values is not None else [])
+
+
+def figure_bars(figure):
+    """(titre, libellés, valeurs, horizontal) d'une figure en barres, None pour un autre type
+
+    Les traces sont additionnées par libellé (barres empilées).
+    """
+    spec = figure.to_dict()
+    traces = [trace for trace in spec.get('data', []) if trace.get('type') == 'bar']
+    if not traces:
+        return None
+    horizontal = traces[0].get('orientation') == 'h'
+    totals = {}
+    for trace in traces:
+        labels, values = _decode(trace.get('x')), _decode(trace.get('y'))
+        if horizontal:
+            labels, values = values, labels
+        for label, value in zip(labels, values):
+            totals[label] = totals.get(label, 0) + (value or 0)
+    title = spec.get('layout', {}).get('title', {})
+    title = title.get('text', '') if isinstance(title, dict) else str(title or '')
+    return title, [str(label) for label in totals], list(totals.values()), horizontal
+
+
+# ============================================================================
+# ÉCRITURE DU FICHIER
+# ============================================================================
+
+class PdfWriter:
+    """Objets PDF écrits dès qu'ils sont complets ; seuls leurs décalages sont conservés"""
+
+    CATALOG_ID = 1
+    PAGES_ID = 2
+
+    def __init__(self, handle, compress=True):
+        self.handle = handle
+        self.compress = compress
+        self.offsets = {}
+        self.page_ids = []
+        self._next_id = 3
+        self._position = 0
+        self._write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        self.font_ids = {}
+        for bold, (name, base_font) in FONTS.items():
+            self.font_ids[name] = self.add_object(
+                f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>".encode()
+            )
+
+    def _write(self, data):
+        self.handle.write(data)
+        self._position += len(data)
+
+    def reserve(self):
+        obj_id = self._next_id
+        self._next_id += 1
+        return obj_id
+
+    def write_object(self, obj_id, body, stream=None):
+        self.offsets[obj_id] = self._position
+        self._write(f"{obj_id} 0 obj\n".encode())
+        self._write(body)
+        if stream is not None:
+            self._write(b'\nstream\n')
+            self._write(stream)
+            self._write(b'\nendstream')
+        self._write(b'\nendobj\n')
+
+    def add_object(self, body, stream=None):
+        obj_id = self.reserve()
+        self.write_object(obj_id, body, stream)
+        return obj_id
+
+    def add_stream(self, data, extra=b''):
+        if self.compress:
+            data = zlib.compress(data)
+            extra += b' /Filter /FlateDecode'
+        return self.add_object(b'<< /Length %d%s >>' % (len(data), extra), data)
+
+    def add_jpeg(self, data):
+        """XObject image (JPEG inclus tel quel) ; renvoie (identifiant, largeur, hauteur)"""
+        width, height, components = jpeg_info(data)
+        color_space = {1: 'DeviceGray', 4: 'DeviceCMYK'}.get(components, 'DeviceRGB')
+        body = (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace /{color_space} /BitsPerComponent 8 /Filter /DCTDecode "
+                f"/Length {len(data)} >>").encode()
+        return self.add_object(body, data), width, height
+
+    def add_page(self, content, images=None):
+        content_id = self.add_stream(content)
+        fonts = ' '.join(f"/{name} {obj_id} 0 R" for name, obj_id in self.font_ids.items())
+        xobjects = ' '.join(f"/{name} {obj_id} 0 R" for name, obj_id in (images or {}).items())
+        resources = f"<< /Font << {fonts} >>" + (f" /XObject << {xobjects} >>" if xobjects else '') + " >>"
+        page_id = self.add_object((
+            f"<< /Type /Page /Parent {self.PAGES_ID} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources {resources} /Contents {content_id} 0 R >>"
+        ).encode())
+        self.page_ids.append(page_id)
+
+    def close(self, title=''):
+        kids = ' '.join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.write_object(self.PAGES_ID, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>".encode())
+        self.write_object(self.CATALOG_ID, f"<< /Type /Catalog /Pages {self.PAGES_ID} 0 R >>".encode())
+        info_id = self.add_object(
+            b'<< /Title ' + pdf_text_string(title) + b' /Producer (BUMIDOM archives) /CreationDate ' +
+            pdf_string(datetime.now().strftime("D:%Y%m%d%H%M%S")) + b' >>'
+        )
+        xref_position = self._position
+        self._write(f"xref\n0 {self._next_id}\n0000000000 65535 f \n".encode())
+        for obj_id in range(1, self._next_id):
+            self._write(f"{self.offsets[obj_id]:010d} 00000 n \n".encode())
+        self._write((f"trailer\n<< /Size {self._next_id} /Root {self.CATALOG_ID} 0 R /Info {info_id} 0 R >>\n"
+                     f"startxref\n{xref_position}\n%%EOF\n").encode())
+
+
+# ============================================================================
+# MISE EN PAGE
+# ============================================================================
+
+class PdfReport:
+    """Titres, paragraphes, tableaux et graphiques ; une seule page en mémoire à la fois"""
+
+    def __init__(self, handle, title, compress=True):
+        self.writer = PdfWriter(handle, compress)
+        self.title = title
+        self.content = []
+        self.images = {}
+        self.n_images = 0
+        self.y = None
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+
+    @property
+    def width(self):
+        return PAGE_WIDTH - 2 * MARGIN
+
+    def _new_page(self):
+        self.content = []
+        self.images = {}
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def _finish_page(self):
+        if self.y is None:
+            return
+        number = len(self.writer.page_ids) + 1
+        self._text(MARGIN, MARGIN - FOOTER_HEIGHT, fit_text(self.title, self.width - 60, 8), 8)
+        label = f"Page {number}"
+        self._text(PAGE_WIDTH - MARGIN - text_width(label, 8), MARGIN - FOOTER_HEIGHT, label, 8)
+        self.writer.add_page(b'\n'.join(self.content), self.images)
+        self.content = []
+        self.images = {}
+        self.y = None
+
+    def _ensure(self, height):
+        """Saut de page si la hauteur demandée ne tient plus ; renvoie vrai après un saut"""
+        if self.y is not None and self.y - height >= MARGIN:
+            return False
+        self._finish_page()
+        self._new_page()
+        return True
+
+    def page_break(self):
+        self._finish_page()
+
+    # ------------------------------------------------------------------
+    # Primitives
+    # ------------------------------------------------------------------
+
+    def _text(self, x, y, text, size, bold=False, gray=0.0):
+        font = FONTS[bold][0]
+        self.content.append(
+            f"BT {_number(gray)} g /{font} {_number(size)} Tf {_number(x)} {_number(y)} Td ".encode()
+            + pdf_string(text) + b' Tj ET'
+        )
+
+    def _rect(self, x, y, width, height, gray):
+        self.content.append(f"{_number(gray)} g {_number(x)} {_number(y)} {_number(width)} {_number(height)} re f".encode())
+
+    def _line(self, x1, y1, x2, y2, gray=0.6, width=0.5):
+        self.content.append(
+            f"{_number(gray)} G {_number(width)} w {_number(x1)} {_number(y1)} m {_number(x2)} {_number(y2)} l S".encode()
+        )
+
+    # ------------------------------------------------------------------
+    # Blocs
+    # ------------------------------------------------------------------
+
+    def heading(self, text, level=1):
+        size = {1: 16, 2: 13}.get(level, 11)
+        self._ensure(size * 3)
+        self.y -= size * 1.6
+        for line in wrap_text(text, self.width, size, True):
+            self._text(MARGIN, self.y, line, size, True)
+            self.y -= size * 1.3
+        self.y -= size * 0.2
+
+    def paragraph(self, text, size=10, bold=False, bullet=False):
+        indent = 12 if bullet else 0
+        lines = wrap_text(text, self.width - indent, size, bold)
+        for i, line in enumerate(lines):
+            self._ensure(size * 1.4)
+            self.y -= size * 1.4
+            if bullet and i == 0:
+                self._text(MARGIN, self.y, '•', size)
+            self._text(MARGIN + indent, self.y, line, size, bold)
+        self.y -= size * 0.4
+
+    def spacer(self, height=8):
+        if self.y is not None:
+            self.y -= height
+
+    def table(self, columns, rows, widths=None, size=8, progress=None):
+        """Tableau lu au fil de l'eau depuis l'itérable rows ; renvoie le nombre de lignes écrites
+
+        widths : part de la largeur de chaque colonne (égales par défaut).
+        progress(n) est appelé toutes les DEFAULT_CHUNK_ROWS lignes.
+        """
+        widths = widths or [1] * len(columns)
+        total = sum(widths)
+        widths = [self.width * width / total for width in widths]
+        row_height = size * 1.6
+
+        def header():
+            self._rect(MARGIN, self.y - row_height, self.width, row_height, 0.88)
+            x = MARGIN
+            for column, width in zip(columns, widths):
+                self._text(x + 2, self.y - row_height + size * 0.5, fit_text(str(column), width - 4, size, True),
+                           size, True)
+                x += width
+            self.y -= row_height
+
+        self._ensure(row_height * 3)
+        header()
+        n_rows = 0
+        for row in rows:
+            if self._ensure(row_height):
+                header()
+            x = MARGIN
+            for value, width in zip(row, widths):
+                text = '' if value is None else str(value)
+                self._text(x + 2, self.y - row_height + size * 0.5, fit_text(text, width - 4, size), size)
+                x += width
+            self._line(MARGIN, self.y - row_height, MARGIN + self.width, self.y - row_height, 0.85, 0.3)
+            self.y -= row_height
+            n_rows += 1
+            if progress is not None and n_rows % DEFAULT_CHUNK_ROWS == 0:
+                progress(n_rows)
+        self.y -= size
+        return n_rows
+
+    def image(self, jpeg, max_height=300):
+        """Image JPEG à la largeur de la page (hauteur bornée), proportions conservées"""
+        self._ensure(60)
+        obj_id, width_px, height_px = self.writer.add_jpeg(jpeg)
+        scale = min(self.width / width_px, max_height / height_px)
+        width, height = width_px * scale, height_px * scale
+        self._ensure(height + 10)
+        self.n_images += 1
+        name = f"Im{self.n_images}"
+        self.images[name] = obj_id
+        self.y -= height
+        self.content.append(
+            f"q {_number(width)} 0 0 {_number(height)} {_number(MARGIN)} {_number(self.y)} cm /{name} Do Q".encode()
+        )
+        self.y -= 10
+
+    def bar_chart(self, title, labels, values, horizontal=True, max_bars=25, size=8):
+        """Diagramme en barres vectoriel (plus grandes valeurs d'abord si horizontal)"""
+        if horizontal:
+            order = sorted(range(len(values)), key=lambda i: -values[i])[:max_bars]
+        else:
+            order = list(range(len(values)))
+        labels = [labels[i] for i in order]
+        values = [float(values[i]) for i in order]
+        peak = max(values) if values and max(values) > 0 else 1.0
+
+        if title:
+            self._ensure(size * 4)
+            self.paragraph(title, size + 2, bold=True)
+        if horizontal:
+            label_width = min(self.width * 0.35, max(text_width(label, size) for label in labels) + 6) if labels else 0
+            bar_space = self.width - label_width - 40
+            for label, value in zip(labels, values):
+                self._ensure(size * 1.8)
+                self.y -= size * 1.8
+                self._text(MARGIN, self.y + size * 0.3, fit_text(label, label_width - 6, size), size)
+                self._rect(MARGIN + label_width, self.y, bar_space * value / peak, size * 1.3, 0.45)
+                self._text(MARGIN + label_width + bar_space * value / peak + 4, self.y + size * 0.3,
+                           _number(value), size)
+        else:
+            height = 160
+            self._ensure(height + size * 3)
+            base = self.y - height
+            step = self.width / max(len(values), 1)
+            # Libellés espacés pour ne pas se chevaucher
+            every = max(1, int(np.ceil(max((text_width(label, size) for label in labels), default=0) / step)))
+            for i, (label, value) in enumerate(zip(labels, values)):
+                x = MARGIN + i * step
+                self._rect(x + step * 0.1, base, step * 0.8, (height - size) * value / peak, 0.45)
+                if i % every == 0:
+                    self._text(x, base - size * 1.3, fit_text(label, step * every, size), size)
+            self._line(MARGIN, base, MARGIN + self.width, base)
+            self.y = base - size * 2
+        self.y -= size
+
+    def figure(self, figure):
+        """Graphique d'une figure du cache : JPEG via kaleido, sinon barres vectorielles"""
+        jpeg = figure_jpeg(figure)
+        if jpeg is not None:
+            self.image(jpeg)
+            return True
+        bars = figure_bars(figure)
+        if bars is not None:
+            self.bar_chart(*bars)
+            return True
+        return False
+
+    def text_block(self, text):
+        """Texte du rapport (titres soulignés de « --- » ou « === », lignes **en gras**, puces « - »)"""
+        lines = [line.strip() for line in textwrap.dedent(text).splitlines()]
+        paragraph = []
+
+        def flush():
+            if paragraph:
+                self.paragraph(' '.join(paragraph))
+                paragraph.clear()
+
+        for i, line in enumerate(lines):
+            following = lines[i + 1] if i + 1 < len(lines) else ''
+            if TITLE_UNDERLINE_RE.match(line):
+                continue
+            if TITLE_UNDERLINE_RE.match(following):
+                flush()
+                self.heading(line, 1 if following.startswith('=') else 2)
+            elif not line:
+                flush()
+            elif BOLD_LINE_RE.match(line):
+                flush()
+                self.paragraph(BOLD_LINE_RE.match(line).group(1), bold=True)
+            elif line.startswith('- ') or re.match(r"^\d+\. ", line):
+                flush()
+                self.paragraph(re.sub(r"^(- |\d+\. )", '', line).replace('**', ''), bullet=True)
+            else:
+                paragraph.append(line.replace('**', ''))
+        flush()
+
+    def close(self):
+        if self.y is None:
+            self._new_page()
+        self._finish_page()
+        self.writer.close(self.title)
+
+
+# ============================================================================
+# RAPPORT COMPLET ET TÂCHE DE FOND
+# ============================================================================
+
+REFERENCE_COLUMNS = [
+    ('source_name', 'Source', 2),
+    ('doc_type', 'Type', 1),
+    ('date', 'Date', 1),
+    ('title', 'Titre', 5),
+    ('id', 'Identifiant', 1.5),
+]
+
+
+def reference_rows(catalog, rows, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Lignes (source, type, date, titre, identifiant) lues par lots de chunk_rows"""
+    columns = [catalog.columns.get(field) for field, _, _ in REFERENCE_COLUMNS]
+    for start in range(0, len(rows), chunk_rows):
+        for row in rows[start:start + chunk_rows]:
+            yield tuple(column[row] if column is not None else None for column in columns)
+
+
+def write_report(path, title, text, figures=(), catalog=None, rows=None, progress=None):
+    """Écrit le rapport dans path (par un fichier temporaire renommé à la fin)
+
+    progress(fraction, message) est appelé au fil de la génération.
+    """
+    progress = progress or (lambda fraction, message: None)
+    n_references = 0 if rows is None else len(rows)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as handle:
+        report = PdfReport(handle, title)
+        progress(0.02, "Texte du rapport")
+        report.text_block(text)
+
+        for i, figure in enumerate(figures):
+            progress(0.05 + 0.15 * i / len(figures), f"Graphique {i + 1} / {len(figures)}")
+            report.figure(figure)
+
+        if n_references:
+            report.heading(f"Références ({n_references})", 2)
+            report.table(
+                [label for _, label, _ in REFERENCE_COLUMNS],
+                reference_rows(catalog, rows),
+                [width for _, _, width in REFERENCE_COLUMNS],
+                progress=lambda done: progress(0.2 + 0.78 * done / n_references,
+                                               f"Références : {done} / {n_references}")
+            )
+        report.close()
+    os.replace(tmp_path, path)
+    progress(1.0, f"{len(report.writer.page_ids)} pages")
+    return len(report.writer.page_ids)
+
+
+class ReportJob:
+    """Génération du rapport dans un thread, avec avancement lisible depuis l'interface"""
+
+    def __init__(self, path, title, text, figures=(), catalog=None, rows=None):
+        self.path = path
+        self.progress = 0.0
+        self.message = "En attente"
+        self.error = None
+        self.pages = 0
+        self.done = False
+        self._thread = threading.Thread(
+            target=self._run, args=(path, title, text, list(figures), catalog, rows), daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _update(self, fraction, message):
+        self.progress = fraction
+        self.message = message
+
+    def _run(self, *args):
+        try:
+            self.pages = write_report(*args, progress=self._update)
+        except Exception as error:  # remonté à l'interface plutôt que perdu dans le thread
+            self.error = f"{type(error).__name__} : {error}"
+        finally:
+            self.done = True
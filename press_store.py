@@ -0,0 +1,334 @@
+"""
+Magasin colonnaire des articles de presse (RetroNews et ajouts manuels) et
+agrégats de couverture par journal et par période.
+
+Chaque article est une ligne de tableaux typés : date en datetime64, journal
+et sentiment en codes de dictionnaire, page et longueur en entiers (-1 si
+inconnues), thèmes en listes aplaties (offsets + codes). Les codes sont ceux
+des dictionnaires du catalogue compact ; comme ces dictionnaires ne font que
+s'allonger quand des notices sont ajoutées, le magasin s'étend sans
+réencoder les articles déjà présents.
+
+Les agrégats (volume, part des articles en une, longueur moyenne, répartition
+des thèmes) sont calculés par journal × période en quelques bincount :
+
+    store = PressStore.from_catalog(catalog)
+    coverage = store.coverage('year')
+    coverage.table()          # une ligne par (période, journal)
+    coverage.theme_mix(top=8) # part de chaque thème par période
+"""
+
+import numpy as np
+import pandas as pd
+
+from text_arena import category_codes, gather_lists
+
+PERIODS = {
+    'decade': 'Décennie',
+    'year': 'Année',
+    'month': 'Mois',
+}
+
+# Regroupement des thèmes peu fréquents
+OTHER_THEMES = 'Autres thèmes'
+
+UNKNOWN_NEWSPAPER = 'Journal inconnu'
+
+
+def _integers(values):
+    """Premier nombre de chaque valeur (« 12 », « p. 3 »), -1 si aucun"""
+    numbers = pd.Series(values, dtype=object).astype(str).str.extract(r"(\d+)", expand=False)
+    return pd.to_numeric(numbers, errors='coerce').fillna(-1).to_numpy(dtype=np.int32)
+
+
+class PressStore:
+    """Articles de presse en colonnes typées ; rows = lignes du catalogue"""
+
+    def __init__(self, rows, dates, newspapers, newspaper_values, sentiments, sentiment_values,
+                 pages, lengths, theme_offsets, theme_codes, theme_values):
+        self.rows = rows
+        self.dates = dates
+        self.newspapers = newspapers
+        self.newspaper_values = newspaper_values
+        self.sentiments = sentiments
+        self.sentiment_values = sentiment_values
+        self.pages = pages
+        self.lengths = lengths
+        self.theme_offsets = theme_offsets
+        self.theme_codes = theme_codes
+        self.theme_values = theme_values
+
+    @classmethod
+    def from_catalog(cls, catalog, rows=None):
+        """Articles du catalogue (parmi les lignes rows, toutes par défaut)"""
+        rows = np.arange(len(catalog), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        doc_types = catalog.columns['doc_type']
+        if 'article' not in doc_types.values:
+            rows = rows[:0]
+        else:
+            rows = rows[doc_types.codes[rows] == doc_types.values.index('article')]
+
+        newspapers, newspaper_values = category_codes(catalog, 'newspaper', rows)
+        sentiments, sentiment_values = category_codes(catalog, 'sentiment', rows)
+
+        date_column = catalog.columns.get('date')
+        dates = pd.to_datetime(
+            pd.Series([date_column[row] for row in rows] if date_column is not None else [None] * len(rows),
+                      dtype=object),
+            errors='coerce', format='mixed'
+        ).to_numpy().astype('datetime64[D]')
+
+        page_column = catalog.columns.get('page')
+        pages = _integers([page_column[row] for row in rows]) if page_column is not None else \
+            np.full(len(rows), -1, dtype=np.int32)
+
+        length_column = catalog.columns.get('length')
+        if length_column is not None:
+            lengths = np.where(length_column.present[rows], length_column.values[rows], -1).astype(np.int32)
+        else:
+            lengths = np.full(len(rows), -1, dtype=np.int32)
+
+        theme_column = catalog.columns.get('themes')
+        if theme_column is not None:
+            theme_offsets, theme_codes = gather_lists(theme_column.offsets, theme_column.codes, rows)
+            theme_values = list(theme_column.values)
+        else:
+            theme_offsets, theme_codes, theme_values = np.zeros(len(rows) + 1, dtype=np.int64), \
+                np.zeros(0, dtype=np.int32), []
+
+        return cls(rows, dates, newspapers, newspaper_values, sentiments, sentiment_values,
+                   pages, lengths, theme_offsets, theme_codes, theme_values)
+
+    def extend(self, catalog, rows):
+        """Nouveau magasin avec les articles des lignes ajoutées au catalogue"""
+        added = PressStore.from_catalog(catalog, rows)
+        # Dictionnaires du nouveau catalogue : ceux de l'ancien en sont des préfixes
+        return PressStore(
+            np.concatenate([self.rows, added.rows]),
+            np.concatenate([self.dates, added.dates]),
+            np.concatenate([self.newspapers, added.newspapers]),
+            added.newspaper_values,
+            np.concatenate([self.sentiments, added.sentiments]),
+            added.sentiment_values,
+            np.concatenate([self.pages, added.pages]),
+            np.concatenate([self.lengths, added.lengths]),
+            np.concatenate([self.theme_offsets, added.theme_offsets[1:] + self.theme_offsets[-1]]),
+            np.concatenate([self.theme_codes, added.theme_codes]),
+            added.theme_values
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, mask):
+        """Sous-ensemble des articles (masque booléen sur les articles)"""
+        kept = np.flatnonzero(mask)
+        theme_offsets, theme_codes = gather_lists(self.theme_offsets, self.theme_codes, kept)
+        return PressStore(
+            self.rows[kept], self.dates[kept], self.newspapers[kept], self.newspaper_values,
+            self.sentiments[kept], self.sentiment_values, self.pages[kept], self.lengths[kept],
+            theme_offsets, theme_codes, self.theme_values
+        )
+
+    def newspaper_labels(self):
+        return np.array(self.newspaper_values + [UNKNOWN_NEWSPAPER], dtype=object)[self.newspapers]
+
+    def sentiment_labels(self):
+        return np.array(self.sentiment_values + [None], dtype=object)[self.sentiments]
+
+    def _periods(self, resolution):
+        """Indice de période de chaque article daté (-1 sinon) et libellés des périodes"""
+        dated = ~np.isnat(self.dates)
+        keys = np.full(len(self), -1, dtype=np.int64)
+        if not dated.any():
+            return keys, []
+        years = self.dates[dated].astype('datetime64[Y]').astype(np.int64) + 1970
+        if resolution == 'month':
+            keys[dated] = self.dates[dated].astype('datetime64[M]').astype(np.int64)
+        elif resolution == 'decade':
+            keys[dated] = years // 10
+        else:
+            keys[dated] = years
+        first, last = keys[dated].min(), keys[dated].max()
+        axis = np.arange(first, last + 1)
+        if resolution == 'month':
+            labels = [str(month) for month in axis.astype('datetime64[M]')]
+        elif resolution == 'decade':
+            labels = [f"{decade * 10}s" for decade in axis]
+        else:
+            labels = [str(year) for year in axis]
+        keys[dated] -= first
+        return keys, labels
+
+    def coverage(self, resolution='year'):
+        """Agrégats par journal × période (articles datés seulement)"""
+        periods, labels = self._periods(resolution)
+        newspapers = list(self.newspaper_values) + [UNKNOWN_NEWSPAPER]
+        n_groups, n_periods, n_themes = len(newspapers), len(labels), len(self.theme_values)
+        shape = (n_groups, n_periods)
+        size = n_groups * n_periods
+
+        dated = periods >= 0
+        groups = np.where(self.newspapers >= 0, self.newspapers, n_groups - 1)
+        cells = groups[dated] * n_periods + periods[dated]
+
+        def tally(weights=None):
+            values = None if weights is None else weights[dated]
+            return np.bincount(cells, weights=values, minlength=size).reshape(shape)
+
+        known_page = self.pages >= 0
+        known_length = self.lengths >= 0
+        # Thèmes : case (journal, période) de l'article répétée pour chacun de ses thèmes ;
+        # seuls les triplets (journal, période, thème) présents sont comptés
+        article_cells = np.full(len(self), -1, dtype=np.int64)
+        article_cells[dated] = cells
+        theme_articles = np.repeat(article_cells, np.diff(self.theme_offsets))
+        keep = theme_articles >= 0
+        theme_keys, theme_counts = np.unique(
+            theme_articles[keep] * n_themes + self.theme_codes[keep], return_counts=True
+        )
+        theme_cells = np.zeros((len(theme_keys), 3), dtype=np.int64)
+        if len(theme_keys):
+            article_cells, theme_cells[:, 2] = np.divmod(theme_keys, n_themes)
+            theme_cells[:, 0], theme_cells[:, 1] = np.divmod(article_cells, n_periods)
+
+        return PressCoverage(
+            labels, newspapers, list(self.theme_values),
+            articles=tally().astype(np.int64),
+            front_page=tally((self.pages == 1).astype(np.float64)),
+            known_pages=tally(known_page.astype(np.float64)),
+            length_sum=tally(np.where(known_length, self.lengths, 0).astype(np.float64)),
+            known_lengths=tally(known_length.astype(np.float64)),
+            theme_cells=theme_cells,
+            theme_counts=theme_counts.astype(np.int64)
+        )
+
+
+class PressCoverage:
+    """Tableaux (journal, période) et mentions de thèmes de la couverture presse
+
+    Les mentions sont creuses : theme_cells porte une ligne (journal, période,
+    thème) par case non vide, theme_counts le nombre de mentions de la case.
+    """
+
+    def __init__(self, periods, newspapers, themes, articles, front_page, known_pages,
+                 length_sum, known_lengths, theme_cells, theme_counts):
+        self.periods = periods
+        self.newspapers = newspapers
+        self.themes = themes
+        self.articles = articles
+        self.front_page = front_page
+        self.known_pages = known_pages
+        self.length_sum = length_sum
+        self.known_lengths = known_lengths
+        self.theme_cells = theme_cells
+        self.theme_counts = theme_counts
+
+    def _newspaper_index(self, newspapers):
+        if not newspapers:
+            return np.arange(len(self.newspapers))
+        return np.array([self.newspapers.index(name) for name in newspapers if name in self.newspapers],
+                        dtype=np.int64)
+
+    def _theme_mentions(self, index):
+        """(position du journal dans index, période, thème, mentions) des cases des journaux retenus"""
+        position = np.full(len(self.newspapers), -1, dtype=np.int64)
+        position[index] = np.arange(len(index))
+        groups = position[self.theme_cells[:, 0]]
+        keep = groups >= 0
+        return groups[keep], self.theme_cells[keep, 1], self.theme_cells[keep, 2], self.theme_counts[keep]
+
+    def _theme_matrix(self, rows, n_rows, themes, mentions):
+        """Matrice dense (ligne, thème) des mentions, rows × thèmes"""
+        n_themes = len(self.themes)
+        return np.bincount(rows * n_themes + themes, weights=mentions,
+                           minlength=n_rows * n_themes).astype(np.int64).reshape(n_rows, n_themes)
+
+    @staticmethod
+    def _share(numerator, denominator):
+        return np.divide(numerator, denominator, out=np.full(np.shape(numerator), np.nan),
+                         where=np.asarray(denominator) > 0)
+
+    def table(self, newspapers=None):
+        """Une ligne par (période, journal) ayant des articles"""
+        index = self._newspaper_index(newspapers)
+        groups, periods = np.nonzero(self.articles[index])
+        groups = index[groups]
+        return pd.DataFrame({
+            'période': np.array(self.periods, dtype=object)[periods],
+            'journal': np.array(self.newspapers, dtype=object)[groups],
+            'articles': self.articles[groups, periods],
+            'part_une': self._share(self.front_page[groups, periods], self.known_pages[groups, periods]),
+            'longueur_moyenne': self._share(self.length_sum[groups, periods], self.known_lengths[groups, periods]),
+        }).sort_values(['période', 'journal'], ignore_index=True)
+
+    def totals(self, newspapers=None):
+        """Articles, journaux, part en une et longueur moyenne sur toutes les périodes"""
+        index = self._newspaper_index(newspapers)
+        articles = self.articles[index].sum(axis=1)
+        return {
+            'articles': int(articles.sum()),
+            'journaux': int((articles > 0).sum()),
+            'part_une': float(self._share(self.front_page[index].sum(), self.known_pages[index].sum())),
+            'longueur_moyenne': float(self._share(self.length_sum[index].sum(), self.known_lengths[index].sum())),
+        }
+
+    def by_newspaper(self, newspapers=None):
+        """Totaux par journal sur toutes les périodes"""
+        index = self._newspaper_index(newspapers)
+        articles = self.articles[index].sum(axis=1)
+        groups, _, themes, mentions = self._theme_mentions(index)
+        theme_totals = self._theme_matrix(groups, len(index), themes, mentions)
+        top_themes = [
+            ', '.join(self.themes[k] for k in np.argsort(-counts, kind='stable')[:3] if counts[k] > 0)
+            for counts in theme_totals
+        ]
+        frame = pd.DataFrame({
+            'journal': np.array(self.newspapers, dtype=object)[index],
+            'articles': articles,
+            'part_une': self._share(self.front_page[index].sum(axis=1), self.known_pages[index].sum(axis=1)),
+            'longueur_moyenne': self._share(self.length_sum[index].sum(axis=1),
+                                            self.known_lengths[index].sum(axis=1)),
+            'thèmes_principaux': top_themes,
+        })
+        return frame[frame['articles'] > 0].sort_values('articles', ascending=False, ignore_index=True)
+
+    def _top_themes(self, counts, top):
+        order = np.argsort(-counts, kind='stable')
+        return [k for k in order[:top] if counts[k] > 0]
+
+    def theme_mix(self, newspapers=None, top=8):
+        """Part de chaque thème dans les mentions de thèmes de chaque période"""
+        index = self._newspaper_index(newspapers)
+        _, periods, themes, mentions = self._theme_mentions(index)
+        kept = self._top_themes(np.bincount(themes, weights=mentions, minlength=len(self.themes)), top)
+        # Colonnes : thèmes retenus, puis tous les autres regroupés
+        columns = np.full(len(self.themes), len(kept), dtype=np.int64)
+        columns[kept] = np.arange(len(kept))
+        width = len(kept) + 1
+        matrix = np.bincount(periods * width + columns[themes], weights=mentions,
+                             minlength=len(self.periods) * width).astype(np.int64).reshape(-1, width)
+        labels = [self.themes[k] for k in kept] + [OTHER_THEMES]
+        totals = matrix.sum(axis=1, keepdims=True)
+        periods, themes = np.nonzero(matrix)
+        return pd.DataFrame({
+            'période': np.array(self.periods, dtype=object)[periods],
+            'thème': np.array(labels, dtype=object)[themes],
+            'mentions': matrix[periods, themes],
+            'part': (matrix / np.maximum(totals, 1))[periods, themes],
+        })
+
+    def theme_profile(self, newspapers=None, top=12):
+        """Journal × thème : part de chaque thème dans les mentions du journal, toutes périodes"""
+        index = self._newspaper_index(newspapers)
+        groups, _, themes, mentions = self._theme_mentions(index)
+        counts = self._theme_matrix(groups, len(index), themes, mentions)  # (journal, thème)
+        kept = self._top_themes(counts.sum(axis=0), top)
+        totals = counts.sum(axis=1, keepdims=True)
+        shares = counts[:, kept] / np.maximum(totals, 1)
+        present = totals[:, 0] > 0
+        return pd.DataFrame(
+            shares[present],
+            index=np.array(self.newspapers, dtype=object)[index][present],
+            columns=[self.themes[k] for k in kept]
+        )
@@ -0,0 +1,220 @@
+"""
+Séries temporelles du sentiment de la presse, par journal et pour
+l'ensemble du corpus : moyenne par période (année ou mois), lissage par
+moyenne mobile ou moyenne exponentielle, et bandes de confiance bootstrap.
+
+Les articles sont agrégés en sommes et effectifs par (journal, période) avec
+un seul bincount ; les deux lissages sont pondérés par le nombre d'articles
+(une période vide n'entraîne pas la courbe vers zéro). Le bootstrap tire
+les répliques par lots de tableaux numpy (rééchantillonnage stratifié : le
+nombre d'articles de chaque journal est conservé) et applique le même
+lissage à toutes les répliques à la fois.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Valeur numérique des étiquettes de sentiment
+SENTIMENT_SCORES = {
+    'positif': 1.0,
+    'neutre': 0.0,
+    'négatif': -1.0,
+}
+
+RESOLUTIONS = {
+    'year': 'Année',
+    'month': 'Mois',
+}
+
+SMOOTHING_METHODS = {
+    'rolling': 'Moyenne mobile',
+    'ewma': 'Moyenne exponentielle',
+}
+
+# Libellé de la série de l'ensemble des journaux
+OVERALL = 'Ensemble'
+
+DEFAULT_BOOTSTRAP = 400
+
+# Répliques tirées par lot (borne la mémoire des tirages : lot × articles)
+BOOTSTRAP_BATCH = 100
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.full(numerator.shape, np.nan), where=denominator > 0)
+
+
+def _window_sum(values, window):
+    """Somme sur les window dernières périodes, le long du dernier axe"""
+    cumulative = np.cumsum(values, axis=-1)
+    shifted = np.zeros_like(cumulative)
+    shifted[..., window:] = cumulative[..., :-window]
+    return cumulative - shifted
+
+
+def rolling_mean(sums, counts, window):
+    """Moyenne glissante (fenêtre de window périodes) pondérée par les effectifs"""
+    return _ratio(_window_sum(sums, window), _window_sum(counts, window))
+
+
+def ewma(sums, counts, span):
+    """Moyenne exponentielle (alpha = 2 / (span + 1)) pondérée par les effectifs"""
+    decay = 1 - 2 / (span + 1)
+    numerator = np.empty(sums.shape)
+    denominator = np.empty(counts.shape)
+    numerator_acc = np.zeros(sums.shape[:-1])
+    denominator_acc = np.zeros(counts.shape[:-1])
+    # Boucle sur les périodes seulement : journaux et répliques sont traités ensemble
+    for t in range(sums.shape[-1]):
+        numerator_acc = numerator_acc * decay + sums[..., t]
+        denominator_acc = denominator_acc * decay + counts[..., t]
+        numerator[..., t] = numerator_acc
+        denominator[..., t] = denominator_acc
+    return _ratio(numerator, denominator)
+
+
+def percentile_band(replicates, level):
+    """Bornes (basse, haute) de l'intervalle de niveau level, le long du premier axe
+
+    Les répliques indéfinies (NaN : période sans article) sont ignorées. Un seul
+    tri pour toutes les cases, puis interpolation linéaire comme np.percentile.
+    """
+    ordered = np.sort(replicates, axis=0)  # NaN en fin de tri
+    valid = (~np.isnan(replicates)).sum(axis=0)
+    tail = (1 - level) / 2
+    bounds = []
+    for quantile in (tail, 1 - tail):
+        position = quantile * np.maximum(valid - 1, 0)
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, np.maximum(valid - 1, 0))
+        low_values = np.take_along_axis(ordered, below[None], axis=0)[0]
+        high_values = np.take_along_axis(ordered, above[None], axis=0)[0]
+        bound = low_values + (high_values - low_values) * (position - below)
+        bound[valid == 0] = np.nan
+        bounds.append(bound)
+    return bounds
+
+
+SMOOTHERS = {
+    'rolling': rolling_mean,
+    'ewma': ewma,
+}
+
+
+class SentimentSeries:
+    """Articles (date, score, journal), rangés par journal"""
+
+    def __init__(self, dates, scores, groups, labels):
+        order = np.argsort(groups, kind='stable')
+        self.dates = np.asarray(dates, dtype='datetime64[D]')[order]
+        self.scores = np.asarray(scores, dtype=np.float64)[order]
+        self.groups = np.asarray(groups, dtype=np.int64)[order]
+        self.labels = list(labels)
+        # Bloc de chaque journal dans l'ordre trié (pour le rééchantillonnage stratifié)
+        self.sizes = np.bincount(self.groups, minlength=len(self.labels))
+        self.starts = np.concatenate([[0], np.cumsum(self.sizes)[:-1]]).astype(np.int64)
+
+    @classmethod
+    def from_values(cls, dates, sentiments, newspapers):
+        """Construit la série depuis des dates, étiquettes de sentiment et noms de journaux
+
+        Les articles sans date ou dont le sentiment n'est pas reconnu sont écartés.
+        """
+        dates = pd.to_datetime(pd.Series(dates, dtype=object), errors='coerce', format='mixed')
+        scores = pd.Series(sentiments, dtype=object).map(SENTIMENT_SCORES)
+        keep = (dates.notna() & scores.notna()).to_numpy()
+        groups, labels = pd.factorize(pd.Series(newspapers, dtype=object)[keep].fillna('Inconnu'), sort=True)
+        return cls(dates[keep].to_numpy().astype('datetime64[D]'), scores[keep].to_numpy(), groups, labels)
+
+    def __len__(self):
+        return len(self.scores)
+
+    def _bins(self, resolution):
+        """Indice de période de chaque article et début de chaque période"""
+        unit = {'year': 'Y', 'month': 'M'}[resolution]
+        periods = self.dates.astype(f'datetime64[{unit}]')
+        first = periods.min()
+        axis = np.arange(first, periods.max() + 1)
+        return (periods - first).astype(np.int64), axis
+
+    def _sums(self, bins, n_bins, articles=None, replicates=1):
+        """Sommes et effectifs par (réplique, journal + ensemble, période)"""
+        n_groups = len(self.labels)
+        if articles is None:
+            articles = np.arange(len(self))[None, :]
+        replicate_ids = np.arange(replicates)[:, None]
+        cells = ((replicate_ids * n_groups + self.groups[articles]) * n_bins + bins[articles]).ravel()
+        size = replicates * n_groups * n_bins
+        shape = (replicates, n_groups, n_bins)
+        sums = np.bincount(cells, weights=self.scores[articles].ravel(), minlength=size).reshape(shape)
+        counts = np.bincount(cells, minlength=size).reshape(shape).astype(np.float64)
+        # Dernière ligne : tous journaux confondus
+        return (np.concatenate([sums, sums.sum(axis=1, keepdims=True)], axis=1),
+                np.concatenate([counts, counts.sum(axis=1, keepdims=True)], axis=1))
+
+    def _bootstrap(self, bins, n_bins, statistic, n_boot, seed):
+        """Statistique appliquée à n_boot répliques, tirées par lots"""
+        rng = np.random.default_rng(seed)
+        starts = self.starts[self.groups]
+        sizes = self.sizes[self.groups]
+        results = []
+        for batch in range(0, n_boot, BOOTSTRAP_BATCH):
+            replicates = min(BOOTSTRAP_BATCH, n_boot - batch)
+            # Chaque article est remplacé par un article tiré au hasard dans le même journal
+            draws = starts + (rng.random((replicates, len(self))) * sizes).astype(np.int64)
+            results.append(statistic(*self._sums(bins, n_bins, draws, replicates)))
+        return np.concatenate(results)
+
+    def trend(self, resolution='year', method='rolling', window=3, n_boot=DEFAULT_BOOTSTRAP, level=0.95, seed=0):
+        """Série lissée par journal et pour l'ensemble, avec bande de confiance bootstrap
+
+        Colonnes : period, newspaper, articles, mean (moyenne brute de la
+        période), smoothed, low, high.
+        """
+        columns = ['period', 'newspaper', 'articles', 'mean', 'smoothed', 'low', 'high']
+        if not len(self):
+            return pd.DataFrame(columns=columns)
+        smoother = SMOOTHERS[method]
+        bins, axis = self._bins(resolution)
+        sums, counts = self._sums(bins, len(axis))
+        smoothed = smoother(sums[0], counts[0], window)
+
+        if n_boot:
+            replicates = self._bootstrap(bins, len(axis), lambda s, c: smoother(s, c, window), n_boot, seed)
+            low, high = percentile_band(replicates, level)
+        else:
+            low = high = np.full(smoothed.shape, np.nan)
+
+        labels = np.array(self.labels + [OVERALL], dtype=object)
+        groups, periods = np.nonzero(~np.isnan(smoothed))
+        return pd.DataFrame({
+            'period': axis[periods].astype('datetime64[ns]'),
+            'newspaper': labels[groups],
+            'articles': counts[0][groups, periods].astype(np.int64),
+            'mean': _ratio(sums[0], counts[0])[groups, periods],
+            'smoothed': smoothed[groups, periods],
+            'low': low[groups, periods],
+            'high': high[groups, periods],
+        }, columns=columns)
+
+    def summary(self, n_boot=DEFAULT_BOOTSTRAP, level=0.95, seed=0):
+        """Sentiment moyen et nombre d'articles par journal, avec intervalle bootstrap de la moyenne"""
+        columns = ['newspaper', 'sentiment_moyen', 'nombre_articles', 'ic_bas', 'ic_haut']
+        if not len(self):
+            return pd.DataFrame(columns=columns)
+        # Une seule période : la moyenne de toute la série
+        bins = np.zeros(len(self), dtype=np.int64)
+        sums, counts = self._sums(bins, 1)
+        means = _ratio(sums[0, :-1, 0], counts[0, :-1, 0])
+        if n_boot:
+            replicates = self._bootstrap(bins, 1, lambda s, c: _ratio(s[:, :-1, 0], c[:, :-1, 0]), n_boot, seed)
+            low, high = percentile_band(replicates, level)
+        else:
+            low = high = np.full(means.shape, np.nan)
+        return pd.DataFrame({
+            'newspaper': self.labels,
+            'sentiment_moyen': means.round(3),
+            'nombre_articles': self.sizes,
+            'ic_bas': low.round(3),
+            'ic_haut': high.round(3),
+        }, columns=columns)
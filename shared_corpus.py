@@ -0,0 +1,325 @@
+"""
+Corpus partagé par toutes les sessions d'un même processus serveur.
+
+Les notices, le catalogue compact, les index et les agrégats coûteux sont
+détenus une seule fois, dans des instantanés en lecture seule. Chaque
+exécution du script épingle l'instantané courant et le lit sans le copier ;
+l'état propre à une session se réduit aux filtres et aux curseurs.
+
+Les notices ne sont conservées que dans le catalogue compact : le
+dictionnaire des archives qui sert à le construire est libéré ensuite, et
+snapshot.archives en est une vue en lecture seule (mêmes accès, notices
+décodées à la lecture).
+
+Une modification produit un nouvel instantané : le catalogue compact est
+prolongé sans être ré-encodé, et les données dérivées qui savent intégrer
+un delta reprennent la valeur de l'instantané précédent (voir
+dependency_graph). Les sessions en cours terminent leur exécution sur
+l'ancien instantané, qui est libéré (avec ses données dérivées) quand plus
+personne ne le référence.
+
+Avec un journal (append_log.AppendLog), les notices ajoutées sont écrites
+sur disque avant d'être publiées, dans l'ordre des séquences du journal,
+et rejouées au démarrage du serveur dans ce même ordre.
+"""
+
+import threading
+import uuid
+from collections.abc import Mapping, Sequence
+from types import MappingProxyType
+
+import numpy as np
+
+from text_arena import DOC_COLLECTIONS, CompactCatalog, RecordView, archive_record
+
+# Collection de chaque type de notice saisi manuellement
+COLLECTIONS = {
+    'document': 'documents',
+    'article': 'articles',
+    'vidéo': 'videos',
+    'données': 'datasets',
+}
+
+# Source créée pour les notices saisies sans source existante
+MANUAL_SOURCE_ID = 'ajouts_manuels'
+MANUAL_SOURCE = {
+    'name': 'Ajouts manuels',
+    'color': '#6B7280',
+    'icon': '✍️',
+}
+
+# Champs lus par les pages pour chaque collection, avec leur valeur par défaut
+DEFAULT_FIELDS = {
+    'documents': {'description': ''},
+    'articles': {'newspaper': '', 'extract': '', 'sentiment': 'neutre', 'url': ''},
+    'videos': {'description': '', 'duration': '', 'format': '', 'url': ''},
+    'datasets': {'description': '', 'period': ''},
+}
+
+_MISSING = object()
+
+
+def freeze(value):
+    """Copie en lecture seule (dictionnaires → MappingProxyType, listes → tuples)"""
+    if isinstance(value, MappingProxyType):
+        # Déjà figé : partagé tel quel entre instantanés
+        return value
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def source_metadata(archives):
+    """Métadonnées de chaque source (nom, couleur, icône...), sans les collections de notices"""
+    return {
+        source_id: {key: value for key, value in source_data.items() if key not in DOC_COLLECTIONS}
+        for source_id, source_data in archives.items()
+    }
+
+
+# ============================================================================
+# VUE DES ARCHIVES SUR LE CATALOGUE
+# ============================================================================
+
+class RecordRows(Sequence):
+    """Notices d'une collection : lignes du catalogue, lues comme des vues à l'accès"""
+
+    __slots__ = ('_catalog', '_rows')
+
+    def __init__(self, catalog, rows):
+        self._catalog = catalog
+        self._rows = rows
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return RecordRows(self._catalog, self._rows[i])
+        return RecordView(self._catalog, int(self._rows[i]))
+
+
+class SourceView(Mapping):
+    """Source des archives : ses métadonnées et ses collections non vides"""
+
+    __slots__ = ('_metadata', '_collections')
+
+    def __init__(self, metadata, collections):
+        self._metadata = metadata
+        self._collections = collections
+
+    def __getitem__(self, key):
+        if key in self._collections:
+            return self._collections[key]
+        return self._metadata[key]
+
+    def __iter__(self):
+        yield from self._metadata
+        yield from self._collections
+
+    def __len__(self):
+        return len(self._metadata) + len(self._collections)
+
+
+class ArchivesView(Mapping):
+    """Archives en lecture seule (source → métadonnées et collections), lues dans le catalogue
+
+    Mêmes accès que le dictionnaire des archives, sans en garder les notices :
+    chaque collection est la liste de ses lignes du catalogue.
+    """
+
+    def __init__(self, sources, catalog):
+        self._sources = sources
+        self._catalog = catalog
+        self._views = None
+
+    def _build(self):
+        catalog = self._catalog
+        groups = {}
+        if len(catalog):
+            source_ids, doc_types = catalog.columns['source_id'], catalog.columns['doc_type']
+            n_types = len(doc_types.values)
+            keys = source_ids.codes.astype(np.int64) * n_types + doc_types.codes
+            order = np.argsort(keys, kind='stable')
+            values, starts = np.unique(keys[order], return_index=True)
+            bounds = np.append(starts, len(order))
+            for key, start, stop in zip(values, bounds[:-1], bounds[1:]):
+                source_id = source_ids.values[key // n_types]
+                collection = doc_types.values[key % n_types] + 's'
+                groups.setdefault(source_id, {})[collection] = RecordRows(catalog, order[start:stop])
+        return {
+            source_id: SourceView(metadata, {
+                collection: groups[source_id][collection]
+                for collection in DOC_COLLECTIONS if collection in groups.get(source_id, {})
+            })
+            for source_id, metadata in self._sources.items()
+        }
+
+    @property
+    def views(self):
+        if self._views is None:
+            self._views = self._build()
+        return self._views
+
+    def __getitem__(self, source_id):
+        return self.views[source_id]
+
+    def __iter__(self):
+        return iter(self._sources)
+
+    def __len__(self):
+        return len(self._sources)
+
+
+# ============================================================================
+# INSTANTANÉS
+# ============================================================================
+
+class CorpusSnapshot:
+    """État figé du corpus et données dérivées calculées à la demande
+
+    Les notices ne sont conservées que dans le catalogue compact ; archives en
+    est une vue, et sources garde les seules métadonnées des sources.
+    """
+
+    def __init__(self, sources, catalog, generation=0, parent=None):
+        self.sources = freeze(sources)
+        self.catalog = catalog
+        self.archives = ArchivesView(self.sources, catalog)
+        self.version = self.catalog.version
+        self.generation = generation
+        self._derived = {}
+        # Clés dont la valeur sait intégrer un delta (seules transmises à l'instantané suivant)
+        self._incremental = set()
+        self._building = {}
+        self._lock = threading.Lock()
+        # Valeurs des instantanés précédents : clé → (valeur, nombre de notices couvertes)
+        self._inherited = parent._inheritance() if parent is not None else {}
+
+    @classmethod
+    def from_archives(cls, archives, generation=0):
+        """Instantané d'un dictionnaire d'archives (les notices ne sont pas conservées)"""
+        return cls(source_metadata(archives), CompactCatalog.from_archives(archives), generation)
+
+    def _inheritance(self):
+        """Valeurs transmises à l'instantané suivant (catalogue prolongé par ajout en fin)
+
+        Seules les valeurs incrémentales lues sur cet instantané sont transmises :
+        les valeurs reconstruites et les valeurs héritées non relues sont libérées.
+        """
+        with self._lock:
+            return {
+                key: (value, len(self.catalog))
+                for key, value in self._derived.items() if key in self._incremental
+            }
+
+    def derive(self, key, builder, update=None):
+        """Valeur dérivée de l'instantané, construite une seule fois pour toutes les sessions
+
+        Avec update, une valeur héritée d'un instantané précédent est mise à jour
+        avec les seules lignes ajoutées depuis : update(ancienne valeur, lignes).
+        """
+        value = self._derived.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._lock:
+            key_lock = self._building.setdefault(key, threading.Lock())
+        # Les sessions qui demandent la même valeur attendent la première construction
+        with key_lock:
+            value = self._derived.get(key, _MISSING)
+            if value is _MISSING:
+                inherited = self._inherited.get(key)
+                if update is not None and inherited is not None:
+                    old, covered = inherited
+                    value = update(old, range(covered, len(self.catalog)))
+                else:
+                    value = builder()
+                with self._lock:
+                    self._derived[key] = value
+                    if update is not None:
+                        self._incremental.add(key)
+                    self._inherited.pop(key, None)
+        return value
+
+
+def added_records(sources, source_id, collection, records):
+    """Notices du catalogue pour des ajouts à une collection ; (sources, notices)
+
+    Une source inconnue est créée avec les métadonnées des ajouts manuels.
+    """
+    source = sources.get(source_id)
+    if source is None:
+        source = MANUAL_SOURCE
+        sources = freeze({**sources, source_id: MANUAL_SOURCE})
+    defaults = DEFAULT_FIELDS.get(collection, {})
+    return sources, [archive_record(source_id, source, collection, dict(defaults, **record)) for record in records]
+
+
+class SharedCorpus:
+    """Référence vers l'instantané courant ; les écritures publient un nouvel instantané"""
+
+    def __init__(self, archives, log=None):
+        self._log = log
+        snapshot = CorpusSnapshot.from_archives(archives)
+        if log is not None and log.entries:
+            # Ajouts rejoués dans l'ordre des séquences, à la suite des notices de référence
+            sources, records = snapshot.sources, []
+            for entry in log.entries:
+                sources, added = added_records(sources, entry['source_id'], entry['collection'], [entry['record']])
+                records.extend(added)
+            snapshot = CorpusSnapshot(sources, snapshot.catalog.extend(records))
+        self._snapshot = snapshot
+        self._write_lock = threading.Lock()
+        # Entrées du journal déjà publiées (log.entries est dans l'ordre des séquences)
+        self._published = len(log.entries) if log is not None else 0
+
+    def snapshot(self):
+        return self._snapshot
+
+    def publish(self, archives):
+        """Remplace le corpus (tout le dérivé est recalculé)"""
+        with self._write_lock:
+            self._snapshot = CorpusSnapshot.from_archives(archives, self._snapshot.generation + 1)
+            return self._snapshot
+
+    def add_records(self, source_id, collection, records):
+        """Ajoute des notices à une collection d'une source (copie sur écriture)"""
+        records = list(records)
+        if self._log is None:
+            with self._write_lock:
+                return self._extend([(source_id, collection, records)])
+        # Durable avant d'être visible ; hors du verrou d'écriture pour grouper les fsync
+        self._log.append(source_id, collection, records)
+        with self._write_lock:
+            # Publication dans l'ordre du journal : toutes les entrées durables non encore
+            # publiées, y compris celles d'autres sessions du même lot
+            entries = self._log.entries[self._published:]
+            self._published += len(entries)
+            groups = []
+            for entry in entries:
+                key = (entry['source_id'], entry['collection'])
+                if groups and groups[-1][:2] == key:
+                    groups[-1][2].append(entry['record'])
+                else:
+                    groups.append((*key, [entry['record']]))
+            return self._extend(groups)
+
+    def _extend(self, groups):
+        # Appelé sous _write_lock ; groups : (source, collection, notices) dans l'ordre d'ajout
+        current = self._snapshot
+        if not groups:
+            return current
+        sources, added = current.sources, []
+        for source_id, collection, records in groups:
+            sources, records = added_records(sources, source_id, collection, records)
+            added.extend(records)
+        # Les nouvelles notices prolongent le catalogue : les lignes existantes ne bougent pas
+        catalog = current.catalog.extend(added)
+        self._snapshot = CorpusSnapshot(sources, catalog, current.generation + 1, parent=current)
+        return self._snapshot
+
+def new_record_id():
+    return f"MAN_{uuid.uuid4().hex[:8].upper()}"
@@ -0,0 +1,128 @@
+"""
+Comparaison N×N des sources (ou sous-collections) par leurs thèmes.
+
+Les thèmes (mots-clés, thèmes, sujets) sont codés en entiers une seule fois,
+puis chaque groupe est représenté par un bitset. Recouvrements de Jaccard,
+thèmes communs et thèmes exclusifs sont calculés pour toutes les paires en
+une seule opération vectorisée.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Champs de liste considérés comme des thèmes
+THEME_FIELDS = ('keywords', 'themes', 'topics')
+
+# Nombre de bits à 1 pour chaque octet
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+# Libellé d'une sous-collection : « source / type de document »
+GROUP_SEPARATOR = ' / '
+
+LEVELS = {
+    'source': 'Sources',
+    'collection': 'Sous-collections',
+}
+
+
+class ThemeMatrix:
+    """Bitsets de thèmes par groupe et matrices de recouvrement associées"""
+
+    def __init__(self, labels, themes, bits):
+        self.labels = labels
+        self.themes = themes
+        self.bits = bits
+        self._index = {label: i for i, label in enumerate(labels)}
+
+        n_themes = len(themes)
+        # Intersections de toutes les paires : ET bit à bit puis popcount
+        self.sizes = _POPCOUNT[bits].sum(axis=1).astype(np.int64)
+        self.shared = _POPCOUNT[bits[:, None, :] & bits[None, :, :]].sum(axis=2).astype(np.int64)
+        union = self.sizes[:, None] + self.sizes[None, :] - self.shared
+        self.jaccard = np.divide(self.shared, union, out=np.zeros(self.shared.shape), where=union > 0)
+        # exclusive[i, j] : thèmes de i absents de j
+        self.exclusive = self.sizes[:, None] - self.shared
+
+        # Thèmes présents dans un seul groupe
+        presence = np.unpackbits(bits, axis=1, count=n_themes).astype(bool) if n_themes else \
+            np.zeros((len(labels), 0), dtype=bool)
+        self.theme_group_counts = presence.sum(axis=0)
+        self.unique_counts = (presence & (self.theme_group_counts == 1)[None, :]).sum(axis=1)
+
+    @classmethod
+    def from_catalog(cls, catalog, level='source'):
+        """Construit les bitsets à partir du catalogue compact"""
+        group_codes, labels = _group_codes(catalog, level)
+
+        # Vocabulaire commun à tous les champs de thèmes
+        vocabulary = {}
+        rows = []
+        codes = []
+        for field in THEME_FIELDS:
+            column = catalog.columns.get(field)
+            if column is None:
+                continue
+            remap = np.array([vocabulary.setdefault(value, len(vocabulary)) for value in column.values],
+                             dtype=np.int64)
+            rows.append(column.row_ids())
+            codes.append(remap[column.codes] if len(column.codes) else column.codes.astype(np.int64))
+
+        themes = list(vocabulary)
+        presence = np.zeros((len(labels), len(themes)), dtype=bool)
+        if rows:
+            rows = np.concatenate(rows)
+            codes = np.concatenate(codes)
+            presence[group_codes[rows], codes] = True
+
+        return cls(labels, themes, np.packbits(presence, axis=1))
+
+    def index(self, label):
+        return self._index[label]
+
+    def pair_themes(self, label1, label2):
+        """Thèmes propres à chaque groupe et thèmes communs"""
+        a = self.bits[self.index(label1)]
+        b = self.bits[self.index(label2)]
+        n = len(self.themes)
+
+        def names(mask):
+            return [self.themes[i] for i in np.flatnonzero(np.unpackbits(mask, count=n))]
+
+        return names(a & ~b), names(a & b), names(b & ~a)
+
+    def matrix(self, metric):
+        """Matrice N×N sous forme de DataFrame ('jaccard', 'shared' ou 'exclusive')"""
+        values = {'jaccard': self.jaccard, 'shared': self.shared, 'exclusive': self.exclusive}[metric]
+        return pd.DataFrame(values, index=self.labels, columns=self.labels)
+
+    def summary(self):
+        """Nombre de thèmes et de thèmes exclusifs par groupe"""
+        return pd.DataFrame({
+            'groupe': self.labels,
+            'thèmes': self.sizes,
+            'thèmes exclusifs': self.unique_counts,
+        })
+
+
+def group_filters(label, level):
+    """Filtres du cube d'agrégats (source, type de document) désignant un groupe"""
+    if level == 'source':
+        return {'source': label}
+    source, doc_type = label.rsplit(GROUP_SEPARATOR, 1)
+    return {'source': source, 'doc_type': doc_type}
+
+
+def _group_codes(catalog, level):
+    """Code de groupe de chaque notice et libellés des groupes"""
+    sources = catalog.columns['source_name']
+    if level == 'source':
+        return sources.codes.astype(np.int64), list(sources.values)
+
+    doc_types = catalog.columns['doc_type']
+    pairs = sources.codes.astype(np.int64) * len(doc_types.values) + doc_types.codes
+    unique_pairs, group_codes = np.unique(pairs, return_inverse=True)
+    labels = [
+        f"{sources.values[p // len(doc_types.values)]}{GROUP_SEPARATOR}{doc_types.values[p % len(doc_types.values)]}"
+        for p in unique_pairs
+    ]
+    return group_codes, labels
@@ -0,0 +1,166 @@
+"""
+Matrice documents-termes creuse (format CSR) et vocabulaire caractéristique
+par groupe de documents (TF-IDF ou log-odds à a priori de Dirichlet).
+
+Toutes les agrégations se font sur les tableaux de la matrice, sans boucle
+Python par document ou par terme.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from text_normalization import analyze
+
+KEYNESS_METHODS = {
+    'tfidf': 'TF-IDF',
+    'logodds': 'Log-odds (a priori de Dirichlet)',
+}
+
+
+class DocumentTermMatrix:
+    """Matrice creuse documents × termes (indptr, indices, data)"""
+
+    def __init__(self, indptr, indices, data, vocabulary, display=None):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.vocabulary = vocabulary
+        # Forme affichée de chaque terme (racine → forme de surface la plus fréquente)
+        self.display = display if display is not None else vocabulary
+
+    @classmethod
+    def from_texts(cls, texts, analyzer=analyze):
+        """Construit la matrice à partir d'un itérable de textes"""
+        lookup = {}
+        surfaces = Counter()
+        term_ids = []
+        lengths = []
+        for text in texts:
+            tokens = analyzer(text or '')
+            surfaces.update(tokens)
+            term_ids.extend(lookup.setdefault(stem, len(lookup)) for stem, _ in tokens)
+            lengths.append(len(tokens))
+
+        display = [None] * len(lookup)
+        for (stem, surface), _ in surfaces.most_common():
+            if display[lookup[stem]] is None:
+                display[lookup[stem]] = surface
+
+        n_docs = len(lengths)
+        n_terms = len(lookup)
+        doc_ids = np.repeat(np.arange(n_docs, dtype=np.int64), lengths)
+        term_ids = np.asarray(term_ids, dtype=np.int64)
+
+        # Comptage des couples (document, terme) : clés triées = ordre CSR
+        keys, counts = np.unique(doc_ids * max(n_terms, 1) + term_ids, return_counts=True)
+        rows = keys // max(n_terms, 1)
+        indptr = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_docs), out=indptr[1:])
+
+        return cls(indptr, (keys % max(n_terms, 1)).astype(np.int32), counts.astype(np.int32),
+                   list(lookup), display)
+
+    def append_texts(self, texts, analyzer=analyze):
+        """Nouvelle matrice avec des documents ajoutés en fin (seuls les nouveaux textes sont analysés)
+
+        Les termes déjà connus gardent leur forme affichée ; les nouveaux prennent
+        la forme la plus fréquente dans les textes ajoutés.
+        """
+        delta = DocumentTermMatrix.from_texts(texts, analyzer)
+        if delta.shape[0] == 0:
+            return self
+
+        lookup = {stem: term for term, stem in enumerate(self.vocabulary)}
+        display = list(self.display)
+        remap = np.empty(delta.shape[1], dtype=np.int32)
+        for term, stem in enumerate(delta.vocabulary):
+            if stem not in lookup:
+                lookup[stem] = len(lookup)
+                display.append(delta.display[term])
+            remap[term] = lookup[stem]
+
+        # Remise des termes dans l'ordre croissant au sein de chaque ligne
+        rows = delta.row_ids()
+        indices = remap[delta.indices]
+        order = np.lexsort((indices, rows))
+        return DocumentTermMatrix(
+            np.concatenate([self.indptr, delta.indptr[1:] + self.indptr[-1]]),
+            np.concatenate([self.indices, indices[order]]),
+            np.concatenate([self.data, delta.data[order]]),
+            list(lookup), display
+        )
+
+    @property
+    def shape(self):
+        return len(self.indptr) - 1, len(self.vocabulary)
+
+    def term_totals(self, rows=None):
+        """Nombre d'occurrences de chaque terme dans le corpus (ou les lignes du masque rows)"""
+        if rows is None:
+            return np.bincount(self.indices, weights=self.data, minlength=self.shape[1]).astype(np.int64)
+        keep = np.asarray(rows, dtype=bool)[self.row_ids()]
+        return np.bincount(self.indices[keep], weights=self.data[keep], minlength=self.shape[1]).astype(np.int64)
+
+    def row_ids(self):
+        return np.repeat(np.arange(self.shape[0], dtype=np.int64), np.diff(self.indptr))
+
+    def group_counts(self, group_codes, n_groups):
+        """Comptes agrégés par groupe, au format COO (groupe, terme, compte) ; les lignes de groupe -1 sont ignorées"""
+        n_terms = max(self.shape[1], 1)
+        groups = np.asarray(group_codes, dtype=np.int64)[self.row_ids()]
+        keep = groups >= 0
+        keys = groups[keep] * n_terms + self.indices[keep]
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        counts = np.bincount(inverse, weights=self.data[keep]).astype(np.int64)
+        return unique_keys // n_terms, unique_keys % n_terms, counts
+
+
+def keyness(dtm, group_codes, n_groups, method='tfidf', prior=1.0):
+    """Score de spécificité de chaque terme présent dans chaque groupe"""
+    groups, terms, counts = dtm.group_counts(group_codes, n_groups)
+    n_terms = dtm.shape[1]
+    group_totals = np.bincount(groups, weights=counts, minlength=n_groups)
+    term_totals = np.bincount(terms, weights=counts, minlength=n_terms)
+
+    if method == 'tfidf':
+        # tf relatif au groupe, idf calculé sur les groupes (« documents » = sources)
+        group_df = np.bincount(terms, minlength=n_terms)
+        idf = np.log((1 + n_groups) / (1 + group_df)) + 1
+        scores = counts / group_totals[groups] * idf[terms]
+    elif method == 'logodds':
+        # Log-odds avec a priori de Dirichlet informatif (Monroe et al., 2008) :
+        # l'a priori est la distribution du corpus entier, pondérée par prior
+        alpha = prior * term_totals
+        alpha0 = alpha.sum()
+        a = alpha[terms]
+        rest_counts = term_totals[terms] - counts
+        rest_totals = term_totals.sum() - group_totals[groups]
+        delta = np.log((counts + a) / (group_totals[groups] + alpha0 - counts - a)) \
+            - np.log((rest_counts + a) / (rest_totals + alpha0 - rest_counts - a))
+        variance = 1 / (counts + a) + 1 / (rest_counts + a)
+        scores = delta / np.sqrt(variance)
+    else:
+        raise ValueError(f"Méthode inconnue : {method}")
+
+    return groups, terms, counts, scores
+
+
+def top_terms_by_group(dtm, group_codes, group_labels, method='tfidf', k=10):
+    """Les k termes les plus caractéristiques de chaque groupe"""
+    groups, terms, counts, scores = keyness(dtm, group_codes, len(group_labels), method)
+
+    # Tri par groupe puis score décroissant, puis rang dans le groupe
+    order = np.lexsort((-scores, groups))
+    groups, terms, counts, scores = groups[order], terms[order], counts[order], scores[order]
+    starts = np.searchsorted(groups, np.arange(len(group_labels)))
+    rank = np.arange(len(groups)) - starts[groups]
+    keep = rank < k
+
+    return pd.DataFrame({
+        'source': [group_labels[g] for g in groups[keep]],
+        'mot': [dtm.display[t] for t in terms[keep]],
+        'fréquence': counts[keep],
+        'score': scores[keep].round(4),
+    })
@@ -0,0 +1,541 @@
+"""
+Stockage compact du catalogue : les champs texte de tous les documents sont
+rangés dans une arène UTF-8 (buffers d'octets et tables d'offsets, par
+morceaux partagés entre catalogues successifs), décodée seulement à l'accès. Les valeurs répétées (sources,
+types, statuts, mots-clés, thèmes...) sont encodées par dictionnaire.
+"""
+
+import hashlib
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow est fourni avec streamlit
+    pa = None
+
+# ============================================================================
+# SCHÉMA DES CHAMPS
+# ============================================================================
+
+# Collections de documents présentes dans les sources
+DOC_COLLECTIONS = ['documents', 'articles', 'videos', 'datasets', 'websites']
+
+# Champs à faible cardinalité, encodés par dictionnaire
+CATEGORY_FIELDS = {
+    'source_id', 'source_name', 'source_color', 'source_icon', 'doc_type',
+    'type', 'status', 'newspaper', 'sentiment', 'format', 'location',
+    'author', 'publisher', 'language'
+}
+
+# Listes de valeurs répétées (un dictionnaire partagé par champ)
+LIST_FIELDS = {'keywords', 'themes', 'topics', 'variables'}
+
+# Champs numériques (valeurs non entières lues comme absentes)
+INTEGER_FIELDS = {'pages', 'length', 'snapshots'}
+
+# Tous les autres champs sont du texte, y compris ceux d'apparence numérique
+# (« page » : « 12 », « p. 3 »), quelle que soit la valeur de la première notice
+
+
+def _field_kind(name):
+    """Mode de stockage d'un champ, fixé par son nom"""
+    if name in CATEGORY_FIELDS:
+        return 'category'
+    if name in LIST_FIELDS:
+        return 'list'
+    if name in INTEGER_FIELDS:
+        return 'integer'
+    return 'text'
+
+
+def _integer(value):
+    """Valeur entière (entier, flottant entier ou chiffres), None sinon"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, (float, np.floating)):
+        return int(value) if float(value).is_integer() else None
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+# ============================================================================
+# COLONNES
+# ============================================================================
+
+class StringArena:
+    """Chaînes UTF-8 : morceaux (buffer d'octets + offsets), décodage paresseux
+
+    concat partage les morceaux existants au lieu de les recopier ; le
+    dernier morceau est fusionné avec le précédent tant qu'il en atteint la
+    moitié (comme un compteur binaire). Une suite d'ajouts recopie donc
+    chaque octet O(log n) fois et garde O(log n) morceaux. data, offsets et
+    present rendent la vue contiguë, calculée une fois par colonne.
+    """
+
+    def __init__(self, data, offsets, present=None):
+        present = present if present is not None else np.ones(len(offsets) - 1, dtype=bool)
+        self._set_chunks([(data, offsets, present)])
+
+    def _set_chunks(self, chunks):
+        # Morceaux et bornes de lignes dans un seul attribut : un lecteur ne voit jamais l'un sans l'autre
+        bounds = np.zeros(len(chunks) + 1, dtype=np.int64)
+        np.cumsum([len(offsets) - 1 for _, offsets, _ in chunks], out=bounds[1:])
+        self._layout = (tuple(chunks), bounds)
+
+    @classmethod
+    def from_strings(cls, strings):
+        chunks = []
+        lengths = []
+        present = []
+        for value in strings:
+            if value is None:
+                present.append(False)
+                lengths.append(0)
+            else:
+                encoded = str(value).encode('utf-8')
+                chunks.append(encoded)
+                present.append(True)
+                lengths.append(len(encoded))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(b''.join(chunks), offsets, np.array(present, dtype=bool))
+
+    @classmethod
+    def empty(cls, n):
+        return cls(b'', np.zeros(n + 1, dtype=np.int64), np.zeros(n, dtype=bool))
+
+    def concat(self, other):
+        """Colonne self suivie de other (morceaux partagés, ni recopiés ni ré-encodés)"""
+        chunks = list(self._layout[0])
+        for chunk in other._layout[0]:
+            chunks.append(chunk)
+            while len(chunks) > 1 and 2 * (len(chunks[-1][1]) - 1) >= len(chunks[-2][1]) - 1:
+                chunks[-2:] = [_join_chunks(chunks[-2:])]
+        arena = StringArena.__new__(StringArena)
+        arena._set_chunks(chunks)
+        return arena
+
+    def _contiguous(self):
+        chunks, _ = self._layout
+        if len(chunks) > 1:
+            # Les morceaux sont remplacés par leur concaténation : calculée une seule fois
+            self._set_chunks([_join_chunks(chunks)])
+        return self._layout[0][0]
+
+    @property
+    def data(self):
+        return self._contiguous()[0]
+
+    @property
+    def offsets(self):
+        return self._contiguous()[1]
+
+    @property
+    def present(self):
+        return self._contiguous()[2]
+
+    def __len__(self):
+        return int(self._layout[1][-1])
+
+    def _locate(self, i):
+        chunks, bounds = self._layout
+        if i < 0:
+            i += int(bounds[-1])
+        if len(chunks) == 1:
+            return chunks[0], i
+        c = int(np.searchsorted(bounds, i, side='right')) - 1
+        return chunks[c], i - int(bounds[c])
+
+    def is_present(self, i):
+        (_, _, present), i = self._locate(i)
+        return bool(present[i])
+
+    def __getitem__(self, i):
+        (data, offsets, present), i = self._locate(i)
+        if not present[i]:
+            return None
+        return data[offsets[i]:offsets[i + 1]].decode('utf-8')
+
+    def to_pandas(self):
+        """Série pandas ; sans copie des octets lorsque pyarrow est disponible"""
+        if pa is not None:
+            data, offsets, present = self._contiguous()
+            validity = pa.array(present).buffers()[1]
+            array = pa.LargeStringArray.from_buffers(
+                len(self), pa.py_buffer(offsets), pa.py_buffer(data), validity
+            )
+            return pd.Series(pd.arrays.ArrowExtensionArray(array))
+        return pd.Series([self[i] for i in range(len(self))], dtype=object)
+
+    @property
+    def nbytes(self):
+        return sum(len(data) + offsets.nbytes + present.nbytes for data, offsets, present in self._layout[0])
+
+
+def _join_chunks(chunks):
+    """Un morceau (data, offsets, present) équivalent à la suite de morceaux donnée"""
+    shifts = np.cumsum([0] + [len(data) for data, _, _ in chunks[:-1]])
+    return (
+        b''.join(bytes(data) for data, _, _ in chunks),
+        np.concatenate([chunks[0][1][:1]] + [offsets[1:] + shift for (_, offsets, _), shift in zip(chunks, shifts)]),
+        np.concatenate([present for _, _, present in chunks]),
+    )
+
+
+class DictionaryColumn:
+    """Valeurs encodées par dictionnaire (code -1 = valeur absente)"""
+
+    def __init__(self, codes, values):
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_values(cls, values):
+        lookup = {}
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            codes[i] = -1 if value is None else lookup.setdefault(value, len(lookup))
+        return cls(codes, list(lookup))
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.full(n, -1, dtype=np.int32), [])
+
+    def concat(self, other):
+        """Colonne self suivie de other, avec fusion des dictionnaires"""
+        values, remap = _merge_dictionaries(self.values, other.values)
+        # Le code -1 (absent) désigne le dernier élément : -1 lui aussi
+        codes = np.append(remap, -1)[other.codes].astype(np.int32)
+        return DictionaryColumn(np.concatenate([self.codes, codes]), values)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, i):
+        code = self.codes[i]
+        return None if code < 0 else self.values[code]
+
+    def to_pandas(self):
+        return pd.Series(pd.Categorical.from_codes(self.codes, categories=pd.Index(self.values, dtype=object)))
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + sum(len(str(v).encode('utf-8')) for v in self.values)
+
+
+class ListColumn:
+    """Listes de valeurs encodées par dictionnaire (offsets + codes aplatis)"""
+
+    def __init__(self, offsets, codes, values, present):
+        self.offsets = offsets
+        self.codes = codes
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_lists(cls, lists):
+        lookup = {}
+        flat = []
+        lengths = []
+        present = []
+        for items in lists:
+            present.append(items is not None)
+            items = items or []
+            flat.extend(lookup.setdefault(item, len(lookup)) for item in items)
+            lengths.append(len(items))
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(offsets, np.array(flat, dtype=np.int32), list(lookup), np.array(present, dtype=bool))
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros(n + 1, dtype=np.int64), np.zeros(0, dtype=np.int32), [], np.zeros(n, dtype=bool))
+
+    def concat(self, other):
+        """Colonne self suivie de other, avec fusion des dictionnaires"""
+        values, remap = _merge_dictionaries(self.values, other.values)
+        return ListColumn(
+            np.concatenate([self.offsets, other.offsets[1:] + self.offsets[-1]]),
+            np.concatenate([self.codes, remap[other.codes].astype(np.int32)]),
+            values,
+            np.concatenate([self.present, other.present])
+        )
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if not self.present[i]:
+            return None
+        return [self.values[c] for c in self.codes[self.offsets[i]:self.offsets[i + 1]]]
+
+    def row_ids(self):
+        """Indice de ligne de chaque élément aplati"""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    def to_pandas(self):
+        return pd.Series([self[i] for i in range(len(self))], dtype=object)
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.codes.nbytes + self.present.nbytes + \
+            sum(len(str(v).encode('utf-8')) for v in self.values)
+
+
+class IntegerColumn:
+    """Entiers avec masque de présence"""
+
+    def __init__(self, values, present):
+        self.values = values
+        self.present = present
+
+    @classmethod
+    def from_values(cls, values):
+        values = [_integer(v) for v in values]
+        present = np.array([v is not None for v in values], dtype=bool)
+        data = np.array([v if v is not None else 0 for v in values], dtype=np.int64)
+        return cls(data, present)
+
+    @classmethod
+    def empty(cls, n):
+        return cls(np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool))
+
+    def concat(self, other):
+        return IntegerColumn(np.concatenate([self.values, other.values]),
+                             np.concatenate([self.present, other.present]))
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, i):
+        return int(self.values[i]) if self.present[i] else None
+
+    def to_pandas(self):
+        return pd.Series(pd.arrays.IntegerArray(self.values, ~self.present))
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes + self.present.nbytes
+
+
+def _merge_dictionaries(values, other_values):
+    """Dictionnaire fusionné et nouveaux codes des valeurs de other_values"""
+    lookup = {value: code for code, value in enumerate(values)}
+    remap = np.array([lookup.setdefault(value, len(lookup)) for value in other_values], dtype=np.int32)
+    return list(lookup), remap
+
+
+_COLUMN_BUILDERS = {
+    'text': StringArena.from_strings,
+    'category': DictionaryColumn.from_values,
+    'list': ListColumn.from_lists,
+    'integer': IntegerColumn.from_values,
+}
+
+_COLUMN_TYPES = {
+    'text': StringArena,
+    'category': DictionaryColumn,
+    'list': ListColumn,
+    'integer': IntegerColumn,
+}
+
+
+def _column_kind(column):
+    return next(kind for kind, column_type in _COLUMN_TYPES.items() if isinstance(column, column_type))
+
+
+def category_codes(catalog, field, rows):
+    """Codes (-1 = absent) et valeurs d'un champ catégoriel pour les lignes rows"""
+    column = catalog.columns.get(field)
+    if column is None:
+        return np.full(len(rows), -1, dtype=np.int32), []
+    return column.codes[rows].astype(np.int32), list(column.values)
+
+
+def gather_lists(offsets, codes, rows):
+    """Offsets et codes aplatis des listes des lignes rows"""
+    starts = offsets[rows]
+    lengths = offsets[rows + 1] - starts
+    new_offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return new_offsets, codes[positions].astype(np.int32)
+
+
+# ============================================================================
+# CATALOGUE COMPACT
+# ============================================================================
+
+class RecordView(Mapping):
+    """Vue d'une notice : chaque champ n'est décodé qu'à l'accès"""
+
+    __slots__ = ('_catalog', '_row')
+
+    def __init__(self, catalog, row):
+        self._catalog = catalog
+        self._row = row
+
+    def __getitem__(self, field):
+        column = self._catalog.columns.get(field)
+        if column is None:
+            raise KeyError(field)
+        value = column[self._row]
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self):
+        for field in self._catalog.fields:
+            if self._catalog.has_value(field, self._row):
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def copy(self):
+        return dict(self)
+
+
+class CompactCatalog:
+    """Catalogue de toutes les sources, stocké en colonnes compactes"""
+
+    def __init__(self, columns, fields):
+        self.columns = columns
+        self.fields = fields
+        self.n_records = len(next(iter(columns.values()))) if columns else 0
+        self._version = None
+
+    @classmethod
+    def from_records(cls, records):
+        """Construit le catalogue à partir de notices (dictionnaires)"""
+        fields = []
+        kinds = {}
+        for record in records:
+            for name in record:
+                if name not in kinds:
+                    fields.append(name)
+                    kinds[name] = _field_kind(name)
+        columns = {
+            name: _COLUMN_BUILDERS[kinds[name]]([record.get(name) for record in records])
+            for name in fields
+        }
+        return cls(columns, fields)
+
+    @classmethod
+    def from_archives(cls, archives):
+        """Construit le catalogue à partir d'un dictionnaire d'archives (archives_data.seed_archives)"""
+        return cls.from_records(list(iter_archive_records(archives)))
+
+    def extend(self, records):
+        """Nouveau catalogue avec les notices ajoutées à la fin (sans ré-encoder l'existant)
+
+        La version est chaînée : empreinte de la version précédente et des seules
+        notices ajoutées.
+        """
+        records = list(records)
+        if not records:
+            return self
+
+        fields = list(self.fields)
+        kinds = {name: _column_kind(column) for name, column in self.columns.items()}
+        for record in records:
+            for name in record:
+                if name not in kinds:
+                    fields.append(name)
+                    kinds[name] = _field_kind(name)
+
+        added = {
+            name: _COLUMN_BUILDERS[kinds[name]]([record.get(name) for record in records])
+            for name in fields
+        }
+        columns = {}
+        for name in fields:
+            column = self.columns.get(name)
+            if column is None:
+                column = _COLUMN_TYPES[kinds[name]].empty(self.n_records)
+            columns[name] = column.concat(added[name])
+
+        catalog = CompactCatalog(columns, fields)
+        delta_version = CompactCatalog(added, fields).version
+        catalog._version = hashlib.blake2b(
+            f"{self.version}:{delta_version}".encode('utf-8'), digest_size=12
+        ).hexdigest()
+        return catalog
+
+    def __len__(self):
+        return self.n_records
+
+    def has_value(self, field, row):
+        column = self.columns[field]
+        if isinstance(column, DictionaryColumn):
+            return column.codes[row] >= 0
+        if isinstance(column, StringArena):
+            return column.is_present(row)
+        return bool(column.present[row])
+
+    def record(self, row):
+        return RecordView(self, row)
+
+    def __iter__(self):
+        for row in range(self.n_records):
+            yield RecordView(self, row)
+
+    def to_dataframe(self, columns=None):
+        """DataFrame du catalogue (catégories pour les champs répétés)"""
+        names = self.fields if columns is None else [c for c in columns if c in self.columns]
+        return pd.DataFrame({name: self.columns[name].to_pandas() for name in names})
+
+    @property
+    def nbytes(self):
+        return sum(column.nbytes for column in self.columns.values())
+
+    @property
+    def version(self):
+        """Empreinte du contenu, utilisée comme version du catalogue"""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=12)
+            for name in self.fields:
+                column = self.columns[name]
+                digest.update(name.encode('utf-8'))
+                if isinstance(column, StringArena):
+                    digest.update(column.data)
+                    digest.update(column.offsets.tobytes())
+                    digest.update(column.present.tobytes())
+                elif isinstance(column, DictionaryColumn):
+                    digest.update(column.codes.tobytes())
+                    digest.update('\x1f'.join(map(str, column.values)).encode('utf-8'))
+                elif isinstance(column, ListColumn):
+                    digest.update(column.offsets.tobytes())
+                    digest.update(column.codes.tobytes())
+                    digest.update(column.present.tobytes())
+                    digest.update('\x1f'.join(map(str, column.values)).encode('utf-8'))
+                else:
+                    digest.update(column.values.tobytes())
+                    digest.update(column.present.tobytes())
+            self._version = digest.hexdigest()
+        return self._version
+
+
+def iter_archive_records(archives):
+    """Parcourt toutes les notices des sources, enrichies des champs de source"""
+    for source_id, source_data in archives.items():
+        for doc_type in DOC_COLLECTIONS:
+            for doc in source_data.get(doc_type, []):
+                yield archive_record(source_id, source_data, doc_type, doc)
+
+
+def archive_record(source_id, source_data, doc_type, doc):
+    """Notice enrichie des champs de sa source et de son type"""
+    record = dict(doc)
+    record['source_id'] = source_id
+    record['source_name'] = source_data['name']
+    record['source_color'] = source_data['color']
+    record['source_icon'] = source_data['icon']
+    record['doc_type'] = doc_type[:-1]  # Remove 's'
+    return record
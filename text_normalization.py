@@ -0,0 +1,170 @@
+"""
+Chaîne de normalisation du français partagée par la recherche et les analyses :
+séparation des élisions (l', d', qu'...), minuscules, suppression des accents,
+stopwords et racinisation légère (pluriels et féminins).
+
+Les flux de tokens sont mis en cache par empreinte du texte : un document
+n'est re-tokenisé que si son contenu change.
+"""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+# Mots courts de moins de MIN_TOKEN_LENGTH caractères ignorés par les analyses
+MIN_TOKEN_LENGTH = 3
+
+# Taille du cache des flux de tokens (nombre de textes distincts)
+TOKEN_CACHE_SIZE = 50_000
+
+# Version de la chaîne d'analyse, enregistrée avec les index sur disque :
+# à incrémenter dès que les racines produites changent (1 : mots sans racinisation)
+ANALYZER_VERSION = 2
+
+WORD_RE = re.compile(r"\w+(?:['’]\w+)*")
+
+# Finales en -s qui ne marquent pas le pluriel (antillais, corpus...)
+INVARIANT_ENDINGS = ('ais', 'ois', 'ss', 'us')
+
+ELISIONS = ('l', 'd', 'j', 'm', 'n', 's', 't', 'c', 'qu', 'jusqu', 'lorsqu', 'puisqu', 'quoiqu')
+ELISION_RE = re.compile(r"^(%s)['’]" % '|'.join(ELISIONS))
+
+# Stopwords français (sous forme sans accents, comparés après normalisation)
+STOPWORDS = frozenset("""
+a ai aie aient aies ait alors as au aucun aucune aupres auquel aura aurai auraient aurais
+aurait auras aurez auriez aurions aurons auront aussi autre autres aux auxquelles auxquels
+avaient avais avait avant avec avez aviez avions avoir avons ayant ayez ayons
+c ca car ce ceci cela celle celles celui cependant certain certaine certaines certains ces
+cet cette ceux chacun chacune chaque chez ci comme comment contre d dans de depuis des
+desquelles desquels dessous dessus donc dont du duquel durant elle elles en encore entre
+es est et etaient etais etait etant ete etes etiez etions etre eu eue eues eumes eurent
+eus eusse eussent eusses eussiez eussions eut eutes eux faire fait font furent fus fusse
+fussent fusses fussiez fussions fut fumes futes hors ici il ils j je jusqu jusque l la
+laquelle le lequel les lesquelles lesquels leur leurs lorsque lui m ma mais me meme memes
+mes moi mon n ne ni nos notre nous on ont ou par parce pas pendant peu peut plus plupart
+pour pourquoi puis puisque qu quand que quel quelle quelles quels qui quoi s sa sans se
+sera serai seraient serais serait seras serez seriez serions serons seront ses si sien
+sienne siennes siens soi soient sois soit sommes son sont sous soyez soyons suis sur t ta
+tandis te tel telle telles tels tes toi ton tous tout toute toutes tres tu un une unes
+uns vers voici voila vos votre vous y
+""".split())
+
+
+def fold_accents(text):
+    """Supprime les accents et ligatures (é → e, œ → oe)"""
+    text = text.replace('œ', 'oe').replace('æ', 'ae').replace('Œ', 'OE').replace('Æ', 'AE')
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def light_stem(word):
+    """Racinisation légère : pluriels et féminins (journaux → journal, migrantes → migrant)"""
+    if len(word) > 5 and word.endswith('aux') and not word.endswith('eaux'):
+        return word[:-3] + 'al'
+    if len(word) > 3 and word[-1] in 'sx' and not word.endswith(INVARIANT_ENDINGS):
+        word = word[:-1]
+    if len(word) > 5 and word.endswith('e'):
+        word = word[:-1]
+    return word
+
+
+def iter_words(text):
+    """Mots du texte avec leur position (élisions séparées) : (mot, début, fin)"""
+    for match in WORD_RE.finditer(text):
+        word = match.group()
+        start = match.start()
+        elision = ELISION_RE.match(word.lower())
+        if elision:
+            prefix_length = elision.end()
+            yield word[:prefix_length - 1], start, start + prefix_length - 1
+            word = word[prefix_length:]
+            start += prefix_length
+        # Apostrophes restantes (aujourd'hui, prud'homme...) : un seul mot
+        yield word, start, start + len(word)
+
+
+def normalize_word(word):
+    """Forme normalisée d'un mot (minuscules, sans accents, racinisé)"""
+    return light_stem(fold_accents(word.lower()).replace('’', "'"))
+
+
+def is_indexable(surface, stem):
+    return fold_accents(surface.lower()) not in STOPWORDS and len(stem) >= MIN_TOKEN_LENGTH
+
+
+def analyze_spans(text):
+    """Tokens indexables avec forme de surface et position : (racine, surface, début, fin)"""
+    tokens = []
+    for word, start, end in iter_words(text):
+        stem = normalize_word(word)
+        if is_indexable(word, stem):
+            tokens.append((stem, word.lower(), start, end))
+    return tokens
+
+
+class _TokenCache:
+    """Cache LRU des flux de tokens, indexé par empreinte du texte"""
+
+    def __init__(self, max_size=TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, text):
+        key = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+        with self._lock:
+            tokens = self._entries.get(key)
+            if tokens is not None:
+                self._entries.move_to_end(key)
+                return tokens
+
+        tokens = tuple((stem, surface) for stem, surface, _, _ in analyze_spans(text))
+
+        with self._lock:
+            self._entries[key] = tokens
+            if len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return tokens
+
+
+_cache = _TokenCache()
+
+
+def analyze(text):
+    """Couples (racine, surface) des mots indexables d'un texte (mis en cache)"""
+    if not text:
+        return ()
+    return _cache.get(text)
+
+
+def tokenize(text):
+    """Racines des mots indexables d'un texte"""
+    return [stem for stem, _ in analyze(text)]
+
+
+def display_forms(pairs):
+    """Forme de surface la plus fréquente de chaque racine"""
+    counts = Counter(pairs)
+    forms = {}
+    for (stem, surface), _ in counts.most_common():
+        forms.setdefault(stem, surface)
+    return forms
+
+
+def contains_phrase(stems, phrase):
+    """Vrai si la suite de racines phrase apparaît (contiguë) dans stems"""
+    if not phrase:
+        return True
+    n = len(phrase)
+    first = phrase[0]
+    for i, stem in enumerate(stems):
+        if stem == first and tuple(stems[i:i + n]) == tuple(phrase):
+            return True
+    return False
+
+
+def matches_query(text, query):
+    """Vrai si le texte contient le terme (ou l'expression) de la requête"""
+    return contains_phrase(tokenize(text), tokenize(query))
@@ -0,0 +1,272 @@
+"""
+Magasin colonnaire des archives audiovisuelles (INA et ajouts manuels) :
+durées en secondes, index triés sur la date et la durée, et métrage cumulé
+par thème, par année ou par format.
+
+Chaque vidéo est une ligne de tableaux typés : date en datetime64, durée en
+secondes (int32, -1 si illisible), format en codes du dictionnaire du
+catalogue compact, thèmes en listes aplaties (offsets + codes). Les durées
+affichées (« 02:15 », « 1:05:30 », « 45 min », « 1h30 ») ne sont lues
+qu'une fois, quand la notice entre dans le magasin ; comme les
+dictionnaires du catalogue ne font que s'allonger, le magasin s'étend sans
+relire les vidéos déjà présentes.
+
+Deux permutations triées (par date, par durée) résolvent un intervalle en
+deux recherches dichotomiques ; les sommes par thème ou par année sont des
+bincount pondérés par la durée :
+
+    store = VideoStore.from_catalog(catalog)
+    mask = store.mask(min_seconds=120, max_seconds=600, start=1970, end=1979)
+    store.footage('theme', mask)     # métrage par thème
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from text_arena import category_codes, gather_lists
+
+# Regroupements possibles du métrage
+FOOTAGE_GROUPS = {
+    'theme': 'Thème',
+    'year': 'Année',
+    'format': 'Format',
+}
+
+UNKNOWN_FORMAT = 'Format inconnu'
+NO_THEME = 'Sans thème'
+
+UNITS_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(h|heures?|min|mn|minutes?|'|s|sec|secondes?|\")", re.IGNORECASE)
+UNIT_SECONDS = {'h': 3600, 'm': 60, "'": 60, 's': 1, '"': 1}
+
+
+def parse_duration(value):
+    """Durée en secondes d'une valeur affichée (« 02:15 », « 1:05:30 », « 1h30 », « 45 min »), -1 si illisible
+
+    Un nombre seul est compté en secondes ; « mm:ss » est lu en minutes et
+    secondes, « hh:mm:ss » en heures, minutes et secondes.
+    """
+    if value is None:
+        return -1
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value) if value >= 0 else -1
+    text = str(value).strip().lower()
+    if not text:
+        return -1
+    if re.fullmatch(r"\d+(:\d{1,2}){1,2}", text):
+        seconds = 0
+        for part in text.split(':'):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    if text.isdigit():
+        return int(text)
+    units = UNITS_RE.findall(text)
+    if units:
+        seconds = sum(float(number.replace(',', '.')) * UNIT_SECONDS[unit[0]] for number, unit in units)
+        # « 1h30 » : minutes sans unité après les heures
+        trailing = re.search(r"h\s*(\d+)$", text)
+        if trailing:
+            seconds += int(trailing.group(1)) * 60
+        return int(round(seconds))
+    return -1
+
+
+def format_duration(seconds):
+    """« 1:05:30 » ou « 02:15 » ; chaîne vide si la durée est inconnue"""
+    if seconds is None or seconds < 0:
+        return ''
+    hours, rest = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+class VideoStore:
+    """Vidéos en colonnes typées ; rows = lignes du catalogue"""
+
+    def __init__(self, rows, dates, durations, formats, format_values,
+                 theme_offsets, theme_codes, theme_values):
+        self.rows = rows
+        self.dates = dates
+        self.durations = durations
+        self.formats = formats
+        self.format_values = format_values
+        self.theme_offsets = theme_offsets
+        self.theme_codes = theme_codes
+        self.theme_values = theme_values
+        # Index triés (vidéos sans date ou sans durée en fin de permutation)
+        self.date_order = np.argsort(self.dates, kind='stable')
+        self.n_dated = int((~np.isnat(self.dates)).sum())
+        self.duration_order = np.argsort(np.where(self.durations >= 0, self.durations, np.iinfo(np.int32).max),
+                                         kind='stable')
+        self.n_timed = int((self.durations >= 0).sum())
+
+    @classmethod
+    def from_catalog(cls, catalog, rows=None):
+        """Vidéos du catalogue (parmi les lignes rows, toutes par défaut)"""
+        rows = np.arange(len(catalog), dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        doc_types = catalog.columns['doc_type']
+        if 'video' not in doc_types.values:
+            rows = rows[:0]
+        else:
+            rows = rows[doc_types.codes[rows] == doc_types.values.index('video')]
+
+        formats, format_values = category_codes(catalog, 'format', rows)
+
+        date_column = catalog.columns.get('date')
+        dates = pd.to_datetime(
+            pd.Series([date_column[row] for row in rows] if date_column is not None else [None] * len(rows),
+                      dtype=object),
+            errors='coerce', format='mixed'
+        ).to_numpy().astype('datetime64[D]')
+
+        duration_column = catalog.columns.get('duration')
+        durations = np.array(
+            [parse_duration(duration_column[row]) for row in rows] if duration_column is not None
+            else [-1] * len(rows),
+            dtype=np.int32
+        )
+
+        theme_column = catalog.columns.get('themes')
+        if theme_column is not None:
+            theme_offsets, theme_codes = gather_lists(theme_column.offsets, theme_column.codes, rows)
+            theme_values = list(theme_column.values)
+        else:
+            theme_offsets, theme_codes, theme_values = np.zeros(len(rows) + 1, dtype=np.int64), \
+                np.zeros(0, dtype=np.int32), []
+
+        return cls(rows, dates, durations, formats, format_values, theme_offsets, theme_codes, theme_values)
+
+    def extend(self, catalog, rows):
+        """Nouveau magasin avec les vidéos des lignes ajoutées au catalogue"""
+        added = VideoStore.from_catalog(catalog, rows)
+        # Dictionnaires du nouveau catalogue : ceux de l'ancien en sont des préfixes
+        return VideoStore(
+            np.concatenate([self.rows, added.rows]),
+            np.concatenate([self.dates, added.dates]),
+            np.concatenate([self.durations, added.durations]),
+            np.concatenate([self.formats, added.formats]),
+            added.format_values,
+            np.concatenate([self.theme_offsets, added.theme_offsets[1:] + self.theme_offsets[-1]]),
+            np.concatenate([self.theme_codes, added.theme_codes]),
+            added.theme_values
+        )
+
+    def __len__(self):
+        return len(self.rows)
+
+    def select(self, mask):
+        """Sous-ensemble des vidéos (masque booléen sur les vidéos)"""
+        kept = np.flatnonzero(mask)
+        theme_offsets, theme_codes = gather_lists(self.theme_offsets, self.theme_codes, kept)
+        return VideoStore(
+            self.rows[kept], self.dates[kept], self.durations[kept], self.formats[kept], self.format_values,
+            theme_offsets, theme_codes, self.theme_values
+        )
+
+    def format_labels(self):
+        return np.array(self.format_values + [UNKNOWN_FORMAT], dtype=object)[self.formats]
+
+    # ------------------------------------------------------------------
+    # Index triés
+    # ------------------------------------------------------------------
+
+    def _range(self, order, values, low, high):
+        """Masque des vidéos dont la valeur est dans [low, high] (bornes None : ouvertes)"""
+        lo = 0 if low is None else np.searchsorted(values, low, side='left')
+        hi = len(values) if high is None else np.searchsorted(values, high, side='right')
+        mask = np.zeros(len(self), dtype=bool)
+        mask[order[lo:hi]] = True
+        return mask
+
+    def between_durations(self, min_seconds=None, max_seconds=None):
+        """Vidéos dont la durée est comprise entre min_seconds et max_seconds (durées connues)"""
+        order = self.duration_order[:self.n_timed]
+        return self._range(order, self.durations[order], min_seconds, max_seconds)
+
+    def between_years(self, start=None, end=None):
+        """Vidéos datées entre les années start et end incluses"""
+        order = self.date_order[:self.n_dated]
+        low = None if start is None else np.datetime64(f"{int(start):04d}-01-01", 'D')
+        high = None if end is None else np.datetime64(f"{int(end):04d}-12-31", 'D')
+        return self._range(order, self.dates[order], low, high)
+
+    def mask(self, min_seconds=None, max_seconds=None, start=None, end=None, formats=None):
+        """Vidéos retenues par les filtres de durée, de période et de format"""
+        mask = np.ones(len(self), dtype=bool)
+        if min_seconds is not None or max_seconds is not None:
+            mask &= self.between_durations(min_seconds, max_seconds)
+        if start is not None or end is not None:
+            mask &= self.between_years(start, end)
+        if formats is not None:
+            codes = [self.format_values.index(value) for value in formats if value in self.format_values]
+            mask &= np.isin(self.formats, codes)
+        return mask
+
+    def duration_bounds(self):
+        """(durée minimale, durée maximale) en secondes, ou None si aucune durée n'est connue"""
+        if not self.n_timed:
+            return None
+        order = self.duration_order[:self.n_timed]
+        return int(self.durations[order[0]]), int(self.durations[order[-1]])
+
+    # ------------------------------------------------------------------
+    # Agrégats
+    # ------------------------------------------------------------------
+
+    def totals(self, mask=None):
+        """Nombre de vidéos, métrage total et durée moyenne (secondes)"""
+        selected = np.ones(len(self), dtype=bool) if mask is None else mask
+        timed = selected & (self.durations >= 0)
+        footage = int(self.durations[timed].sum())
+        return {
+            'videos': int(selected.sum()),
+            'footage': footage,
+            'mean_duration': footage / int(timed.sum()) if timed.any() else 0.0,
+        }
+
+    def footage(self, by='theme', mask=None):
+        """Métrage (secondes) et nombre de vidéos par thème, année ou format
+
+        Une vidéo à plusieurs thèmes compte dans chacun ; les durées inconnues
+        comptent dans le nombre de vidéos mais pas dans le métrage.
+        """
+        if by not in FOOTAGE_GROUPS:
+            raise ValueError(f"Regroupement inconnu : {by}")
+        selected = np.ones(len(self), dtype=bool) if mask is None else mask
+        seconds = np.where(self.durations >= 0, self.durations, 0).astype(np.int64)
+
+        if by == 'theme':
+            lengths = np.diff(self.theme_offsets)
+            video_ids = np.repeat(np.arange(len(self)), lengths)
+            keys = self.theme_codes.astype(np.int64)
+            # Vidéos sans thème : une case à part
+            untagged = np.flatnonzero(lengths == 0)
+            video_ids = np.concatenate([video_ids, untagged])
+            keys = np.concatenate([keys, np.full(len(untagged), len(self.theme_values), dtype=np.int64)])
+            labels = self.theme_values + [NO_THEME]
+        elif by == 'format':
+            video_ids = np.arange(len(self))
+            keys = np.where(self.formats >= 0, self.formats, len(self.format_values)).astype(np.int64)
+            labels = self.format_values + [UNKNOWN_FORMAT]
+        else:
+            video_ids = np.flatnonzero(~np.isnat(self.dates))
+            years = self.dates[video_ids].astype('datetime64[Y]').astype(np.int64) + 1970
+            first = int(years.min()) if len(years) else 0
+            keys = years - first
+            labels = list(range(first, first + (int(keys.max()) + 1 if len(keys) else 0)))
+
+        keep = selected[video_ids]
+        video_ids, keys = video_ids[keep], keys[keep]
+        footage = np.bincount(keys, weights=seconds[video_ids], minlength=len(labels)).astype(np.int64)
+        videos = np.bincount(keys, minlength=len(labels))
+        present = np.flatnonzero(videos)
+        frame = pd.DataFrame({
+            FOOTAGE_GROUPS[by]: np.asarray(labels, dtype=object)[present],
+            'vidéos': videos[present],
+            'secondes': footage[present],
+        })
+        frame['minutes'] = (frame['secondes'] / 60).round(1)
+        if by != 'year':
+            frame = frame.sort_values('secondes', ascending=False, kind='stable')
+        return frame.reset_index(drop=True)
@@ -0,0 +1,73 @@
+"""
+Index des périodes couvertes par les notices, pour le filtre « Période ».
+
+Chaque notice couvre un intervalle d'années [début, fin] : une date
+(« 1965-03-15 ») donne une seule année, une plage (« 1962-1981 ») ou une
+période de jeu de données (« 1968-1982 ») donne les deux bornes. Les
+intervalles sont rangés dans un IntervalIndex : une plage du curseur se
+résout en lignes du catalogue par deux recherches dichotomiques.
+
+Les notices sans date ne peuvent pas être situées : elles restent visibles
+quelle que soit la période choisie.
+"""
+
+import re
+
+import numpy as np
+
+from interval_index import IntervalIndex
+
+# Années plausibles, isolées (pas les mois ni les jours d'une date ISO)
+YEAR_RE = re.compile(r"(?<!\d)(1[5-9]\d\d|20\d\d)(?!\d)")
+
+# Champs lus dans l'ordre : le premier qui contient une année l'emporte
+DATE_FIELDS = ('date', 'period')
+
+
+def record_years(record, fields=DATE_FIELDS):
+    """(première année, dernière année) d'une notice, ou None si elle n'est pas datée"""
+    for field in fields:
+        years = [int(year) for year in YEAR_RE.findall(str(record.get(field) or ''))]
+        if years:
+            return min(years), max(years)
+    return None
+
+
+class YearIndex:
+    """Intervalles d'années des notices ; les lignes sans date ont start = end = -1"""
+
+    def __init__(self, starts, ends):
+        self.starts = starts
+        self.ends = ends
+        self.dated = starts >= 0
+        rows = np.flatnonzero(self.dated)
+        self.index = IntervalIndex(starts[rows], ends[rows], rows)
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        return cls(*cls._parse(catalog, range(len(catalog))))
+
+    @staticmethod
+    def _parse(catalog, rows):
+        spans = [record_years(catalog.record(row)) or (-1, -1) for row in rows]
+        spans = np.array(spans, dtype=np.int64).reshape(-1, 2)
+        return spans[:, 0], spans[:, 1]
+
+    def extend(self, catalog, rows):
+        """Nouvel index avec les lignes ajoutées (seules leurs dates sont lues)"""
+        starts, ends = self._parse(catalog, rows)
+        return YearIndex(np.concatenate([self.starts, starts]), np.concatenate([self.ends, ends]))
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def bounds(self):
+        """(première, dernière) année couverte par le catalogue"""
+        if not self.dated.any():
+            return None
+        return int(self.starts[self.dated].min()), int(self.ends[self.dated].max())
+
+    def mask(self, low, high):
+        """Lignes dont la période recoupe [low, high], plus les lignes non datées"""
+        return self.index.mask(low, high, len(self)) | ~self.dated